@@ -0,0 +1,348 @@
+"""
+Benchmarks for the hockey client and the game-day pipeline, run against the
+offline stand-in in hockey.standin.
+
+Each benchmark reports the requests it made (by endpoint), p50/p95 latency,
+peak RSS, its peak Python allocations and event-loop lag, and the run is
+written to JSON so runs can be compared:
+
+    python -m bench.hockey_bench
+    python -m bench.hockey_bench --only game_night --speed 300
+    python -m bench.hockey_bench --compare bench/results/<earlier>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import time
+import tracemalloc
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional
+
+from hockey.cache import GAME_STATE_TTLS, get_game_cache
+from hockey.game import Game
+from hockey.schedule import Schedule
+from hockey.standin import StandIn
+from hockey.state import FINAL, PREGAME_WINDOW, PUCK_DROP, GameEvent, GameStateService
+from util import create_embed
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+REPLAY_DATE = '2024-12-27'
+TEAM = 'njd'
+
+LAG_INTERVAL = 0.005
+DEFAULT_ITERATIONS = 50
+DEFAULT_SPEED = 600
+GAME_INIT_CONCURRENCY = (1, 8, 32)
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """
+    Get p50, p95, max and mean of samples in milliseconds.
+    """
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    def at(fraction: float) -> float:
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)] * 1000
+    return {
+        "p50": round(at(0.5), 3),
+        "p95": round(at(0.95), 3),
+        "max": round(ordered[-1] * 1000, 3),
+        "mean": round(statistics.fmean(ordered) * 1000, 3)
+    }
+
+class LoopLag:
+    def __init__(self, interval: float = LAG_INTERVAL):
+        """
+        Initialize the LoopLag monitor, which measures how late the event loop wakes a sleeper.
+        """
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+        self._sleeping_since = 0.0
+
+    async def _run(self) -> None:
+        """
+        Sleep in a loop, recording how late each wake-up is.
+        """
+        while True:
+            self._sleeping_since = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(time.perf_counter() - self._sleeping_since - self.interval, 0))
+
+    def start(self) -> None:
+        """
+        Start monitoring.
+        """
+        self._sleeping_since = time.perf_counter()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop monitoring, counting a sleeper that never got to wake up.
+        """
+        overdue = time.perf_counter() - self._sleeping_since - self.interval
+        if overdue > 0:
+            self.samples.append(overdue)
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+class Benchmark:
+    def __init__(self, name: str, standin: StandIn):
+        """
+        Initialize a Benchmark, which collects one benchmark's numbers.
+        """
+        self.name = name
+        self.standin = standin
+        self.latencies: List[float] = []
+        self.extra: Dict[str, Any] = {}
+        self._measured: Dict[str, Any] = {}
+
+    @property
+    def result(self) -> Dict[str, Any]:
+        """
+        Get the measurements and any benchmark-specific numbers.
+        """
+        return {**self._measured, **self.extra}
+
+    async def timed(self, call: Awaitable[Any]) -> Any:
+        """
+        Await a call and record its latency.
+        """
+        start = time.perf_counter()
+        try:
+            return await call
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+    @asynccontextmanager
+    async def measure(self) -> AsyncIterator['Benchmark']:
+        """
+        Collect requests, allocations, RSS and loop lag for the body of the block.
+        """
+        requests_before = dict(self.standin.requests)
+        not_modified_before = self.standin.not_modified
+        lag = LoopLag()
+        tracemalloc.start()
+        lag.start()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - start
+            await lag.stop()
+            _, traced_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            requests = {route: count - requests_before.get(route, 0) for route, count in self.standin.requests.items()}
+            requests = {route: count for route, count in requests.items() if count}
+            self._measured = {
+                "name": self.name,
+                "wall_s": round(elapsed, 3),
+                "iterations": len(self.latencies),
+                "requests": {**requests, "total": sum(requests.values()), "not_modified": self.standin.not_modified - not_modified_before},
+                "latency_ms": percentiles(self.latencies),
+                # ru_maxrss is in KB on Linux; it's the process-wide high-water mark
+                "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                "traced_peak_kb": round(traced_peak / 1024, 1),
+                "loop_lag_ms": percentiles(lag.samples)
+            }
+
+async def bench_schedule_next_game(standin: StandIn, iterations: int) -> Dict[str, Any]:
+    """
+    Schedule.fetch_team_schedule followed by get_next_game, cold each time.
+    """
+    bench = Benchmark("schedule_next_game", standin)
+    async with bench.measure():
+        for _ in range(iterations):
+            # a fresh client has empty caches, so every call goes over HTTP
+            client = standin.client()
+            async def run() -> Optional[Game]:
+                schedule = Schedule(client=client)
+                await schedule.fetch_team_schedule(TEAM)
+                return await schedule.get_next_game()
+            await bench.timed(run())
+            await client.close()
+    return bench.result
+
+async def bench_game_init(standin: StandIn, iterations: int) -> List[Dict[str, Any]]:
+    """
+    Game.init for the replayed slate at several concurrency levels.
+
+    The game cache is cleared before each round so every round goes upstream;
+    duplicate IDs in a round are coalesced, as they are in the bot.
+    """
+    game_ids = sorted(standin.replay_games)
+    results = []
+    for concurrency in GAME_INIT_CONCURRENCY:
+        bench = Benchmark(f"game_init_c{concurrency}", standin)
+        client = standin.client()
+        cache = get_game_cache(client)
+        async with bench.measure():
+            start = time.perf_counter()
+            for _ in range(iterations):
+                for game_id in game_ids:
+                    cache.invalidate(game_id)
+                await asyncio.gather(*(
+                    bench.timed(Game.init(game_ids[index % len(game_ids)], client)) for index in range(concurrency)
+                ))
+            bench.extra["games_per_s"] = round(iterations * concurrency / (time.perf_counter() - start), 1)
+            bench.extra["cache"] = cache.stats
+        await client.close()
+        results.append(bench.result)
+    return results
+
+async def bench_create_game(standin: StandIn, iterations: int) -> Dict[str, Any]:
+    """
+    create_embed.create_game for a hydrated game, with warm team and game caches.
+    """
+    client = standin.client()
+    game_id = min(standin.replay_games)
+    game = await Game.init(game_id, client)
+    await create_embed.create_game(game)
+
+    bench = Benchmark("create_game", standin)
+    async with bench.measure():
+        for _ in range(iterations):
+            file, _ = await bench.timed(create_embed.create_game(game))
+            if file is not None:
+                file.close()
+    await client.close()
+    return bench.result
+
+async def bench_game_night(standin: StandIn, speed: float) -> Dict[str, Any]:
+    """
+    A full replayed game night driven by GameStateService.
+
+    Poll intervals and game cache TTLs are divided by the replay speed, so
+    request counts approximate a real night. Channel open and close are
+    timed from the pregame_window and final events, in game seconds after
+    the replay made them possible. startTimeUTC only has whole seconds, so
+    delays are good to about speed game seconds, and pregame_window fires as
+    soon as a game is seen because its 30 minutes aren't scaled.
+    """
+    client = standin.client()
+    cache = get_game_cache(client)
+    cache.ttls = {state: ttl / speed for state, ttl in GAME_STATE_TTLS.items()}
+    service = GameStateService(client, TEAM, time_scale=speed)
+
+    bench = Benchmark("game_night", standin)
+    done = asyncio.Event()
+    seen: Dict[str, Dict[int, float]] = {PREGAME_WINDOW: {}, PUCK_DROP: {}, FINAL: {}}
+
+    async def record(event: GameEvent) -> None:
+        seen[event.kind].setdefault(event.game_id, standin.game_time)
+        if len(seen[FINAL]) == len(standin.replay_games):
+            done.set()
+
+    for kind in seen:
+        service.subscribe(kind, record)
+
+    # poll latency is the time poll() takes, timed by wrapping it
+    poll = service.poll
+    async def timed_poll() -> None:
+        await bench.timed(poll())
+    service.poll = timed_poll
+
+    night_length = max(game.start_offset + sum(phase.length for phase in game.phases) for game in standin.replay_games.values())
+    async with bench.measure():
+        standin.started_at = time.time()
+        service.start()
+        try:
+            await asyncio.wait_for(done.wait(), timeout=night_length / speed + 60)
+        except asyncio.TimeoutError:
+            bench.extra["timed_out"] = True
+        await service.stop()
+
+    # how many game seconds each event trailed the replay
+    delays: Dict[str, Dict[int, float]] = {}
+    for game_id, game in standin.replay_games.items():
+        final_at = game.start_offset + sum(phase.length for phase in game.phases[:-2])
+        expected = {PREGAME_WINDOW: game.start_offset - 60 * 30, PUCK_DROP: game.start_offset, FINAL: final_at}
+        for kind, at in expected.items():
+            if game_id in seen[kind]:
+                delays.setdefault(kind, {})[game_id] = round(seen[kind][game_id] - at, 1)
+    bench.extra["speed"] = speed
+    bench.extra["event_delay_game_s"] = delays
+    bench.extra["cache"] = cache.stats
+    await client.close()
+    return bench.result
+
+BENCHMARKS = ("schedule_next_game", "game_init", "create_game", "game_night")
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Run the selected benchmarks, each against a fresh stand-in.
+    """
+    results: List[Dict[str, Any]] = []
+    for name in args.only or BENCHMARKS:
+        speed = args.speed if name == "game_night" else 1
+        async with StandIn(replay=REPLAY_DATE, speed=speed) as standin:
+            print(f"Running {name}...")
+            if name == "schedule_next_game":
+                results.append(await bench_schedule_next_game(standin, args.iterations))
+            elif name == "game_init":
+                results.extend(await bench_game_init(standin, args.iterations))
+            elif name == "create_game":
+                results.append(await bench_create_game(standin, args.iterations))
+            elif name == "game_night":
+                results.append(await bench_game_night(standin, args.speed))
+
+    return {
+        "run_at": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "iterations": args.iterations,
+        "benchmarks": results
+    }
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any]) -> None:
+    """
+    Print p50/p95, request and RSS changes against an earlier run.
+    """
+    earlier = {bench["name"]: bench for bench in previous.get("benchmarks", [])}
+    for bench in current["benchmarks"]:
+        before = earlier.get(bench["name"])
+        if before is None:
+            continue
+        changes = []
+        for label, now, then in (
+            ("p50", bench["latency_ms"].get("p50"), before["latency_ms"].get("p50")),
+            ("p95", bench["latency_ms"].get("p95"), before["latency_ms"].get("p95")),
+            ("requests", bench["requests"]["total"], before["requests"]["total"]),
+            ("rss_kb", bench["peak_rss_kb"], before["peak_rss_kb"])
+        ):
+            if now is not None and then:
+                changes.append(f"{label} {then} -> {now} ({(now - then) / then:+.0%})")
+        print(f"{bench['name']}: {', '.join(changes)}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the hockey client against the offline stand-in.")
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS)
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument('--speed', type=float, default=DEFAULT_SPEED, help="replay speed for game_night")
+    parser.add_argument('--output', help="JSON file to write (default: bench/results/<timestamp>.json)")
+    parser.add_argument('--compare', metavar='JSON', help="an earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {output}")
+
+    for bench in results["benchmarks"]:
+        print(f"{bench['name']}: {bench['requests']['total']} requests, p50 {bench['latency_ms'].get('p50')} ms, "
+              f"p95 {bench['latency_ms'].get('p95')} ms, loop lag p95 {bench['loop_lag_ms'].get('p95')} ms")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+Benchmarks for the pick'em Picks queries on a synthetic multi-season
+database, before and after PickemsDatabase's migrations.
+
+For each query it reports the query plan, whether that plan scans the
+Picks table, the SQLite VM steps one execution takes (a proxy for rows
+examined) and p50/p95 latency:
+
+    python -m bench.pickems_bench
+    python -m bench.pickems_bench --seasons 5 --users 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+from bench.hockey_bench import RESULTS_DIR, percentiles
+from database.connection import close_all, get_pool
+from database.pickems_database import PickemsDatabase
+
+DEFAULT_SEASONS = 3
+DEFAULT_USERS = 300
+DEFAULT_ITERATIONS = 50
+
+GAMES_PER_NIGHT = 8
+NIGHTS_PER_SEASON = 165
+PICK_RATE = 0.3
+
+# the tables as they were before any migration
+BASE_SCHEMA = """
+CREATE TABLE Picks (
+    pick_id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    game_id INTEGER NOT NULL,
+    team_id TEXT NOT NULL,
+    season TEXT NOT NULL,
+    picked_at TEXT NOT NULL
+);
+CREATE TABLE Records (
+    user_id TEXT NOT NULL,
+    wins INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    season TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+# name: (query before the migrations, query after)
+QUERIES = {
+    "get_picks": (
+        "SELECT user_id, team_id FROM Picks WHERE date(picked_at) = :date;",
+        "SELECT user_id, team_id FROM Picks WHERE game_date = :date;"
+    ),
+    "get_user_picks": (
+        "SELECT team_id FROM Picks WHERE user_id = :user_id AND date(picked_at) = :date;",
+        "SELECT team_id FROM Picks WHERE game_date = :date AND user_id = :user_id;"
+    ),
+    "get_pick": (
+        "SELECT team_id FROM Picks WHERE user_id = :user_id AND game_id = :game_id;",
+        "SELECT team_id FROM Picks WHERE user_id = :user_id AND game_id = :game_id;"
+    ),
+    "settle_picks": (
+        "SELECT user_id, game_id, team_id FROM Picks WHERE game_id IN (:game_id, :game_id + 1, :game_id + 2);",
+        "SELECT user_id, game_id, team_id FROM Picks WHERE game_id IN (:game_id, :game_id + 1, :game_id + 2);"
+    )
+}
+
+def build(path: str, seasons: int, users: int) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Create the base schema and fill Picks; get the row count and sample parameters.
+    """
+    rng = random.Random(0)
+    conn = sqlite3.connect(path)
+    conn.executescript(BASE_SCHEMA)
+
+    rows = []
+    samples = []
+    last_season = date.today().year
+    for year in range(last_season - seasons, last_season):
+        season = f"{year}{year + 1}"
+        opening = date(year, 10, 8)
+        for night in range(NIGHTS_PER_SEASON):
+            day = opening + timedelta(days=night)
+            for game in range(GAMES_PER_NIGHT):
+                game_id = int(f"{year}02{night * GAMES_PER_NIGHT + game + 1:04d}")
+                for user in range(users):
+                    if rng.random() < PICK_RATE:
+                        picked_at = f"{day.isoformat()} {rng.randint(9, 18):02d}:{rng.randint(0, 59):02d}:00"
+                        rows.append((str(user), game_id, str(rng.randint(1, 32)), season, picked_at))
+            if rng.random() < 0.05:
+                samples.append({"date": day.isoformat(), "user_id": str(rng.randrange(users)), "game_id": game_id - 2})
+
+    conn.executemany("INSERT INTO Picks (user_id, game_id, team_id, season, picked_at) VALUES (?, ?, ?, ?, ?);", rows)
+    conn.commit()
+    conn.close()
+    return len(rows), samples
+
+def measure(path: str, sql: str, samples: List[Dict[str, Any]], iterations: int) -> Dict[str, Any]:
+    """
+    Get a query's plan, VM steps per execution and latency.
+    """
+    conn = sqlite3.connect(path)
+    plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", samples[0])]
+
+    steps = 0
+    def count() -> int:
+        nonlocal steps
+        steps += 1
+        return 0
+    conn.set_progress_handler(count, 1)
+    conn.execute(sql, samples[0]).fetchall()
+    conn.set_progress_handler(None, 1)
+
+    latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        conn.execute(sql, samples[i % len(samples)]).fetchall()
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+    return {
+        "plan": plan,
+        "full_scan": any(line.startswith("SCAN") for line in plan),
+        "vm_steps": steps,
+        "latency_ms": percentiles(latencies)
+    }
+
+async def migrate(path: str) -> float:
+    """
+    Apply PickemsDatabase's migrations and get how long they took.
+    """
+    db = PickemsDatabase()
+    db.pool = get_pool(path)
+    start = time.perf_counter()
+    await db.migrate()
+    elapsed = time.perf_counter() - start
+    await close_all()
+    return elapsed
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Build the dataset and measure every query before and after migrating.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'pickems.db')
+        print(f"Building {args.seasons} seasons for {args.users} users...")
+        picks, samples = build(path, args.seasons, args.users)
+
+        before = {name: measure(path, sql, samples, args.iterations) for name, (sql, _) in QUERIES.items()}
+        print("Migrating...")
+        migration_s = asyncio.run(migrate(path))
+        after = {name: measure(path, sql, samples, args.iterations) for name, (_, sql) in QUERIES.items()}
+
+    return {
+        "run_at": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "picks": picks,
+        "seasons": args.seasons,
+        "users": args.users,
+        "migration_s": round(migration_s, 3),
+        "queries": {name: {"before": before[name], "after": after[name]} for name in QUERIES}
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Picks queries before and after the migrations.")
+    parser.add_argument('--seasons', type=int, default=DEFAULT_SEASONS)
+    parser.add_argument('--users', type=int, default=DEFAULT_USERS)
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument('--output', help="JSON file to write (default: bench/results/pickems-<timestamp>.json)")
+    args = parser.parse_args()
+
+    results = run(args)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"pickems-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {output} ({results['picks']} picks, migrated in {results['migration_s']}s)")
+
+    for name, query in results["queries"].items():
+        before, after = query["before"], query["after"]
+        print(f"{name}: {'scan' if before['full_scan'] else 'search'} -> {'scan' if after['full_scan'] else 'search'}, "
+              f"{before['vm_steps']} -> {after['vm_steps']} VM steps, "
+              f"p50 {before['latency_ms']['p50']} -> {after['latency_ms']['p50']} ms")
+
+if __name__ == '__main__':
+    main()
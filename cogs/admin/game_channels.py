@@ -45,7 +45,7 @@ class GameChannelsMixin:
 		else:
 			full_message = f"Game chat is now open!\n\n{REMINDER_MESSAGE}"
 		
-		await game_channel.open_channel(self.bot, full_message)
+		elapsed = await game_channel.open_channel(self.bot, full_message)
 		
 		# Start reminder task if not already running
 		if not self.periodic_reminder.is_running():
@@ -53,7 +53,7 @@ class GameChannelsMixin:
 			self.periodic_reminder.start()
 			self.log.info("Started periodic reminder task")
 		
-		await ctx.respond("Game channel(s) opened!", delete_after=3)
+		await ctx.respond(f"Game channel(s) opened in {elapsed:.1f}s!", delete_after=3)
 	
 	@open.error
 	async def open_error(self, ctx, error):
@@ -75,9 +75,9 @@ class GameChannelsMixin:
 			self.last_reminder_time = None
 			self.log.info("Stopped periodic reminder task")
 		
-		await game_channel.close_channel(self.bot, message)
+		elapsed = await game_channel.close_channel(self.bot, message)
 		
-		await ctx.respond("Game channel(s) closed!", delete_after=3)
+		await ctx.respond(f"Game channel(s) closed in {elapsed:.1f}s!", delete_after=3)
 	
 	@close.error
 	async def close_error(self, ctx, error):
@@ -1,5 +1,5 @@
 """
-System management commands (restart, kill, cog management, timeout).
+System management commands (restart, kill, cog management, API status, timeout).
 """
 import discord
 from discord.ext import commands
@@ -112,6 +112,21 @@ class SystemMixin:
 		self.log.exception("Reload cog error")
 		await ctx.respond("Oops, something went wrong!", ephemeral=True)
 	
+	@commands.slash_command(guild_ids=[guild_id], name='apistatus', description='Show NHL API client health.')
+	@commands.has_permissions(administrator=True)
+	@discord.default_permissions(administrator=True)
+	async def apistatus(self, ctx):
+		stats = self.bot.hockey_client.stats
+		lines = [f"Retries: {stats['retries']} | Stale served: {stats['stale_served']} | 304s: {stats['not_modified']} | Unchanged: {stats['unchanged']}"]
+		for host, host_stats in stats['hosts'].items():
+			lines.append(f"`{host}`: circuit {host_stats['state']} ({host_stats['failures']} failures, {host_stats['trips']} trips), queue {host_stats['queue_depth']}")
+		await ctx.respond("\n".join(lines), ephemeral=True)
+	
+	@apistatus.error
+	async def apistatus_error(self, ctx, error):
+		self.log.exception("API status error")
+		await ctx.respond("Oops, something went wrong!", ephemeral=True)
+	
 	@commands.slash_command(guild_ids=[guild_id], name='timeout', description='Timeout users.')
 	@discord.commands.option('user', description='Enter the user to timeout')
 	@discord.commands.option('duration', description='Enter the duration')
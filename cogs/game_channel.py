@@ -1,5 +1,7 @@
-﻿from hockey.schedule import Schedule
+﻿from hockey.schedule import ScheduledGame
 from hockey.game import Game
+from hockey.cache import get_game_cache
+from hockey.state import GameEvent, SCHEDULE_CHANGED, PREGAME_WINDOW, FINAL, POSTPONED
 from util import settings
 from util.logger import setup_logger
 
@@ -20,51 +22,88 @@ class GameChannel(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.cfg = settings.Settings()
-        self.schedule = Schedule()
+        self.game_state = bot.game_state
         self.current_game = None
+        self.last_reminder_time = None
         self.log = setup_logger(__name__, 'log/game_channel.log')
 
-        self.run_tasks.start()
+        self.subscriptions = [
+            (SCHEDULE_CHANGED, self.on_schedule_changed),
+            (PREGAME_WINDOW, self.on_pregame_window),
+            (FINAL, self.on_game_over),
+            (POSTPONED, self.on_game_over)
+        ]
+        for kind, callback in self.subscriptions:
+            self.game_state.subscribe(kind, callback)
+
         self.log.info("GameChannel cog initialized.")
 
     def cog_unload(self):
-        self.run_tasks.cancel()
+        for kind, callback in self.subscriptions:
+            self.game_state.unsubscribe(kind, callback)
+        self.periodic_reminder.cancel()
         self.log.info("GameChannel cog unloaded.")
 
-    @tasks.loop(minutes=1)
-    async def run_tasks(self):
-        self.log.info("Running scheduled tasks.")
-        await self.bot.wait_until_ready()
+    @staticmethod
+    def is_devils_game(game) -> bool:
+        return game is not None and (game.away_team_id == 1 or game.home_team_id == 1)
 
-        now = datetime.now().strftime("%Y-%m-%d")
-        self.schedule.set_date(now)
-        await self.schedule.fetch_team_schedule("njd")
-        self.current_game = await self.schedule.get_next_game()
-        self.log.info(f"Fetched next game: {self.current_game}")
+    async def on_schedule_changed(self, event: GameEvent) -> None:
+        self.log.info(f"Next game is now: {event.game}")
+        self.log.info(f"Game cache stats: {get_game_cache().stats}")
+        await game_channel.update_description_and_status(self.bot, event.game)
 
-        await game_channel.update_description_and_status(self.bot, self.current_game)
+    async def on_pregame_window(self, event: GameEvent) -> None:
+        if not self.is_devils_game(event.game):
+            return
+        if self.current_game and self.current_game.game_id == event.game_id:
+            return
 
-        if self.current_game:
-            ready = await self.wait_until_ready(self.current_game)
-            if not ready:
-                self.log.warning("Game was not ready in time.")
-                return
+        self.log.info(f"Game {event.game_id} is ready to start.")
+        self.current_game = event.game
+        await self.open_game_channel(event.game)
 
-            await self.open_game_channel(self.current_game)
-            await self.wait_until_over(self.current_game)
+        self.last_reminder_time = datetime.now()
+        if not self.periodic_reminder.is_running():
+            self.periodic_reminder.start()
 
-            await self.schedule.fetch_team_schedule("njd")
-            next_game = await self.schedule.get_next_game()
-            self.log.info(f"Fetched next game after current: {next_game}")
-            await self.close_game_channel(self.current_game, next_game)
+    async def on_game_over(self, event: GameEvent) -> None:
+        if not self.current_game or self.current_game.game_id != event.game_id:
+            return
+
+        self.log.info(f"Game {event.game_id} is over or cancelled.")
+        self.periodic_reminder.cancel()
+        cur_game = event.game if isinstance(event.game, Game) else self.current_game
+        self.current_game = None
+
+        await self.game_state.refresh_schedule()
+        next_game = self.game_state.schedule.find_next_game()
+        self.log.info(f"Fetched next game after current: {next_game}")
+        await self.close_game_channel(cur_game, next_game)
+
+    @tasks.loop(minutes=1)
+    async def periodic_reminder(self):
+        # Check if an hour has passed since last reminder
+        current_time = datetime.now()
+        time_since_last_reminder = (current_time - self.last_reminder_time).total_seconds()
+        if time_since_last_reminder >= REMINDER_INTERVAL:
+            try:
+                is_closed = await game_channel.is_closed(self.bot)
+                if not is_closed:
+                    self.log.info("Posting periodic reminder message")
+                    await game_channel.send_message(self.bot, REMINDER_MESSAGE)
+                    self.last_reminder_time = current_time
+            except Exception as e:
+                self.log.error(f"Error posting reminder message: {str(e)}", exc_info=True)
 
     async def open_game_channel(self, game: Game) -> None:
         self.log.info("Opening game channel.")
 
         opening_message = f"Game chat is open! We're playing the **{game.playing_against}**!\n\n{REMINDER_MESSAGE}"
-        await game_channel.open_channel(self.bot, opening_message)
+        elapsed = await game_channel.open_channel(self.bot, opening_message)
+        self.log.info(f"Game channel opened in {elapsed:.2f}s.")
 
-    async def close_game_channel(self, cur_game: Game, next_game: Game) -> None:
+    async def close_game_channel(self, cur_game: Game, next_game: ScheduledGame) -> None:
         self.log.info("Closing game channel.")
         
         closing_message = ""
@@ -97,10 +136,13 @@ class GameChannel(commands.Cog):
                     playing = next_game.home_team_full_name
                 else:
                     playing = next_game.away_team_full_name
-                next_game_datetime = str(next_game.raw_game_time.astimezone(zoneinfo.ZoneInfo('US/Eastern')).timestamp())[:-2]
-                next_game_date = f"<t:{next_game_datetime}:d>"
-                next_game_time = f"<t:{next_game_datetime}:t>"
-                closing_message = f"Game chat is now closed. Join us again when we're playing the {playing} @{next_game_time} on {next_game_date} next!"
+                if next_game.raw_game_time is None:
+                    closing_message = f"Game chat is now closed. Join us again when we're playing the {playing} next!"
+                else:
+                    next_game_datetime = str(next_game.raw_game_time.astimezone(zoneinfo.ZoneInfo('US/Eastern')).timestamp())[:-2]
+                    next_game_date = f"<t:{next_game_datetime}:d>"
+                    next_game_time = f"<t:{next_game_datetime}:t>"
+                    closing_message = f"Game chat is now closed. Join us again when we're playing the {playing} @{next_game_time} on {next_game_date} next!"
         else:
             if cur_game.is_playoffs:
                 winning_team = cur_game.winning_team_id
@@ -142,56 +184,10 @@ class GameChannel(commands.Cog):
                 self.log.warning("Channel appears to be already closed, skipping delay message")
                 
             self.log.info(f"Closing channel with message: '{closing_message}'")
-            await game_channel.close_channel(self.bot, closing_message)
+            elapsed = await game_channel.close_channel(self.bot, closing_message)
+            self.log.info(f"Game channel closed in {elapsed:.2f}s.")
         except Exception as e:
             self.log.error(f"Exception in close_game_channel: {str(e)}", exc_info=True)
 
-    async def wait_until_ready(self, game: Game) -> bool:
-        self.log.info(f"Waiting until ready for game {game.game_id}.")
-        while True:
-            now = datetime.now(zoneinfo.ZoneInfo("UTC"))
-            if now.minute % 30 == 0 or (now >= game.raw_pregame_time and not game.is_final and not game.is_ppd and not game.is_cancelled):
-                if now >= game.raw_pregame_time:
-                    self.log.info("Game is ready to start.")
-                    return True
-            elif not game.is_scheduled:
-                self.log.warning("Game is not scheduled anymore.")
-                return False
-            else:
-                await self.schedule.fetch_team_schedule("njd")
-                game_tmp: Game = await self.schedule.get_next_game()
-                if game_tmp.game_id != game.game_id:
-                    self.log.warning("Game changed during wait.")
-                    return False
-
-            sleep_time = 60*(30 - now.minute % 30) - now.second
-            await asyncio.sleep(sleep_time)
-            await game.refresh()
-            self.log.info("Game refreshed during wait.")
-
-    async def wait_until_over(self, game: Game) -> None:
-        self.log.info(f"Waiting for game {game.game_id} to be over.")
-        last_reminder_time = datetime.now()
-        while True:
-            await game.refresh()
-            if game.is_final or game.is_ppd or game.is_cancelled:
-                self.log.info(f"Game {game.game_id} is over or cancelled.")
-                break
-            
-            # Check if 15 minutes have passed since last reminder
-            current_time = datetime.now()
-            time_since_last_reminder = (current_time - last_reminder_time).total_seconds()
-            if time_since_last_reminder >= REMINDER_INTERVAL:
-                try:
-                    is_closed = await game_channel.is_closed(self.bot)
-                    if not is_closed:
-                        self.log.info("Posting periodic reminder message")
-                        await game_channel.send_message(self.bot, REMINDER_MESSAGE)
-                        last_reminder_time = current_time
-                except Exception as e:
-                    self.log.error(f"Error posting reminder message: {str(e)}", exc_info=True)
-            
-            await asyncio.sleep(60)
-
 def setup(bot: commands.Bot) -> None:
     bot.add_cog(GameChannel(bot))
@@ -1,10 +1,9 @@
 from discord.ext import commands, tasks
 from discord.utils import get
-from datetime import datetime, timezone, time
+from datetime import timezone, time
 import zoneinfo
 import asyncio
 
-from hockey.schedule import Schedule
 from util.logger import setup_logger
 
 eastern = zoneinfo.ZoneInfo("US/Eastern")
@@ -21,14 +20,16 @@ class GameDay(commands.Cog):
     async def check_game_day(self):
         hockey_chat = get(self.bot.get_all_channels(), name="hockey-chat")
         game_chat = get(self.bot.get_all_channels(), name="game-chat")
-        schedule = Schedule(datetime.now().strftime("%Y-%m-%d"))
-        await schedule.fetch_team_schedule("njd")
-        game = await schedule.get_game()
+        await self.bot.game_state.ensure_schedule()
+        game = self.bot.game_state.todays_game()
 
         if game:
             self.log.info("Posting game day message")
-            game_time = game.raw_game_time.astimezone(eastern).timestamp()
-            discord_epoch = f"<t:{int(game_time)}:t>"
+            if game.raw_game_time is None:
+                discord_epoch = "a time to be announced"
+            else:
+                game_time = game.raw_game_time.astimezone(eastern).timestamp()
+                discord_epoch = f"<t:{int(game_time)}:t>"
 
             # send to both channels simultaneously
             tasks_to_run = []
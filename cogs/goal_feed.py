@@ -0,0 +1,79 @@
+import asyncio
+import weakref
+
+from discord.ext import commands
+
+from hockey.goals import GoalTracker
+from hockey.state import GameEvent, GAME_UPDATED
+from util import create_embed, game_channel
+from util.logger import setup_logger
+
+class GoalFeed(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.game_state = bot.game_state
+        self.tracker = GoalTracker()
+        self.log = setup_logger(__name__, 'log/goal_feed.log')
+        # game_id -> lock held while a refresh's goals are found and sent
+        self._locks: 'weakref.WeakValueDictionary[int, asyncio.Lock]' = weakref.WeakValueDictionary()
+
+        # rides on the GameStateService refreshes; no polling of its own
+        self.game_state.subscribe(GAME_UPDATED, self.on_game_updated)
+        self.log.info("GoalFeed cog initialized.")
+
+    def cog_unload(self):
+        self.game_state.unsubscribe(GAME_UPDATED, self.on_game_updated)
+        self.log.info("GoalFeed cog unloaded.")
+
+    async def on_game_updated(self, event: GameEvent) -> None:
+        game = event.game
+        if game.away_team_id != 1 and game.home_team_id != 1:
+            return
+
+        # each event runs in its own task; a refresh that lands while the last
+        # one's goals are still sending must not see them as new again
+        lock = self._locks.get(game.game_id)
+        if lock is None:
+            lock = self._locks[game.game_id] = asyncio.Lock()
+        async with lock:
+            await self._post_goals(event)
+
+    async def _post_goals(self, event: GameEvent) -> None:
+        game = event.game
+        new_goals, changed_goals, disallowed = self.tracker.update(game.game_id, game.game_object)
+        if not (new_goals or changed_goals or disallowed):
+            return
+
+        # first look at a game that already ended (e.g. after a restart); record it, don't replay it
+        if event.previous is None and game.is_final:
+            for goal in new_goals + changed_goals:
+                self.tracker.mark_posted(game.game_id, goal)
+            for event_id in disallowed:
+                self.tracker.mark_removed(game.game_id, event_id)
+            await self.tracker.save()
+            return
+
+        # each goal is saved as posted only once it was sent; one that fails is found again on the next refresh
+        for goal in new_goals:
+            self.log.info(f"Posting goal {goal.event_id} for game {game.game_id}")
+
+            async def build(goal=goal):
+                return await create_embed.goal(f"{goal.scorer} ({goal.team})", goal.assists, goal.time)
+
+            if await game_channel.send_embed(self.bot, build):
+                self.tracker.mark_posted(game.game_id, goal)
+
+        for goal in changed_goals:
+            self.log.info(f"Scoring change on goal {goal.event_id} for game {game.game_id}")
+            if await game_channel.send_message(self.bot, f"Scoring change on the {goal.team} goal at {goal.time}: {goal.scorer}, assisted by {goal.assists}."):
+                self.tracker.mark_posted(game.game_id, goal)
+
+        for event_id in disallowed:
+            self.log.info(f"Goal {event_id} for game {game.game_id} was taken off the board")
+            if await game_channel.send_message(self.bot, "A goal has been taken off the board."):
+                self.tracker.mark_removed(game.game_id, event_id)
+
+        await self.tracker.save()
+
+def setup(bot: commands.Bot) -> None:
+    bot.add_cog(GoalFeed(bot))
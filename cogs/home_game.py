@@ -1,4 +1,4 @@
-from datetime import time, timezone, datetime
+from datetime import time, timezone
 import zoneinfo
 import asyncio
 
@@ -6,8 +6,6 @@ import discord
 from discord.ext import tasks
 from discord.ext import commands
 
-from hockey.schedule import Schedule
-
 from util import settings
 from util.logger import setup_logger
 
@@ -33,28 +31,22 @@ class Home_Game(commands.Cog):
             if channel_stg is None:
                 return
 
-            schedule = Schedule(datetime.now().strftime("%Y-%m-%d"))
-            await schedule.fetch_team_schedule("njd")
-
             # get game data
-            game = await schedule.get_game()
+            await self.bot.game_state.ensure_schedule()
+            game = self.bot.game_state.todays_game()
 
             if not game:
                 self.log.info("No game today")
                 self.log.info(f"Game: {game}")
                 return
 
-            home = await game.get_home_team()
-
-            if home.id != 1:
+            if game.home_team_id != 1:
                 self.log.info("Game is not at home")
                 return # game is not at home
             else:
-                away_team = await game.get_away_team()
-                
                 meetup_channel = self.bot.get_channel(channel_stg[0])
-                self.log.info(f"Posting home game message for {away_team.full_name}")
-                message = await meetup_channel.send(f"Who's going to today's game against {away_team.full_name}? React with <:njd:562468864835846187>")
+                self.log.info(f"Posting home game message for {game.away_team_full_name}")
+                message = await meetup_channel.send(f"Who's going to today's game against {game.away_team_full_name}? React with <:njd:562468864835846187>")
                 await message.add_reaction("<:njd:562468864835846187>")
         except Exception as e:
             self.log.exception("Error in home_game loop")
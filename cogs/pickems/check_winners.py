@@ -1,6 +1,7 @@
 from hockey.schedule import Schedule
 from hockey.game import Game
 from database.pickems_database import PickemsDatabase
+from util import leaderboard
 from util.logger import setup_logger
 
 from datetime import datetime, timedelta, timezone, time
@@ -12,6 +13,10 @@ import zoneinfo
 
 eastern = zoneinfo.ZoneInfo("US/Eastern")
 
+# seconds to wait before each retry of games that failed to load; the next
+# run is a day away, so keep trying for most of an hour before giving up
+RETRY_DELAYS = (60, 5 * 60, 15 * 60, 30 * 60)
+
 class CheckWinners(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -25,27 +30,30 @@ class CheckWinners(commands.Cog):
         self.run.cancel()
         self.log.info("Pickems unloaded.")
 
-    async def get_picked_teams(self, date=None):
-        user_picks = {}
-        if not date:
-            date = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-            
-        picks = await self.db.get_picks(date)
-        
-        for user, pick in picks.items():
-            user_picks[user] = pick
-        
-        return user_picks
-    
     @tasks.loop(time=time(hour=2, minute=0, tzinfo=eastern))
     async def run(self):
         try:
             yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
             self.schedule.set_date(yesterday)
             await self.schedule.fetch_full_schedule()
-            games: list[Game] = await self.schedule.get_schedule()
+            games, failures = await Game.init_many(game_data['id'] for game_data in self.schedule.schedule)
+
+            for delay in RETRY_DELAYS:
+                if not failures:
+                    break
+                for game_id, e in failures.items():
+                    self.log.warning(f"Failed to fetch game {game_id}, retrying in {delay}s: {e}")
+                await asyncio.sleep(delay)
+                retried, failures = await Game.init_many(failures)
+                games.extend(retried)
 
-            for game in games:
+            if failures:
+                # a missing game would count every pick on it as a loss
+                for game_id, e in failures.items():
+                    self.log.error(f"Failed to fetch game {game_id}: {e}")
+                return
+
+            for game in list(games):
                 if game.is_ppd or game.is_cancelled or not game.is_regular_season:
                     games.remove(game)
 
@@ -59,14 +67,14 @@ class CheckWinners(commands.Cog):
                 else:
                     season = str(now.year) +str(now.year + 1)
                 self.log.info(f"Checking winners for {len(games)} games.")
-                winners = [game.winning_team_id for game in games]
-
-                user_picks = await self.get_picked_teams()
+                winners = {game.game_id: game.winning_team_id for game in games}
 
-                for user in user_picks:
-                    for pick in user_picks[user]:
-                        pick = int(pick)
-                        await self.db.update_record(user, pick in winners, season)
+                settled = await self.db.settle_games(winners, season)
+                if settled:
+                    # re-render the cached leaderboard pages from the new standings
+                    await leaderboard.refresh(season)
+                if settled < len(winners):
+                    self.log.info(f"{len(winners) - settled} games were already settled.")
         except Exception as e:
             self.log.exception("Error checking winners")
 
@@ -1,5 +1,6 @@
 from hockey.game import Game
 from hockey.schedule import Schedule
+from hockey.state import GameEvent, PUCK_DROP, POSTPONED, FINAL
 from util import settings
 from util.logger import setup_logger
 
@@ -7,6 +8,7 @@ from discord.utils import get
 from util.game_view import GameView
 from util import create_embed
 from database.pickems_database import PickemsDatabase
+from database.pick_store import get_pick_store
 
 from discord.ext import tasks, commands
 
@@ -24,11 +26,25 @@ class Pickems(commands.Cog):
         self.schedule = Schedule()
         self.db = PickemsDatabase()
         self.log = setup_logger(__name__, 'log/pickems.log')
+        self.game_state = bot.game_state
+        self.posted_games = set()
+        self.locked_games = set()
+
+        # the GameStateService polls the slate; lock buttons when a game starts
+        self.subscriptions = [
+            (PUCK_DROP, self.on_game_started),
+            (POSTPONED, self.on_game_started),
+            (FINAL, self.on_game_started)
+        ]
+        for kind, callback in self.subscriptions:
+            self.game_state.subscribe(kind, callback)
 
         self.run.start()
         self.log.info("Pickems initialized.")
     
     def cog_unload(self):
+        for kind, callback in self.subscriptions:
+            self.game_state.unsubscribe(kind, callback)
         self.run.cancel()
         self.log.info("Pickems unloaded.")
     
@@ -41,48 +57,37 @@ class Pickems(commands.Cog):
             self.log.exception("Error posting game")
             return None
     
-    async def monitor_games(self, games: list[Game]):
-        locked_games = []
-
-        while True:
-            for game in games:
-                if game.game_id in locked_games:
-                    continue
-
-                await game.refresh()
+    async def on_game_started(self, event: GameEvent):
+        if event.game_id not in self.posted_games or event.game_id in self.locked_games:
+            return
+        await self.lock_game(event.game)
+
+    async def lock_game(self, game: Game):
+        # stop taking picks before anything else, even if the buttons can't be disabled
+        get_pick_store().lock(game.game_id)
+        message_id = await self.db.get_message(game.game_id)
+        if not message_id:
+            self.log.error(f"Game {game.game_id} is live but no message id found in db.")
+            self.locked_games.add(game.game_id)
+            return
+
+        channel_id = int(message_id.split('-')[0])
+        message_id = int(message_id.split('-')[1])
+        channel = self.bot.get_channel(channel_id)
+        message = await channel.fetch_message(message_id)
+
+        buttons = message.components[0].children[0]
+
+        if not buttons.disabled:
+            self.log.info(f"Disabling buttons for game {game.game_id}")
+            view = GameView(game, disabled=True)
+            await message.edit(view=view)
+        else:
+            self.log.info(f"Buttons already disabled for game {game.game_id}")
+        self.locked_games.add(game.game_id)
 
-                now = datetime.now(zoneinfo.ZoneInfo("UTC"))
-
-                if now >= game.raw_game_time or game.is_live or game.is_ppd or game.is_final:
-                    message_id = await self.db.get_message(game.game_id)
-                    if not message_id:
-                        self.log.error(f"Game {game.game_id} is live but no message id found in db.")
-                        locked_games.append(game.game_id)
-                        continue
-
-                    channel_id = int(message_id.split('-')[0])
-                    message_id = int(message_id.split('-')[1])
-                    channel = self.bot.get_channel(channel_id)
-                    message = await channel.fetch_message(message_id)
-
-                    buttons = message.components[0].children[0]
-
-                    if not buttons.disabled:
-                        self.log.info(f"Disabling buttons for game {game.game_id}")
-                        view = GameView(game, disabled=True)
-                        await message.edit(view=view)
-                        locked_games.append(game.game_id)
-                    elif game.game_id not in locked_games:
-                        self.log.info(f"{game.game_id} not in locked games")
-                        locked_games.append(game.game_id)
-                
-                if len(locked_games) == len(games):
-                    self.log.info("All games locked.")
-                    return
-            self.log.info(f"Lenght of locked games: {len(locked_games)} Length of games: {len(games)}")
-            now = datetime.now()
-            sleep_time = 60*(30 - now.minute % 30) - now.second
-            await asyncio.sleep(sleep_time)
+        if self.posted_games <= self.locked_games:
+            self.log.info("All games locked.")
 
     @tasks.loop(minutes=1)
     async def run(self):
@@ -95,11 +100,11 @@ class Pickems(commands.Cog):
 
         self.schedule.set_date(now.strftime('%Y-%m-%d'))
         await self.schedule.fetch_full_schedule()
-        games: list[Game] = []
-
-        if self.schedule.schedule:
-            for game_data in self.schedule.schedule:
-                games.append(await Game.init(game_data['id']))
+        self.posted_games.clear()
+        self.locked_games.clear()
+        games, failures = await Game.init_many(game_data['id'] for game_data in self.schedule.schedule)
+        for game_id, e in failures.items():
+            self.log.error(f"Failed to fetch game {game_id}: {e}")
 
         games = [game for game in games if game.is_regular_season]
 
@@ -122,8 +127,13 @@ class Pickems(commands.Cog):
                         await self.db.create_message(message_id, game_id)
 
                     self.bot.add_view(view, message_id=int(message_id.split('-')[1]))
+                    self.posted_games.add(game.game_id)
 
-            await self.monitor_games(games)
+                    # the game may have started before the bot posted or restarted
+                    now = datetime.now(zoneinfo.ZoneInfo("UTC"))
+                    started = game.raw_game_time is not None and now >= game.raw_game_time
+                    if started or game.is_live or game.is_ppd or game.is_final:
+                        await self.lock_game(game)
 
         # sleep until 3am ET
         self.log.info("Sleeping until 3am ET")
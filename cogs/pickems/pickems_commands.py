@@ -27,7 +27,7 @@ class PickemsCommands(commands.Cog):
     async def get_leaderboard(self, ctx, season: int = None):
         self.log.info(f"get_leaderboard called by {ctx.author.name} in {ctx.guild.name} for season {season}")
         # get the paginated leaderboard
-        paginator = await leaderboard.setup_paginator(str(season))
+        paginator = await leaderboard.setup_paginator(str(season) if season else None)
 
         if not season:
             season = "the current season"
@@ -55,7 +55,7 @@ class PickemsCommands(commands.Cog):
         # make user a string
         user_str = str(user.id)
         # get the user's position
-        position = await leaderboard.get_user_position(user_str, str(season))
+        position = await leaderboard.get_user_position(user_str, str(season) if season else None)
 
         if position:
             # extract winsm losses, and position
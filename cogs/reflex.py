@@ -5,12 +5,23 @@ from discord.utils import get
 import aiofiles
 
 from util import settings
+from util.reactions import get_dispatcher
+
+# only these roles' reactions on a ReactAlert message are reported
+ALERT_ROLES = [518831246034599948, 842546366840569876, 437381518424408064, 384844284089729034, 364885679425060864]
 
 class Reflex(commands.Cog):
 	def __init__(self, bot):
 		self.bot = bot
 		self.cfg = settings.Settings()
 
+		# reactions are filtered by the shared dispatcher before reaching on_react_alert
+		self.reactions = get_dispatcher(bot)
+		self.reactions.register(self.on_react_alert, roles=ALERT_ROLES, by_message_id=True)
+
+	def cog_unload(self):
+		self.reactions.unregister(self.on_react_alert)
+
 	@commands.Cog.listener()
 	async def on_thread_join(self, thread):
 		await thread.join()
@@ -42,17 +53,7 @@ class Reflex(commands.Cog):
 				user = await self.bot.fetch_user(int(user_id))
 				await user.send(message_to_send)
 
-	@commands.Cog.listener()
-	async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-		messages_existing = await self.cfg.get_messages('ReactAlert')
-		if not messages_existing or payload.message_id not in messages_existing:
-			return
-
-		good_roles = [518831246034599948, 842546366840569876, 437381518424408064, 384844284089729034, 364885679425060864]
-		has_role = any(role.id in good_roles for role in payload.member.roles)
-		if not has_role:
-			return
-		
+	async def on_react_alert(self, payload: discord.RawReactionActionEvent):
 		if payload.emoji.name == '🎅':
 			# add role 781959166055022593 to user
 			role = get(payload.member.guild.roles, id=781959166055022593)
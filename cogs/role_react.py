@@ -4,6 +4,7 @@ from discord.utils import get
 
 from util import settings
 from util.logger import setup_logger
+from util.reactions import get_dispatcher
 
 class RoleReact(commands.Cog):
 	def __init__(self, bot: commands.Bot):
@@ -11,18 +12,18 @@ class RoleReact(commands.Cog):
 		self.cfg = settings.Settings()
 		self.log = setup_logger(__name__, 'log/role_react.log')
 
+		# reactions are filtered by the shared dispatcher before reaching on_react_alert
+		self.reactions = get_dispatcher(bot)
+		self.reactions.register(self.on_react_alert)
+
 		self.log.info("RoleReact cog initialized.")
 
 	def cog_unload(self):
+		self.reactions.unregister(self.on_react_alert)
 		self.log.info("RoleReact cog unloaded.")
-	@commands.Cog.listener()
-	async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-		self.log.info(f"Reaction added: {payload.emoji} by {payload.member}")
-		messages_existing = await self.cfg.get_messages('ReactAlert')
-		if not messages_existing or f"{payload.channel_id}-{payload.message_id}" not in messages_existing:
-			return
 
-		
+	async def on_react_alert(self, payload: discord.RawReactionActionEvent):
+		self.log.info(f"Reaction added: {payload.emoji} by {payload.member}")
 		if payload.emoji.name == '🎅':
 			# add role 781959166055022593 to user
 			role = get(payload.member.guild.roles, id=781959166055022593)
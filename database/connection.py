@@ -0,0 +1,158 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+import aiosqlite
+
+# read-only connections kept open next to the single writer
+READERS = 3
+
+# how long a connection waits on a locked database before failing, in ms
+BUSY_TIMEOUT = 5000
+
+# prepared statements kept per connection by sqlite3
+STATEMENT_CACHE = 256
+
+READ_PREFIXES = ("SELECT", "WITH")
+
+class ConnectionPool:
+    def __init__(self, path: str, readers: int = READERS):
+        """
+        Initialize the ConnectionPool for one SQLite file.
+
+        Connections open on first use and stay open until close(). All
+        writes go through one connection, serialized by a lock; reads are
+        spread over a few query-only connections, which WAL lets run
+        alongside a write.
+        """
+        self.path = path
+        self.readers = readers
+
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._idle: "asyncio.Queue[aiosqlite.Connection]" = asyncio.Queue()
+        self._connections: List[aiosqlite.Connection] = []
+        self._write_lock = asyncio.Lock()
+        self._open_lock = asyncio.Lock()
+
+    async def _connect(self) -> aiosqlite.Connection:
+        """
+        Open a connection with the pool's pragmas.
+        """
+        conn = await aiosqlite.connect(self.path, cached_statements=STATEMENT_CACHE)
+        # with WAL, NORMAL only syncs at checkpoints; a power loss can drop
+        # the last commits but never corrupts the database
+        await conn.executescript(f"""
+            PRAGMA busy_timeout = {BUSY_TIMEOUT};
+            PRAGMA foreign_keys = ON;
+            PRAGMA synchronous = NORMAL;
+        """)
+        self._connections.append(conn)
+        return conn
+
+    async def open(self) -> None:
+        """
+        Open the writer and readers if they aren't open yet.
+        """
+        if self._writer is not None:
+            return
+        async with self._open_lock:
+            if self._writer is not None:
+                return
+            try:
+                writer = await self._connect()
+                # journal_mode is stored in the file, so set it before any reader opens
+                await writer.executescript("PRAGMA journal_mode = WAL;")
+                for _ in range(self.readers):
+                    reader = await self._connect()
+                    await reader.executescript("PRAGMA query_only = ON;")
+                    self._idle.put_nowait(reader)
+            except Exception:
+                # don't leave half a pool's threads running
+                for conn in self._connections:
+                    await conn.close()
+                self._connections = []
+                self._idle = asyncio.Queue()
+                raise
+            self._writer = writer
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Hold the writer for a transaction, committing on exit or rolling back on error.
+        """
+        await self.open()
+        async with self._write_lock:
+            try:
+                yield self._writer
+            except BaseException:
+                await self._writer.rollback()
+                raise
+            await self._writer.commit()
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Borrow a read-only connection, or the writer if there are no readers.
+        """
+        await self.open()
+        if not self.readers:
+            async with self._write_lock:
+                yield self._writer
+            return
+        conn = await self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put_nowait(conn)
+
+    async def execute(self, statement: str, values: Sequence[Any] = ()) -> int:
+        """
+        Run a write in its own transaction and get the number of rows changed.
+        """
+        async with self.transaction() as conn:
+            async with conn.execute(statement, values) as cursor:
+                return cursor.rowcount
+
+    async def fetch(self, statement: str, values: Sequence[Any] = ()) -> List[Any]:
+        """
+        Run a statement and get its rows. Anything but a SELECT runs on the writer.
+        """
+        if statement.lstrip().upper().startswith(READ_PREFIXES):
+            async with self.reader() as conn:
+                async with conn.execute(statement, values) as cursor:
+                    return await cursor.fetchall()
+        async with self.transaction() as conn:
+            async with conn.execute(statement, values) as cursor:
+                return await cursor.fetchall()
+
+    async def close(self) -> None:
+        """
+        Close every connection once in-flight writes finish. The pool reopens on next use.
+        """
+        async with self._open_lock, self._write_lock:
+            for conn in self._connections:
+                try:
+                    await conn.close()
+                except Exception as e:
+                    print(f"Failed to close {self.path}: {e}")
+            self._connections = []
+            self._idle = asyncio.Queue()
+            self._writer = None
+
+_pools: Dict[str, ConnectionPool] = {}
+
+def get_pool(path: str) -> ConnectionPool:
+    """
+    Get the shared ConnectionPool for a database file.
+    """
+    pool = _pools.get(path)
+    if pool is None:
+        pool = _pools[path] = ConnectionPool(path)
+    return pool
+
+async def close_all() -> None:
+    """
+    Close every pool; call on shutdown so WAL contents are checkpointed.
+    """
+    for pool in list(_pools.values()):
+        await pool.close()
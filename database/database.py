@@ -1,52 +1,39 @@
-import aiosqlite
 import os
 from dotenv import load_dotenv
+from database.connection import get_pool
 from util.logger import setup_logger
 
 load_dotenv()
 
 class Database:
     def __init__(self):
-        self.conn = None
+        self.pool = None
         self.log = setup_logger(__name__, 'log/db.log')
 
     async def login(self):
         dbinfo = "database/" + os.getenv("DB_NAME")
 
-        self.conn = await aiosqlite.connect(dbinfo)
-        await self.conn.execute("PRAGMA foreign_keys = ON;")  # Enable foreign key support
+        # connections are shared by every instance and stay open; see database.connection
+        self.pool = get_pool(dbinfo)
 
     async def query(self, statement, *values):
-        if self.conn is None:
+        if self.pool is None:
             await self.login()
-        good = False
         try:
-            async with self.conn.execute(statement, values) as cursor:
-                await self.conn.commit()
-                good = True
+            await self.pool.execute(statement, values)
+            return True
         except Exception as e:
-            await self.conn.rollback()
             self.log.exception("Error committing")
-        finally:
-            await self.conn.close()
-            self.conn = None
-        return good
+            return False
 
     async def fetch(self, statement, *values):
-        if self.conn is None:
+        if self.pool is None:
             await self.login()
-        data = None
         try:
-            async with self.conn.execute(statement, values) as cursor:
-                data = await cursor.fetchall()
-                await self.conn.commit()
+            return await self.pool.fetch(statement, values)
         except Exception as e:
-            await self.conn.rollback()
             self.log.exception("Error committing")
-        finally:
-            await self.conn.close()
-            self.conn = None
-        return data
+            return None
 
     async def create_incident(self, user_id, description, decision, reported_by, reported_at):
         sql = """INSERT INTO incidents (user_id, description, decision, reported_by, reported_at)
@@ -0,0 +1,185 @@
+import asyncio
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Dict, Optional, Set, Tuple
+
+from database.pickems_database import PickemsDatabase
+from util.logger import setup_logger
+
+# how often buffered picks are written to the database, in seconds; a crash
+# (not a clean shutdown) can lose at most this much of the latest picks
+FLUSH_INTERVAL = 1.0
+
+# (user_id, game_id)
+PickKey = Tuple[str, int]
+
+class PickResult(str, Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"
+    LOCKED = "locked"
+
+class PickStore:
+    def __init__(self, db: Optional[PickemsDatabase] = None, flush_interval: float = FLUSH_INTERVAL):
+        """
+        Initialize the PickStore, which answers pick clicks from memory and writes them behind.
+
+        Each game's picks are loaded once, on its first click. Picks are
+        acknowledged as soon as they're in memory and written in one
+        transaction every flush_interval, with repeated clicks on the same
+        game collapsing into one write. close() writes whatever is left.
+        """
+        self.db = db or PickemsDatabase()
+        self.flush_interval = flush_interval
+        self.log = setup_logger(__name__, 'log/db.log')
+
+        self._picks: Dict[PickKey, str] = {}
+        self._pending: Dict[PickKey, tuple] = {}
+        self._loading: Dict[int, asyncio.Task] = {}
+        self._loaded: Set[int] = set()
+        self._locked: Set[int] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+
+    async def _load(self, game_id: int) -> None:
+        """
+        Load a game's picks from the database once, keeping any newer picks in memory.
+        """
+        if game_id in self._loaded:
+            return
+        task = self._loading.get(game_id)
+        if task is None:
+            task = self._loading[game_id] = asyncio.create_task(self.db.get_game_picks(game_id))
+        try:
+            picks = await asyncio.shield(task)
+        except Exception:
+            # let the next click try again
+            if self._loading.get(game_id) is task:
+                del self._loading[game_id]
+            raise
+        # every click waiting on the same load gets here; merge the picks once
+        if game_id in self._loaded or self._loading.get(game_id) is not task:
+            return
+        for user_id, team_id in picks.items():
+            self._picks.setdefault((str(user_id), game_id), str(team_id))
+        self._loaded.add(game_id)
+        del self._loading[game_id]
+
+    def lock(self, game_id: int) -> None:
+        """
+        Reject any further picks for a game, and forget its cached picks.
+        """
+        game_id = int(game_id)
+        self._locked.add(game_id)
+        self._loading.pop(game_id, None)
+        self._loaded.discard(game_id)
+        for key in [key for key in self._picks if key[1] == game_id]:
+            del self._picks[key]
+
+    def is_locked(self, game_id: int, starts_at: Optional[datetime] = None) -> bool:
+        """
+        Check if a game is locked, or has reached its start time.
+        """
+        if int(game_id) in self._locked:
+            return True
+        return starts_at is not None and datetime.now(timezone.utc) >= starts_at
+
+    async def submit(self, user_id: int, game_id: int, team_id: str, season: str, game_date: str,
+                     picked_at: datetime, starts_at: Optional[datetime] = None) -> PickResult:
+        """
+        Record a pick, or say why it wasn't. The database write happens later.
+        """
+        game_id = int(game_id)
+        if self.is_locked(game_id, starts_at):
+            return PickResult.LOCKED
+
+        await self._load(game_id)
+        # the game may have locked while its picks loaded
+        if self.is_locked(game_id, starts_at):
+            return PickResult.LOCKED
+
+        key = (str(user_id), game_id)
+        team_id = str(team_id)
+        previous = self._picks.get(key)
+        if previous == team_id:
+            return PickResult.UNCHANGED
+
+        self._picks[key] = team_id
+        self._pending[key] = (user_id, game_id, team_id, season, picked_at, game_date)
+        self._start()
+        self._wake.set()
+        return PickResult.CREATED if previous is None else PickResult.UPDATED
+
+    def _start(self) -> None:
+        """
+        Start the flush loop if it isn't running.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        """
+        Flush buffered picks every flush_interval while there are any.
+        """
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Write every buffered pick in one transaction. Failed picks stay buffered for the next flush.
+        """
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        try:
+            await self.db.save_picks(list(batch.values()))
+        except asyncio.CancelledError:
+            # saving is idempotent, so close() can safely write these again
+            self._requeue(batch)
+            raise
+        except Exception:
+            self.log.exception(f"Failed to save {len(batch)} picks")
+            self._requeue(batch)
+            self._wake.set()
+            return
+        self.log.info(f"Saved {len(batch)} picks")
+
+    def _requeue(self, batch: Dict[PickKey, tuple]) -> None:
+        """
+        Put unsaved picks back, unless a newer click for the same game replaced them.
+        """
+        for key, pick in batch.items():
+            self._pending.setdefault(key, pick)
+
+    @property
+    def pending(self) -> int:
+        """
+        Get the number of picks not yet written.
+        """
+        return len(self._pending)
+
+    async def close(self) -> None:
+        """
+        Stop the flush loop and write what's left.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        if self._pending:
+            self.log.error(f"{len(self._pending)} picks could not be saved on shutdown")
+
+_store: Optional[PickStore] = None
+
+def get_pick_store() -> PickStore:
+    """
+    Get the PickStore shared by every GameView.
+    """
+    global _store
+    if _store is None:
+        _store = PickStore()
+    return _store
@@ -1,54 +1,104 @@
-import aiosqlite
 import os
 from dotenv import load_dotenv
 from datetime import datetime
+from database.connection import get_pool
 from util.logger import setup_logger
 
+# schema changes, applied in order once per database file; the file's
+# PRAGMA user_version records how many have run, so only append here
+MIGRATIONS = [
+    # settlement: one Records row per user per season, and the games already counted
+    [
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_records_user_season ON Records (user_id, season);",
+        """CREATE TABLE IF NOT EXISTS SettledGames (
+            game_id INTEGER PRIMARY KEY,
+            season TEXT NOT NULL,
+            settled_at TEXT NOT NULL
+        );""",
+    ],
+    # picks are looked up by the date of the game rather than by scanning date(picked_at);
+    # existing picks get the Eastern date they were made. The old lookups differed: date()
+    # turns the offset timestamp into its UTC date, so evening picks landed on the next day
+    [
+        "ALTER TABLE Picks ADD COLUMN game_date TEXT;",
+        "UPDATE Picks SET game_date = substr(picked_at, 1, 10);",
+        "CREATE INDEX IF NOT EXISTS idx_picks_date_user ON Picks (game_date, user_id, team_id);",
+        "CREATE INDEX IF NOT EXISTS idx_picks_user_game ON Picks (user_id, game_id, team_id);",
+        "CREATE INDEX IF NOT EXISTS idx_picks_game ON Picks (game_id, user_id, team_id);",
+        "ANALYZE Picks;",
+    ],
+    # the leaderboard, kept up to date at settlement instead of recomputed by the Leaderboard view
+    [
+        """CREATE TABLE IF NOT EXISTS LeaderboardStandings (
+            season TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            wins INTEGER NOT NULL,
+            losses INTEGER NOT NULL,
+            win_pct REAL NOT NULL,
+            rank INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (season, user_id)
+        ) WITHOUT ROWID;""",
+        "CREATE INDEX IF NOT EXISTS idx_standings_rank ON LeaderboardStandings (season, rank);",
+        """INSERT OR REPLACE INTO LeaderboardStandings (season, user_id, wins, losses, win_pct)
+        SELECT season, user_id, wins, losses, COALESCE(CAST(wins AS REAL) / NULLIF(wins + losses, 0), 0)
+        FROM Records;""",
+        """UPDATE LeaderboardStandings SET rank = ranked.rank
+        FROM (
+            SELECT season, user_id, RANK() OVER (PARTITION BY season ORDER BY win_pct DESC, wins DESC) AS rank
+            FROM LeaderboardStandings
+        ) AS ranked
+        WHERE LeaderboardStandings.season = ranked.season AND LeaderboardStandings.user_id = ranked.user_id;""",
+    ],
+]
+
+_migrated = set()
+
 class PickemsDatabase:
     def __init__(self):
         load_dotenv()
         self.pool = None
-        self.conn = None
         self.log = setup_logger(__name__, 'log/db.log')
 
     async def login(self):
         dbinfo = "database/" + os.getenv("PICKEMS_DB_NAME")
 
-        self.conn = await aiosqlite.connect(dbinfo)
-        await self.conn.execute("PRAGMA foreign_keys = ON;")  # Enable foreign key support
+        # connections are shared by every instance and stay open; see database.connection
+        self.pool = get_pool(dbinfo)
+        if dbinfo not in _migrated:
+            await self.migrate()
+            _migrated.add(dbinfo)
+
+    async def migrate(self):
+        async with self.pool.transaction() as conn:
+            await conn.execute("BEGIN IMMEDIATE;")
+            async with conn.execute("PRAGMA user_version;") as cursor:
+                version = (await cursor.fetchone())[0]
+
+            for version, statements in enumerate(MIGRATIONS[version:], version + 1):
+                self.log.info(f"Applying migration {version}")
+                for statement in statements:
+                    await conn.execute(statement)
+                await conn.execute(f"PRAGMA user_version = {version};")
 
     async def query(self, statement, *values):
-        if self.conn is None:
+        if self.pool is None:
             await self.login()
-        good = False
         try:
-            async with self.conn.execute(statement, values) as cursor:
-                await self.conn.commit()
-                good = True
+            await self.pool.execute(statement, values)
+            return True
         except Exception as e:
-            await self.conn.rollback()
             self.log.exception("Error committing")
             self.log.info(f"Query: {statement} with values {values}")
-        finally:
-            await self.conn.close()
-            self.conn = None
-        return good
+            return False
 
     async def fetch(self, statement, *values):
-        if self.conn is None:
+        if self.pool is None:
             await self.login()
-        data = None
         try:
-            async with self.conn.execute(statement, values) as cursor:
-                data = await cursor.fetchall()
-                await self.conn.commit()
+            return await self.pool.fetch(statement, values)
         except Exception as e:
-            await self.conn.rollback()
             self.log.exception("Error committing")
-        finally:
-            await self.conn.close()
-            self.conn = None
-        return data
+            return None
 
     async def create_message(self, message_id, game_id):
         sql = """INSERT INTO Messages (message_id, game_id)
@@ -63,11 +113,11 @@ class PickemsDatabase:
 
         return m[0][0] if m else None
     
-    async def create_pick(self, user_id, game_id, team_id, season, picked_at):
-        sql = """INSERT INTO Picks (user_id, game_id, team_id, season, picked_at)
-        VALUES (?, ?, ?, ?, ?);"""
+    async def create_pick(self, user_id, game_id, team_id, season, picked_at, game_date):
+        sql = """INSERT INTO Picks (user_id, game_id, team_id, season, picked_at, game_date)
+        VALUES (?, ?, ?, ?, ?, ?);"""
 
-        return await self.query(sql, user_id, game_id, team_id, season, picked_at)
+        return await self.query(sql, user_id, game_id, team_id, season, picked_at, game_date)
     
     async def get_pick(self, user_id, game_id):
         sql = """SELECT team_id FROM Picks WHERE user_id = ? AND game_id = ?"""
@@ -83,6 +133,36 @@ class PickemsDatabase:
 
         return await self.query(sql, team_id, picked_at, user_id, game_id)
     
+    # get every pick for a game
+    # return dict of user_id to team_id
+    async def get_game_picks(self, game_id):
+        sql = "SELECT user_id, team_id FROM Picks WHERE game_id = ?;"
+
+        picks = await self.fetch(sql, game_id)
+        if picks is None:
+            raise RuntimeError(f"Failed to load picks for game {game_id}")
+
+        return {p[0]: p[1] for p in picks}
+
+    # write a batch of picks in one transaction, replacing any earlier pick for the same game
+    # picks: list of (user_id, game_id, team_id, season, picked_at, game_date)
+    async def save_picks(self, picks):
+        if self.pool is None:
+            await self.login()
+
+        async with self.pool.transaction() as conn:
+            for user_id, game_id, team_id, season, picked_at, game_date in picks:
+                sql = """UPDATE Picks
+                SET team_id = ?, picked_at = ?
+                WHERE user_id = ? AND game_id = ?;"""
+                async with conn.execute(sql, (team_id, picked_at, user_id, game_id)) as cursor:
+                    if cursor.rowcount:
+                        continue
+
+                sql = """INSERT INTO Picks (user_id, game_id, team_id, season, picked_at, game_date)
+                VALUES (?, ?, ?, ?, ?, ?);"""
+                await conn.execute(sql, (user_id, game_id, team_id, season, picked_at, game_date))
+
     # get all records from the Records table
     # fields: user_id, wins, losses
     # put into a dict with user_id as key
@@ -94,16 +174,17 @@ class PickemsDatabase:
 
         return {r[0]: r[1:] for r in records}
     
-    # get the leaderboard from the leaderboard view
+    # get the leaderboard from the LeaderboardStandings table, in rank order
     # fields: user_id, wins, losses, win_pct, rank
     # put into a dict with user_id as key
     # return dict
     async def get_leaderboard(self, season):
-        sql = "SELECT * FROM Leaderboard WHERE season = ?;"
+        sql = """SELECT user_id, wins, losses, win_pct, rank FROM LeaderboardStandings
+        WHERE season = ? ORDER BY rank, user_id;"""
 
         leaderboard = await self.fetch(sql, season)
 
-        return {l[0]: l[1:-1] for l in leaderboard}
+        return {l[0]: l[1:] for l in leaderboard}
     
     # get the max updated_at from the Records table
     # return datetime
@@ -114,24 +195,25 @@ class PickemsDatabase:
 
         return updated_at[0][0]
     
-    # get the record and rank from the leaderboard view for a user
+    # get the record and rank from the LeaderboardStandings table for a user
     # fields: user_id, wins, losses, win_pct, rank
     # return tuple
     async def get_user_leaderboard_position(self, user_id, season):
-        sql = "SELECT * FROM Leaderboard WHERE user_id = ? AND season = ?;"
+        sql = """SELECT user_id, wins, losses, win_pct, rank FROM LeaderboardStandings
+        WHERE season = ? AND user_id = ?;"""
 
-        user = await self.fetch(sql, user_id, season)
+        user = await self.fetch(sql, season, user_id)
 
         return user[0] if user else None
     
-    # get the user's picks for a date
+    # get the user's picks for games on a date
     # fields: team_id
     # return list of team_ids
     async def get_user_picks(self, user_id, date):
         sql = """SELECT team_id FROM Picks
-        WHERE user_id = ? AND date(picked_at) = ?;"""
+        WHERE game_date = ? AND user_id = ?;"""
 
-        picks = await self.fetch(sql, user_id, date)
+        picks = await self.fetch(sql, date, user_id)
 
         return [p[0] for p in picks]
 
@@ -143,7 +225,7 @@ class PickemsDatabase:
     
     async def get_picks(self, date):
         sql = """SELECT user_id, team_id FROM Picks
-        WHERE date(picked_at) = ?;"""
+        WHERE game_date = ?;"""
         
         picks = await self.fetch(sql, date)
 
@@ -157,26 +239,87 @@ class PickemsDatabase:
         return r
     
     async def update_record(self, user_id, win, season):
+        if self.pool is None:
+            await self.login()
         now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-        #check if user's record exists
-        sql = "SELECT * FROM Records WHERE user_id = ? and season = ?;"
-        record_exists = await self.fetch(sql, user_id, season)
-        
-        if not record_exists:
-            #create user's record
+        sql = """INSERT INTO Records (user_id, wins, losses, season, updated_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (user_id, season) DO UPDATE
+        SET wins = wins + excluded.wins, losses = losses + excluded.losses, updated_at = excluded.updated_at;"""
+
+        try:
+            async with self.pool.transaction() as conn:
+                await conn.execute(sql, (user_id, int(win), int(not win), season, now))
+                await self._update_standings(conn, season, [user_id])
+            return True
+        except Exception as e:
+            self.log.exception("Error committing")
+            return False
+
+    # copy users' records into LeaderboardStandings and re-rank the season
+    # runs inside the caller's transaction; only rows whose rank moved are rewritten
+    async def _update_standings(self, conn, season, user_ids):
+        sql = """INSERT INTO LeaderboardStandings (season, user_id, wins, losses, win_pct)
+        SELECT season, user_id, wins, losses, COALESCE(CAST(wins AS REAL) / NULLIF(wins + losses, 0), 0)
+        FROM Records WHERE season = ? AND user_id = ?
+        ON CONFLICT (season, user_id) DO UPDATE
+        SET wins = excluded.wins, losses = excluded.losses, win_pct = excluded.win_pct;"""
+        await conn.executemany(sql, [(season, user_id) for user_id in user_ids])
+
+        sql = """UPDATE LeaderboardStandings SET rank = ranked.rank
+        FROM (
+            SELECT user_id, RANK() OVER (ORDER BY win_pct DESC, wins DESC) AS rank
+            FROM LeaderboardStandings WHERE season = ?
+        ) AS ranked
+        WHERE LeaderboardStandings.season = ? AND LeaderboardStandings.user_id = ranked.user_id
+        AND LeaderboardStandings.rank != ranked.rank;"""
+        await conn.execute(sql, (season, season))
+
+    # count every pick on the given games towards its user's record and the leaderboard, in one transaction
+    # winners: dict of game_id to winning team_id
+    # games already in SettledGames are skipped, so re-running a night is harmless
+    # return number of games settled
+    async def settle_games(self, winners, season):
+        if self.pool is None:
+            await self.login()
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        async with self.pool.transaction() as conn:
+            await conn.execute("BEGIN IMMEDIATE;")
+
+            marks = ", ".join("?" * len(winners))
+            sql = f"SELECT game_id FROM SettledGames WHERE game_id IN ({marks});"
+            async with conn.execute(sql, list(winners)) as cursor:
+                settled = {int(row[0]) for row in await cursor.fetchall()}
+
+            unsettled = {game_id: team_id for game_id, team_id in winners.items() if game_id not in settled}
+            if not unsettled:
+                return 0
+
+            marks = ", ".join("?" * len(unsettled))
+            sql = f"SELECT user_id, game_id, team_id FROM Picks WHERE game_id IN ({marks});"
+            async with conn.execute(sql, list(unsettled)) as cursor:
+                picks = await cursor.fetchall()
+
+            # user_id -> [wins, losses]
+            deltas = {}
+            for user_id, game_id, team_id in picks:
+                record = deltas.setdefault(user_id, [0, 0])
+                if int(team_id) == unsettled[int(game_id)]:
+                    record[0] += 1
+                else:
+                    record[1] += 1
+
             sql = """INSERT INTO Records (user_id, wins, losses, season, updated_at)
-            VALUES (?, 0, 0, ?, ?);"""
-            await self.query(sql, user_id, season, now)
-        
-        #update user's record
-        if win:
-            sql = """UPDATE Records
-            SET wins = wins + 1, updated_at = ?
-            WHERE user_id = ?;"""
-        else:
-            sql = """UPDATE Records
-            SET losses = losses + 1, updated_at = ?
-            WHERE user_id = ?;"""
-        
-        return await self.query(sql, now, user_id)
\ No newline at end of file
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (user_id, season) DO UPDATE
+            SET wins = wins + excluded.wins, losses = losses + excluded.losses, updated_at = excluded.updated_at;"""
+            await conn.executemany(sql, [(user_id, wins, losses, season, now) for user_id, (wins, losses) in deltas.items()])
+            await self._update_standings(conn, season, list(deltas))
+
+            sql = "INSERT INTO SettledGames (game_id, season, settled_at) VALUES (?, ?, ?);"
+            await conn.executemany(sql, [(game_id, season, now) for game_id in unsettled])
+
+        self.log.info(f"Settled {len(unsettled)} games: {len(picks)} picks for {len(deltas)} users")
+        return len(unsettled)
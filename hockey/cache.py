@@ -0,0 +1,140 @@
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from hockey.client import HockeyClient, get_client
+from hockey.snapshot import GameSnapshot
+
+# seconds a landing payload stays fresh, keyed by the API's gameState
+GAME_STATE_TTLS = {
+    "LIVE": 10,
+    "CRIT": 10,
+    "PRE": 60,
+    "FUT": 60 * 15,
+    "OVER": 60,
+    "FINAL": float('inf'),
+    "OFF": float('inf')
+}
+DEFAULT_TTL = 30
+MAX_ENTRIES = 256
+
+class GameCache:
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_entries: int = MAX_ENTRIES):
+        """
+        Initialize the GameCache, a TTL cache of landing payloads keyed by game ID.
+
+        Concurrent misses for the same game share one in-flight request.
+        """
+        self.ttls = ttls or GAME_STATE_TTLS
+        self.max_entries = max_entries
+
+        self._entries: 'OrderedDict[int, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self._in_flight: Dict[int, asyncio.Future] = {}
+        # game_id -> (payload, snapshot parsed from it)
+        self._parsed: Dict[int, Tuple[Dict[str, Any], GameSnapshot]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def ttl_for(self, payload: Dict[str, Any]) -> float:
+        """
+        Get the TTL for a payload based on its game state.
+        """
+        return self.ttls.get(payload.get('gameState'), DEFAULT_TTL)
+
+    def peek(self, game_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get a fresh cached payload without loading or counting a lookup.
+        """
+        entry = self._entries.get(game_id)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def put(self, game_id: int, payload: Dict[str, Any]) -> None:
+        """
+        Store a payload, evicting the least recently used entry when full.
+        """
+        self._entries[game_id] = (time.monotonic() + self.ttl_for(payload), payload)
+        self._entries.move_to_end(game_id)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._parsed.pop(evicted, None)
+
+    def invalidate(self, game_id: int) -> None:
+        """
+        Drop a cached payload so the next lookup goes upstream.
+        """
+        self._entries.pop(game_id, None)
+        self._parsed.pop(game_id, None)
+
+    def snapshot(self, game_id: int, payload: Dict[str, Any]) -> GameSnapshot:
+        """
+        Get the GameSnapshot for a payload, parsing it only the first time it's seen.
+        """
+        parsed = self._parsed.get(game_id)
+        if parsed is not None and parsed[0] is payload:
+            return parsed[1]
+        snapshot = GameSnapshot.from_landing(payload)
+        self._parsed[game_id] = (payload, snapshot)
+        return snapshot
+
+    async def get(self, game_id: int, loader: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Get the payload for a game, calling loader only on a miss.
+        """
+        payload = self.peek(game_id)
+        if payload is not None:
+            self.hits += 1
+            self._entries.move_to_end(game_id)
+            return payload
+
+        task = self._in_flight.get(game_id)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(game_id, loader))
+            self._in_flight[game_id] = task
+
+        # shield so one cancelled waiter doesn't cancel the request for the rest
+        return await asyncio.shield(task)
+
+    async def _load(self, game_id: int, loader: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Run the loader and cache its result.
+        """
+        try:
+            payload = await loader()
+            self.put(game_id, payload)
+            return payload
+        finally:
+            self._in_flight.pop(game_id, None)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache counters.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "entries": len(self._entries),
+            "in_flight": len(self._in_flight)
+        }
+
+_game_caches: 'weakref.WeakKeyDictionary[HockeyClient, GameCache]' = weakref.WeakKeyDictionary()
+
+def get_game_cache(client: Optional[HockeyClient] = None) -> GameCache:
+    """
+    Get the shared GameCache for a client.
+    """
+    client = client or get_client()
+    cache = _game_caches.get(client)
+    if cache is None:
+        cache = _game_caches[client] = GameCache()
+    return cache
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Tuple
+
+from hockey.game import Game
+from hockey.schedule import ScheduledGame
+from hockey.snapshot import GameState
+
+# seconds between polls for each phase of a game day
+OFFSEASON_INTERVAL = 60 * 60 * 6
+SCHEDULE_INTERVAL = 60 * 60
+GAME_DAY_SCHEDULE_INTERVAL = 60 * 10
+PREGAME_INTERVAL = 60
+LIVE_INTERVAL = 20
+CRITICAL_INTERVAL = 12
+INTERMISSION_MIN = 20
+INTERMISSION_MAX = 60 * 5
+INTERMISSION_LEAD = 30
+OVER_INTERVAL = 30
+MIN_INTERVAL = 1
+
+# how close a game has to be before the schedule is polled at game-day pace
+GAME_DAY_WINDOW = timedelta(hours=24)
+LATE_GAME_SECONDS = 60 * 5
+
+Cadence = Tuple[float, str]
+
+def schedule_cadence(current_game: Optional[ScheduledGame], now: datetime) -> Cadence:
+    """
+    Get how often the schedule should be polled, and why.
+    """
+    if current_game is None:
+        return OFFSEASON_INTERVAL, "no game scheduled"
+    start = current_game.raw_game_time
+    if current_game.is_live or start is not None and start - now <= GAME_DAY_WINDOW:
+        return GAME_DAY_SCHEDULE_INTERVAL, f"game {current_game.game_id} within a day"
+    return SCHEDULE_INTERVAL, f"next game {current_game.game_id} more than a day away"
+
+def upcoming_cadence(game: ScheduledGame, now: datetime) -> Optional[Cadence]:
+    """
+    Get the time until a not-yet-watched game reaches its pregame window or puck drop.
+    """
+    for moment, label in ((game.raw_pregame_time, "pregame window"), (game.raw_game_time, "puck drop")):
+        if moment is None:
+            continue
+        until = (moment - now).total_seconds()
+        if until > 0:
+            return until, f"{label} for game {game.game_id}"
+    return None
+
+def game_cadence(game: Game, now: datetime) -> Optional[Cadence]:
+    """
+    Get how soon a watched game should be refreshed, and why.
+
+    Uses the game state, the period, the clock and the start time from the
+    game's landing payload. Returns None for games that no longer need polling.
+    """
+    snapshot = game.snapshot
+    state = snapshot.game_state
+    if not state or game.is_final and state != GameState.OVER or game.is_ppd or game.is_cancelled:
+        return None
+
+    if state == GameState.OVER:
+        return OVER_INTERVAL, f"game {game.game_id} over, waiting for final"
+
+    if state.is_upcoming:
+        start = game.raw_game_time
+        if start is None or (start - now).total_seconds() > PREGAME_INTERVAL:
+            return PREGAME_INTERVAL, f"game {game.game_id} in pregame window"
+        return PREGAME_INTERVAL / 2, f"game {game.game_id} about to start"
+
+    seconds_remaining = snapshot.seconds_remaining
+    period = snapshot.period
+
+    if snapshot.in_intermission:
+        # sleep through most of the intermission, waking just before play resumes
+        wait = min(max(seconds_remaining - INTERMISSION_LEAD, INTERMISSION_MIN), INTERMISSION_MAX)
+        return wait, f"game {game.game_id} in intermission after period {period}"
+
+    if state == GameState.CRIT or period > 3 or (period == 3 and seconds_remaining <= LATE_GAME_SECONDS):
+        return CRITICAL_INTERVAL, f"game {game.game_id} late or in overtime ({game.time_remaining})"
+
+    return LIVE_INTERVAL, f"game {game.game_id} live ({game.time_remaining})"
+
+def next_cadence(candidates: Iterable[Optional[Cadence]]) -> Cadence:
+    """
+    Pick the soonest of several cadences.
+    """
+    chosen = None
+    for candidate in candidates:
+        if candidate is not None and (chosen is None or candidate[0] < chosen[0]):
+            chosen = candidate
+    if chosen is None:
+        return OFFSEASON_INTERVAL, "nothing to poll"
+    return max(chosen[0], MIN_INTERVAL), chosen[1]
@@ -0,0 +1,413 @@
+import aiohttp
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from hockey.resilience import (MAX_RETRIES, RATE_BURST, RATE_LIMIT, RETRY_STATUSES, CircuitBreaker,
+                               TokenBucket, backoff, is_upstream_failure)
+from hockey.response_cache import ResponseCache, body_digest
+
+CONNECTION_LIMIT = 20
+CONNECTION_LIMIT_PER_HOST = 8
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
+REQUEST_TIMEOUT = 15
+MAX_RESPONSES = 128
+
+API_BASE_URL = 'https://api-web.nhle.com/v1'
+RECORDS_BASE_URL = 'https://records.nhl.com/site/api'
+
+@dataclass
+class FetchResult:
+    """
+    A decoded response for a URL.
+
+    stale is set when upstream failed and the last good response was served.
+    """
+    data: Any
+    stale: bool = False
+
+@dataclass
+class _Response:
+    """
+    The last response seen for a URL.
+    """
+    data: Any
+    digest: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    # wall-clock times from the response cache; 0 means always revalidate
+    expires_at: float = 0
+    stale_until: float = 0
+
+class HockeyClient:
+    def __init__(self, *, limit: int = CONNECTION_LIMIT, limit_per_host: int = CONNECTION_LIMIT_PER_HOST,
+                 dns_cache_ttl: int = DNS_CACHE_TTL, keepalive_timeout: int = KEEPALIVE_TIMEOUT,
+                 timeout: int = REQUEST_TIMEOUT, cache: Optional[ResponseCache] = None,
+                 max_responses: int = MAX_RESPONSES, api_base: str = API_BASE_URL,
+                 records_base: str = RECORDS_BASE_URL, rate_limit: float = RATE_LIMIT,
+                 rate_burst: int = RATE_BURST, max_retries: int = MAX_RETRIES):
+        """
+        Initialize the HockeyClient with its connection pool settings.
+
+        The underlying aiohttp session is created lazily on first use so the
+        client can be built before the event loop is running. With a
+        ResponseCache, stored responses are served while fresh, stale ones are
+        served while a background refresh runs, and final ones never refetch.
+        api_base and records_base can point at a stand-in server such as
+        hockey.standin for offline runs.
+
+        Requests to each host go through a token bucket, are retried with
+        jittered backoff on 429/5xx and connection errors, and stop behind a
+        circuit breaker when the host keeps failing. When a fetch fails, the
+        last good response for the URL is served and flagged as stale.
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+
+        self.cache = cache
+        self.api_base = api_base.rstrip('/')
+        self.records_base = records_base.rstrip('/')
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._revalidating: Dict[str, asyncio.Task] = {}
+        # last response per URL, for conditional requests and body comparison
+        self._responses: 'OrderedDict[str, _Response]' = OrderedDict()
+        self.max_responses = max_responses
+
+        self.rate_limit = rate_limit
+        self.rate_burst = rate_burst
+        self.max_retries = max_retries
+        self._limiters: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._stale: Set[str] = set()
+
+        self.not_modified = 0
+        self.unchanged = 0
+        self.retries = 0
+        self.stale_served = 0
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the pooled session, creating it if needed.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    def api_url(self, path: str) -> str:
+        """
+        Get the full URL for an api-web path.
+        """
+        return self.api_base + path
+
+    def records_url(self, path: str) -> str:
+        """
+        Get the full URL for a records API path.
+        """
+        return self.records_base + path
+
+    async def get_json(self, url: str) -> Any:
+        """
+        Get the decoded JSON for a URL, from the response cache when possible.
+        """
+        return (await self.fetch_json(url)).data
+
+    async def fetch_json(self, url: str) -> 'FetchResult':
+        """
+        Get the decoded JSON for a URL.
+
+        While a URL's body is unchanged the same decoded object is returned,
+        whether it came from memory, the response cache, a 304 or an
+        identical body, and a new object only when the body changed. Callers
+        spot changes by comparing with the object they last got; that also
+        covers bodies a background revalidation replaced in between.
+        """
+        response = self._responses.get(url)
+        if response is None and self.cache is not None:
+            response = await self._read_cache(url)
+
+        if response is not None:
+            now = time.time()
+            if now < response.expires_at:
+                return FetchResult(response.data)
+            if now < response.stale_until:
+                self._revalidate(url)
+                return FetchResult(response.data)
+
+        try:
+            data = await self._fetch(url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            last_good = self._responses.get(url)
+            if last_good is None or not is_upstream_failure(e):
+                raise
+            self.stale_served += 1
+            self._stale.add(url)
+            print(f"Serving stale response for {url}: {e}")
+            return FetchResult(last_good.data, stale=True)
+
+        self._stale.discard(url)
+        return FetchResult(data)
+
+    def is_stale(self, url: str) -> bool:
+        """
+        Check if the last fetch of a URL failed and served an old response.
+        """
+        return url in self._stale
+
+    async def _read_cache(self, url: str) -> Optional['_Response']:
+        """
+        Load a URL's response from the response cache into memory.
+        """
+        try:
+            entry = await self.cache.get(url)
+        except Exception as e:
+            print(f"Failed to read cached response for {url}: {e}")
+            return None
+        if entry is None:
+            return None
+        response = _Response(json.loads(entry.body), entry.digest, entry.etag, entry.last_modified,
+                             entry.expires_at, entry.stale_until)
+        self._remember(url, response)
+        return response
+
+    def _remember(self, url: str, response: '_Response') -> None:
+        """
+        Keep a response in memory, dropping the least recently used when full.
+        """
+        self._responses[url] = response
+        self._responses.move_to_end(url)
+        while len(self._responses) > self.max_responses:
+            self._responses.popitem(last=False)
+
+    async def _fetch(self, url: str) -> Any:
+        """
+        Fetch a URL, revalidating what the client already has.
+
+        Sends If-None-Match/If-Modified-Since when the last response had an
+        ETag or Last-Modified. A 304, or a 200 whose body hashes the same as
+        the last one, returns the previous object without decoding anything.
+        """
+        previous = self._responses.get(url)
+        headers = {}
+        if previous is not None:
+            if previous.etag:
+                headers['If-None-Match'] = previous.etag
+            if previous.last_modified:
+                headers['If-Modified-Since'] = previous.last_modified
+
+        status, body, etag, last_modified = await self._send(url, headers)
+        if status == 304 and previous is not None:
+            self.not_modified += 1
+            await self._renew(url, previous, etag, last_modified)
+            return previous.data
+
+        digest = body_digest(body)
+        if previous is not None and previous.digest == digest:
+            self.unchanged += 1
+            await self._renew(url, previous, etag, last_modified)
+            return previous.data
+
+        data = json.loads(body)
+        response = _Response(data, digest, etag, last_modified)
+        if self.cache is not None:
+            try:
+                lifetime = await self.cache.put(url, body, data, etag, last_modified)
+                if lifetime is not None:
+                    response.expires_at, response.stale_until = lifetime
+            except Exception as e:
+                print(f"Failed to cache response for {url}: {e}")
+        self._remember(url, response)
+        return data
+
+    def _limiter(self, host: str) -> TokenBucket:
+        """
+        Get the token bucket for a host.
+        """
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = self._limiters[host] = TokenBucket(self.rate_limit, self.rate_burst)
+        return limiter
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        """
+        Get the circuit breaker for a host.
+        """
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(host)
+        return breaker
+
+    async def _send(self, url: str, headers: Dict[str, str]) -> Tuple[int, bytes, Optional[str], Optional[str]]:
+        """
+        Send a GET through the host's limiter and breaker, retrying transient failures.
+
+        Returns the status, body, ETag and Last-Modified. Other statuses raise
+        straight away; other 5xx count against the breaker, other 4xx don't.
+        """
+        host = urlsplit(url).netloc
+        breaker = self._breaker(host)
+        trial = breaker.before_request()
+        try:
+            return await self._attempt(url, headers, host, breaker)
+        except BaseException:
+            # a trial that was cancelled or hit an unexpected error must not
+            # leave the circuit half open for good
+            if trial:
+                breaker.abandon_trial()
+            raise
+
+    async def _attempt(self, url: str, headers: Dict[str, str], host: str,
+                       breaker: CircuitBreaker) -> Tuple[int, bytes, Optional[str], Optional[str]]:
+        """
+        Send a GET, retrying transient failures and recording the outcome on the breaker.
+        """
+        limiter = self._limiter(host)
+
+        attempt = 0
+        while True:
+            await limiter.acquire()
+            retry_after = None
+            try:
+                async with self._get_session().get(url, headers=headers) as response:
+                    if response.status in RETRY_STATUSES:
+                        retry_after = _retry_after(response.headers.get('Retry-After'))
+                    response.raise_for_status()
+                    body = b'' if response.status == 304 else await response.read()
+                    breaker.record_success()
+                    return response.status, body, response.headers.get('ETag'), response.headers.get('Last-Modified')
+            except aiohttp.ClientResponseError as e:
+                if e.status not in RETRY_STATUSES:
+                    if is_upstream_failure(e):
+                        breaker.record_failure()
+                    else:
+                        # the host answered, so it's up
+                        breaker.record_success()
+                    raise
+                error: Exception = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+
+            if attempt >= self.max_retries:
+                breaker.record_failure()
+                raise error
+            self.retries += 1
+            await asyncio.sleep(backoff(attempt, retry_after))
+            attempt += 1
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the client's counters and each host's breaker state and queue depth.
+        """
+        hosts = {}
+        for host, breaker in self._breakers.items():
+            limiter = self._limiter(host)
+            hosts[host] = {**breaker.stats, "queue_depth": limiter.waiting, "tokens": round(limiter.tokens, 1)}
+        return {
+            "not_modified": self.not_modified,
+            "unchanged": self.unchanged,
+            "retries": self.retries,
+            "stale_served": self.stale_served,
+            "revalidating": len(self._revalidating),
+            "hosts": hosts
+        }
+
+    async def _renew(self, url: str, response: '_Response', etag: Optional[str], last_modified: Optional[str]) -> None:
+        """
+        Update a response upstream confirmed is unchanged, extending its cached lifetime.
+        """
+        response.etag = etag or response.etag
+        response.last_modified = last_modified or response.last_modified
+        self._remember(url, response)
+        if self.cache is None:
+            return
+        try:
+            lifetime = await self.cache.touch(url, response.data, etag, last_modified)
+            if lifetime is not None:
+                response.expires_at, response.stale_until = lifetime
+        except Exception as e:
+            print(f"Failed to renew cached response for {url}: {e}")
+
+    def _revalidate(self, url: str) -> None:
+        """
+        Refresh a stale cached response in the background, once per URL.
+        """
+        if url in self._revalidating:
+            return
+        task = asyncio.ensure_future(self._fetch(url))
+        self._revalidating[url] = task
+        task.add_done_callback(lambda t: self._revalidated(url, t))
+
+    def _revalidated(self, url: str, task: asyncio.Task) -> None:
+        """
+        Clean up after a background refresh.
+        """
+        self._revalidating.pop(url, None)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Failed to revalidate {url}: {task.exception()}")
+
+    @property
+    def closed(self) -> bool:
+        """
+        Check if the client has no open session.
+        """
+        return self._session is None or self._session.closed
+
+    async def close(self) -> None:
+        """
+        Close the pooled session, its connections and the response cache.
+        """
+        tasks = list(self._revalidating.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self.cache is not None:
+            await self.cache.close()
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header given in seconds.
+    """
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+_client: Optional[HockeyClient] = None
+
+def get_client() -> HockeyClient:
+    """
+    Get the process-wide client, creating one if none was set.
+    """
+    global _client
+    if _client is None:
+        _client = HockeyClient()
+    return _client
+
+def set_client(client: HockeyClient) -> None:
+    """
+    Set the process-wide client used by Game, Team and Schedule.
+    """
+    global _client
+    _client = client
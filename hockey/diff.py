@@ -0,0 +1,30 @@
+from typing import Any, Dict, Tuple
+
+Diff = Dict[str, Tuple[Any, Any]]
+
+def structural_diff(old: Any, new: Any, path: str = "") -> Diff:
+    """
+    Get the fields that differ between two decoded JSON payloads.
+
+    Keys are dotted paths (list items as [i]) and values are (old, new)
+    pairs. Missing keys show up as None, and lists that changed length are
+    reported whole rather than item by item.
+    """
+    if old is new:
+        return {}
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        diff: Diff = {}
+        for key in old.keys() | new.keys():
+            diff.update(structural_diff(old.get(key), new.get(key), f"{path}.{key}" if path else str(key)))
+        return diff
+
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        diff = {}
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            diff.update(structural_diff(old_item, new_item, f"{path}[{index}]"))
+        return diff
+
+    if old != new:
+        return {path: (old, new)}
+    return {}
@@ -1,8 +1,11 @@
 from hockey.team import Team
+from hockey.client import HockeyClient, get_client
+from hockey.cache import get_game_cache
+from hockey.snapshot import EMPTY_SNAPSHOT, GameSnapshot
 from datetime import datetime, timedelta
+import asyncio
 import pytz
-import aiohttp
-from typing import Dict, Any
+from typing import Dict, Any, Optional, List, Iterable, Tuple
 
 GAME_STATES = {
     "LIVE": "Live",
@@ -28,35 +31,89 @@ GAME_TYPES = {
     3: "Playoffs"
 }
 
-API_URL = 'https://api-web.nhle.com/v1/gamecenter/{}/landing'
+REGULAR_SEASON_PERIODS = {1: "1st", 2: "2nd", 3: "3rd", 4: "OT", 5: "SO"}
+PLAYOFF_PERIODS = {1: "1st", 2: "2nd", 3: "3rd"}
+
+API_PATH = '/gamecenter/{}/landing'
+INIT_MANY_CONCURRENCY = 6
 
 class Game:
-    def __init__(self, game_id: int):
+    def __init__(self, game_id: int, client: Optional[HockeyClient] = None, keep_payload: bool = False):
         """
         Initialize the Game object with a game ID.
+
+        Only the parsed snapshot is kept unless keep_payload is set; the raw
+        landing payload then stays in game_object for callers that need
+        fields the snapshot doesn't parse, like the GameStateService.
         """
         self.game = None
         self.game_id = game_id
-        self.game_object: Dict[str, Any] = {}
+        self.client = client or get_client()
+        self.keep_payload = keep_payload
+        # the raw landing payload, shared with the game cache, when keep_payload is set
+        self.game_object: Optional[Dict[str, Any]] = None
+        self.snapshot: GameSnapshot = EMPTY_SNAPSHOT
+        # set when the NHL API was failing and the last good payload was used
+        self.stale = False
 
         self.round = 0
     
     @classmethod
-    async def init(cls, game_id: int):
-        self = cls(game_id)
+    async def init(cls, game_id: int, client: Optional[HockeyClient] = None):
+        self = cls(game_id, client)
         await self._fetch_game()
         return self
 
+    @classmethod
+    async def init_many(cls, game_ids: Iterable[int], client: Optional[HockeyClient] = None,
+                        concurrency: int = INIT_MANY_CONCURRENCY,
+                        keep_payload: bool = False) -> Tuple[List['Game'], Dict[int, Exception]]:
+        """
+        Initialize several games in parallel, at most concurrency at a time.
+
+        Returns the games that loaded, in the order of game_ids, and a dict of
+        game ID to the exception for each one that failed.
+        """
+        game_ids = list(game_ids)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def load(game_id: int) -> 'Game':
+            async with semaphore:
+                game = cls(game_id, client, keep_payload)
+                await game._load()
+                return game
+
+        results = await asyncio.gather(*(load(game_id) for game_id in game_ids), return_exceptions=True)
+
+        games = []
+        failures = {}
+        for game_id, result in zip(game_ids, results):
+            if isinstance(result, Exception):
+                failures[game_id] = result
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                games.append(result)
+        return games, failures
+
+    async def _load(self) -> None:
+        """
+        Load game data through the shared game cache, raising on failure.
+        """
+        cache = get_game_cache(self.client)
+        url = self.client.api_url(API_PATH.format(self.game_id))
+        payload = await cache.get(self.game_id, lambda: self.client.get_json(url))
+        self.snapshot = cache.snapshot(self.game_id, payload)
+        if self.keep_payload:
+            self.game_object = payload
+        self.stale = self.client.is_stale(url)
+
     async def _fetch_game(self) -> None:
         """
-        Fetch game data from the API and store it in the game_object.
+        Fetch game data through the shared game cache and parse it into the snapshot.
         """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(API_URL.format(self.game_id)) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    self.game_object = data
+            await self._load()
         except Exception as e:
             print(f"Failed to fetch game data: {e}")
     
@@ -71,117 +128,120 @@ class Game:
         """
         Get the season of the game.
         """
-        return self.game_object.get('season', "Unknown")
+        return self.snapshot.season
 
     async def get_away_team(self) -> Team:
         """
         Get the away team information.
         """
-        return await Team.init(self.game_object.get('awayTeam', {}).get('id'))
+        return await Team.init(self.snapshot.away.id, self.client)
 
     async def get_home_team(self) -> Team:
         """
         Get the home team information.
         """
-        return await Team.init(self.game_object.get('homeTeam', {}).get('id'))
+        return await Team.init(self.snapshot.home.id, self.client)
     
     @property
     def away_team_abbr(self) -> str:
         """
         Get the away team's abbreviation.
         """
-        return self.game_object.get('awayTeam', {}).get('abbrev', 'UNK')
+        return self.snapshot.away.abbr
     
     @property
     def home_team_abbr(self) -> str:
         """
         Get the home team's abbreviation.
         """
-        return self.game_object.get('homeTeam', {}).get('abbrev', 'UNK')
+        return self.snapshot.home.abbr
 
     @property
     def away_team_full_name(self) -> str:
         """
         Get the away team's full name.
         """
-        return self.game_object.get('awayTeam', {}).get('placeName', {}).get("default", "Unknown") + " " + self.game_object.get('awayTeam', {}).get('commonName', {}).get("default", "Unknown")
+        return self.snapshot.away.full_name
     
     @property
     def home_team_full_name(self) -> str:
         """
         Get the home team's full name.
         """
-        return self.game_object.get('homeTeam', {}).get('placeName', {}).get("default", "Unknown") + " " + self.game_object.get('homeTeam', {}).get('commonName', {}).get("default", "Unknown")
+        return self.snapshot.home.full_name
     
     @property
     def away_team_name(self) -> str:
         """
         Get the away team's name.
         """
-        return self.game_object.get('awayTeam', {}).get('commonName', {}).get("default", "Unknown")
+        return self.snapshot.away.name
     
     @property
     def home_team_name(self) -> str:
         """
         Get the home team's name.
         """
-        return self.game_object.get('homeTeam', {}).get('commonName', {}).get("default", "Unknown")
+        return self.snapshot.home.name
     
     @property
     def away_team_id(self) -> int:
         """
         Get the away team's ID.
         """
-        return self.game_object.get('awayTeam', {}).get('id', 0)
+        return self.snapshot.away.id
     
     @property
     def home_team_id(self) -> int:
         """
         Get the home team's ID.
         """
-        return self.game_object.get('homeTeam', {}).get('id', 0)
+        return self.snapshot.home.id
 
     @property
     def game_state(self) -> str:
         """
         Get the current state of the game.
         """
-        return GAME_STATES.get(self.game_object.get('gameState'), 'Unknown')
+        return GAME_STATES.get(self.snapshot.game_state, 'Unknown')
 
     @property
     def schedule_state(self) -> str:
         """
         Get the schedule state of the game.
         """
-        return GAME_SCHEDULE_STATES.get(self.game_object.get('gameScheduleState'), 'Unknown')
+        return GAME_SCHEDULE_STATES.get(self.snapshot.schedule_state, 'Unknown')
 
-    def game_time(self, format: str, timezone: str = "US/Eastern") -> str:
+    def game_time(self, format: str, timezone: str = "US/Eastern") -> Optional[str]:
         """
-        Get the game start time in the specified format.
+        Get the game start time in the specified format, or None if it isn't known.
         """
-        utc = datetime.strptime(self.game_object['startTimeUTC'], "%Y-%m-%dT%H:%M:%SZ")
-        utc = pytz.utc.localize(utc)
-        return utc.astimezone(pytz.timezone(timezone)).strftime(format)
+        if self.raw_game_time is None:
+            return None
+        return self.raw_game_time.astimezone(pytz.timezone(timezone)).strftime(format)
     
     @property
-    def raw_game_time(self) -> datetime:
+    def raw_game_time(self) -> Optional[datetime]:
         """
-        Get the raw game start time.
+        Get the raw game start time, or None for a payload without one (e.g. one that failed to load).
         """
-        utctz = pytz.timezone('UTC')
-        return utctz.localize(datetime.strptime(self.game_object['startTimeUTC'], "%Y-%m-%dT%H:%M:%SZ"))
+        return self.snapshot.start_time
     
     @property
-    def raw_pregame_time(self) -> datetime:
+    def raw_pregame_time(self) -> Optional[datetime]:
         """
-        Get the raw pregame time (30 minutes before game start).
+        Get the raw pregame time (30 minutes before game start), or None if the start isn't known.
         """
+        if self.raw_game_time is None:
+            return None
         return self.raw_game_time - timedelta(minutes=30)
     
-    def pregame_time(self, format: str, timezone: str = "US/Eastern", minutes_before_start: int=30) -> str:
+    def pregame_time(self, format: str, timezone: str = "US/Eastern", minutes_before_start: int=30) -> Optional[str]:
         """
-        Get the pregame time in the specified format.
+        Get the pregame time in the specified format, or None if the start isn't known.
         """
+        if self.raw_game_time is None:
+            return None
         pregame_dt = self.raw_game_time - timedelta(minutes=minutes_before_start)
         return pregame_dt.astimezone(pytz.timezone(timezone)).strftime(format)
 
@@ -192,9 +252,9 @@ class Game:
         """
         # check if regular season
         if self.is_regular_season:
-            return self.game_object.get('awayTeam', {}).get('record', {})
+            return self.snapshot.away.record_text
         elif self.is_playoffs:
-            return self.game_object.get('summary', {}).get('seasonSeriesWins', {}).get('awayTeamWins', "0") + "-" + self.game_object.get('summary', {}).get('seasonSeriesWins', {}).get('homeTeamWins', "0")
+            return f"{self.snapshot.series_wins[0]}-{self.snapshot.series_wins[1]}"
         else:
             return "0-0-0"
     
@@ -205,25 +265,47 @@ class Game:
         """
         # check if regular season
         if self.is_regular_season:
-            return self.game_object.get('homeTeam', {}).get('record', {})
+            return self.snapshot.home.record_text
         elif self.is_playoffs:
-            return self.game_object.get('summary', {}).get('seasonSeriesWins', {}).get('homeTeamWins', "0") + "-" + self.game_object.get('summary', {}).get('seasonSeriesWins', {}).get('awayTeamWins', "0")
+            return f"{self.snapshot.series_wins[1]}-{self.snapshot.series_wins[0]}"
         else:
             return "0-0-0"
     
+    @property
+    def _away_record(self) -> Tuple[int, int, int]:
+        """
+        Get the away team's record as ints, matching away_team_record.
+        """
+        if self.is_regular_season:
+            return self.snapshot.away.record
+        elif self.is_playoffs:
+            return (*self.snapshot.series_wins, 0)
+        return (0, 0, 0)
+
+    @property
+    def _home_record(self) -> Tuple[int, int, int]:
+        """
+        Get the home team's record as ints, matching home_team_record.
+        """
+        if self.is_regular_season:
+            return self.snapshot.home.record
+        elif self.is_playoffs:
+            return (self.snapshot.series_wins[1], self.snapshot.series_wins[0], 0)
+        return (0, 0, 0)
+
     @property
     def away_team_wins(self) -> int:
         """
         Get the number of wins for the away team.
         """
-        return int(self.away_team_record.split("-")[0])
+        return self._away_record[0]
     
     @property
     def away_team_losses(self) -> int:
         """
         Get the number of losses for the away team.
         """
-        return int(self.away_team_record.split("-")[1])
+        return self._away_record[1]
     
     @property
     def away_team_ot_losses(self) -> int:
@@ -231,7 +313,7 @@ class Game:
         Get the number of overtime losses for the away team.
         """
         if not self.is_playoffs:
-            return int(self.away_team_record.split("-")[2])
+            return self._away_record[2]
         
         return 0
     
@@ -240,14 +322,14 @@ class Game:
         """
         Get the number of wins for the home team.
         """
-        return int(self.home_team_record.split("-")[0])
+        return self._home_record[0]
     
     @property
     def home_team_losses(self) -> int:
         """
         Get the number of losses for the home team.
         """
-        return int(self.home_team_record.split("-")[1])
+        return self._home_record[1]
     
     @property
     def home_team_ot_losses(self) -> int:
@@ -255,7 +337,7 @@ class Game:
         Get the number of overtime losses for the home team.
         """
         if not self.is_playoffs:
-            return int(self.home_team_record.split("-")[2])
+            return self._home_record[2]
         
         return 0
 
@@ -264,33 +346,29 @@ class Game:
         """
         Get the type of the game.
         """
-        return GAME_TYPES.get(self.game_object.get('gameType'), 'Unknown')
+        return GAME_TYPES.get(self.snapshot.game_type, 'Unknown')
 
     @property
     def venue(self) -> str:
         """
         Get the venue of the game.
         """
-        return self.game_object.get('venue', {}).get('default', 'Unknown')
+        return self.snapshot.venue
 
     @property
     def time_remaining(self) -> str:
         """
         Get the time remaining in the game.
         """
-        period_descriptor = self.game_object.get('periodDescriptor', {})
-        period_number = period_descriptor.get('number', 0)
-        clock = self.game_object.get('clock', {}).get('timeRemaining', '00:00')
+        period_number = self.snapshot.period
+        clock = self.snapshot.clock
 
-        if self.game_object.get('gameType', 0) < 3:
-            periods = {1: "1st", 2: "2nd", 3: "3rd", 4: "OT", 5: "SO"}
+        if self.snapshot.game_type < 3:
+            period = REGULAR_SEASON_PERIODS.get(period_number, 'Unknown')
+        elif period_number > 3:
+            period = f"{period_number - 3} OT"
         else:
-            periods = {1: "1st", 2: "2nd", 3: "3rd"}
-            if period_number > 3:
-                period_number -= 3
-                periods[period_number] = f"{period_number} OT"
-
-        period = periods.get(period_number, 'Unknown')
+            period = PLAYOFF_PERIODS.get(period_number, 'Unknown')
         return f"{period} {clock}"
 
     @property
@@ -298,21 +376,21 @@ class Game:
         """
         Get the away team's score.
         """
-        return self.game_object.get('awayTeam', {}).get('score', 0)
+        return self.snapshot.away.score
     
     @property
     def home_score(self) -> int:
         """
         Get the home team's score.
         """
-        return self.game_object.get('homeTeam', {}).get('score', 0)
+        return self.snapshot.home.score
     
     @property
     def is_today(self) -> bool:
         """
         Check if the game is today.
         """
-        return self.raw_game_time.date() == datetime.now().date()
+        return self.raw_game_time is not None and self.raw_game_time.date() == datetime.now().date()
     
     @property
     def is_ppd(self) -> bool:
@@ -333,14 +411,14 @@ class Game:
         """
         Check if the game is live.
         """
-        return self.game_state == "Live"
+        return self.snapshot.game_state is not None and self.snapshot.game_state.is_live
 
     @property
     def is_final(self) -> bool:
         """
         Check if the game is final.
         """
-        return self.game_state == "Final"
+        return self.snapshot.game_state is not None and self.snapshot.game_state.is_final
     
     @property
     def is_suspended(self) -> bool:
@@ -389,7 +467,7 @@ class Game:
         """
         Check if the game is in overtime.
         """
-        return self.game_object.get('periodDescriptor', {}).get('number', 0) > 3
+        return self.snapshot.period > 3
     
     async def winning_team(self) -> Team:
         """
@@ -449,4 +527,4 @@ class Game:
         """
         Get the string representation of the game.
         """
-        return f"{self.away_team_full_name} @ {self.home_team_full_name} - {self.game_time('%Y-%m-%d %I:%M %p')}"
\ No newline at end of file
+        return f"{self.away_team_full_name} @ {self.home_team_full_name} - {self.game_time('%Y-%m-%d %I:%M %p') or 'TBD'}"
\ No newline at end of file
@@ -0,0 +1,206 @@
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+GOAL_STATE_FILE = 'database/goals.json'
+MAX_TRACKED_GAMES = 20
+
+PERIOD_NAMES = {1: "1st", 2: "2nd", 3: "3rd"}
+
+@dataclass
+class Goal:
+    """
+    A goal from the landing payload's summary.scoring section.
+    """
+    event_id: int
+    team: str
+    scorer: str
+    assists: str
+    time: str
+    # scorer and assist player IDs, to spot scoring changes after posting
+    signature: str = ""
+
+    @classmethod
+    def from_landing(cls, goal: Dict[str, Any], period: Dict[str, Any]) -> 'Goal':
+        """
+        Build a Goal from a scoring entry and the period it belongs to.
+        """
+        scorer = f"{goal.get('firstName', {}).get('default', '')} {goal.get('lastName', {}).get('default', '')}".strip()
+        if 'goalsToDate' in goal:
+            scorer += f" ({goal['goalsToDate']})"
+
+        assists = ", ".join(
+            f"{a.get('firstName', {}).get('default', '')} {a.get('lastName', {}).get('default', '')} ({a.get('assistsToDate', 0)})".strip()
+            for a in goal.get('assists', [])
+        ) or "Unassisted"
+
+        return cls(
+            event_id=goal['eventId'],
+            team=goal.get('teamAbbrev', {}).get('default', 'UNK'),
+            scorer=scorer,
+            assists=assists,
+            time=f"{period_name(period)} {goal.get('timeInPeriod', '00:00')}",
+            signature=goal_signature(goal)
+        )
+
+def goal_signature(goal: Dict[str, Any]) -> str:
+    """
+    Get the scorer and assisting player IDs of a scoring entry.
+    """
+    return f"{goal.get('playerId')}|{','.join(str(a.get('playerId')) for a in goal.get('assists', []))}"
+
+def period_name(period: Dict[str, Any]) -> str:
+    """
+    Get a display name for a periodDescriptor.
+    """
+    number = period.get('number', 0)
+    period_type = period.get('periodType', 'REG')
+    if period_type == 'OT':
+        overtime = number - 3
+        return "OT" if overtime <= 1 else f"{overtime}OT"
+    if period_type == 'SO':
+        return "SO"
+    return PERIOD_NAMES.get(number, f"P{number}")
+
+class GoalTracker:
+    def __init__(self, state_file: str = GOAL_STATE_FILE):
+        """
+        Initialize the GoalTracker, which finds new, changed and disallowed goals.
+
+        update() only reports what differs from what was posted; the caller
+        marks each goal once it is sent and then saves. Posted goals are saved
+        to state_file keyed by game and event ID, so a restart doesn't post
+        them again, and a goal that failed to send is found again on the next
+        refresh.
+        """
+        self.state_file = state_file
+
+        # game_id -> event_id -> signature, in posting order
+        self.posted: Dict[int, Dict[int, str]] = {}
+        # game_id -> number of scoring entries already handled
+        self.watermarks: Dict[int, int] = {}
+        # game_id -> last landing payload seen
+        self._payloads: Dict[int, Dict[str, Any]] = {}
+        self._save_lock = asyncio.Lock()
+
+        self._load()
+
+    def _load(self) -> None:
+        """
+        Load posted goals from the state file.
+        """
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file) as f:
+                data = json.load(f)
+            self.posted = {int(game_id): {int(event_id): sig for event_id, sig in goals.items()} for game_id, goals in data.items()}
+        except Exception as e:
+            print(f"Failed to load goal state: {e}")
+
+    def mark_posted(self, game_id: int, goal: Goal) -> None:
+        """
+        Record that a new or changed goal was sent.
+        """
+        self.posted.setdefault(game_id, {})[goal.event_id] = goal.signature
+
+    def mark_removed(self, game_id: int, event_id: int) -> None:
+        """
+        Record that a disallowed goal was announced.
+        """
+        self.posted.get(game_id, {}).pop(event_id, None)
+
+    async def save(self) -> None:
+        """
+        Save posted goals on a worker thread, keeping only the most recent games.
+        """
+        while len(self.posted) > MAX_TRACKED_GAMES:
+            game_id = next(iter(self.posted))
+            del self.posted[game_id]
+            self.watermarks.pop(game_id, None)
+            self._payloads.pop(game_id, None)
+
+        # render on the loop so the file matches one state; write one at a time
+        text = json.dumps(self.posted)
+        async with self._save_lock:
+            try:
+                await asyncio.to_thread(self._write, text)
+            except Exception as e:
+                print(f"Failed to save goal state: {e}")
+
+    def _write(self, text: str) -> None:
+        """
+        Replace the state file with text.
+        """
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            f.write(text)
+        os.replace(tmp_file, self.state_file)
+
+    @staticmethod
+    def _scoring(payload: Dict[str, Any]) -> Optional[List[Tuple[Dict[str, Any], Dict[str, Any]]]]:
+        """
+        Get (goal, period) pairs for every non-shootout goal, in game order.
+
+        Returns None if the payload has no scoring periods at all (before puck
+        drop, or a partial payload), which says nothing about posted goals.
+        """
+        periods = (payload.get('summary') or {}).get('scoring')
+        if not periods:
+            return None
+        goals = []
+        for period in periods:
+            descriptor = period.get('periodDescriptor', {})
+            if descriptor.get('periodType') == 'SO':
+                continue
+            for goal in period.get('goals', []):
+                goals.append((goal, descriptor))
+        return goals
+
+    def update(self, game_id: int, payload: Dict[str, Any]) -> Tuple[List[Goal], List[Goal], List[int]]:
+        """
+        Compare a landing payload against what was already posted.
+
+        Returns new goals, goals whose scorer or assists changed, and the
+        event IDs of goals that were taken off the board. Nothing is marked
+        as posted here. A payload already seen with nothing left to post (the
+        same cached object) returns immediately. Otherwise every scoring
+        entry is walked, but only entries past the game's watermark, or whose
+        saved signature differs, are built into Goals; the rest cost a dict
+        lookup and a signature compare.
+        """
+        if self._payloads.get(game_id) is payload:
+            return [], [], []
+
+        posted = self.posted.setdefault(game_id, {})
+        scoring = self._scoring(payload)
+        if scoring is None:
+            # never read a missing section as every goal being taken off the board
+            return [], [], []
+        watermark = self.watermarks.get(game_id, 0)
+
+        new_goals = []
+        changed_goals = []
+        for index, (goal, period) in enumerate(scoring):
+            event_id = goal['eventId']
+            if index < watermark and event_id in posted:
+                if posted[event_id] == goal_signature(goal):
+                    continue
+
+            parsed = Goal.from_landing(goal, period)
+            if event_id not in posted:
+                new_goals.append(parsed)
+            elif posted[event_id] != parsed.signature:
+                changed_goals.append(parsed)
+
+        disallowed = []
+        if len(posted) > len(scoring) - len(new_goals):
+            current_ids = {goal['eventId'] for goal, _ in scoring}
+            disallowed = [event_id for event_id in posted if event_id not in current_ids]
+
+        self.watermarks[game_id] = len(scoring)
+        if not (new_goals or changed_goals or disallowed):
+            self._payloads[game_id] = payload
+        return new_goals, changed_goals, disallowed
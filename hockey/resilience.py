@@ -0,0 +1,163 @@
+import asyncio
+import random
+import time
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+# requests per second and burst size allowed per host
+RATE_LIMIT = 5
+RATE_BURST = 10
+
+# retries after the first attempt, with full-jitter exponential backoff
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# consecutive failed requests before a host's circuit opens, and how long it stays open
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 30
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(aiohttp.ClientError):
+    """
+    Raised instead of sending a request while a host's circuit is open.
+
+    Subclasses ClientError so existing fetch error handling covers it.
+    """
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"Circuit open for {host}, retrying in {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """
+    Check if an error means the host is down or overloaded, rather than a definitive answer.
+
+    Connection errors, timeouts, 429 and 5xx count; any other 4xx (a wrong
+    game ID, a bad request) is the answer and shouldn't be papered over.
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+def backoff(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    Get the delay before a retry: the server's Retry-After if given, else full jitter.
+    """
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+class TokenBucket:
+    def __init__(self, rate: float = RATE_LIMIT, burst: int = RATE_BURST):
+        """
+        Initialize the TokenBucket, which spaces out requests to one host.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.waiting = 0
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        """
+        Add the tokens earned since the last refill.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        """
+        Wait for a token. Waiters are served in order.
+        """
+        self.waiting += 1
+        try:
+            async with self._lock:
+                self._refill()
+                if self.tokens < 1:
+                    await asyncio.sleep((1 - self.tokens) / self.rate)
+                    self._refill()
+                self.tokens -= 1
+        finally:
+            self.waiting -= 1
+
+class CircuitBreaker:
+    def __init__(self, host: str, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT):
+        """
+        Initialize the CircuitBreaker for a host.
+
+        After failure_threshold failures in a row the circuit opens and
+        requests fail fast. After reset_timeout one trial request is let
+        through; success closes the circuit and failure opens it again.
+        """
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+
+    def before_request(self) -> bool:
+        """
+        Raise CircuitOpenError unless a request may be sent.
+
+        Returns True if the request is the half open trial, which must end in
+        record_success, record_failure or abandon_trial.
+        """
+        if self.state == OPEN:
+            retry_in = self.opened_at + self.reset_timeout - time.monotonic()
+            if retry_in > 0:
+                raise CircuitOpenError(self.host, retry_in)
+            self.state = HALF_OPEN
+            print(f"Circuit for {self.host} half open, sending a trial request")
+            return True
+        elif self.state == HALF_OPEN:
+            # only the trial request goes through
+            raise CircuitOpenError(self.host, 0)
+        return False
+
+    def record_success(self) -> None:
+        """
+        Close the circuit after a successful request.
+        """
+        if self.state != CLOSED:
+            print(f"Circuit for {self.host} closed")
+        self.state = CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        """
+        Count a failed request, opening the circuit at the threshold.
+        """
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.trips += 1
+                print(f"Circuit for {self.host} opened after {self.failures} failures")
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def abandon_trial(self) -> None:
+        """
+        Reopen the circuit if the trial request ended without a result, e.g. when cancelled.
+        """
+        if self.state == HALF_OPEN:
+            print(f"Circuit for {self.host} trial request abandoned, reopening")
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the breaker's state.
+        """
+        return {"state": self.state, "failures": self.failures, "trips": self.trips}
@@ -0,0 +1,211 @@
+import asyncio
+import hashlib
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+import aiosqlite
+
+from hockey.snapshot import season_for
+
+RESPONSE_CACHE_FILE = 'database/nhl_cache.db'
+
+IMMUTABLE = float('inf')
+FINAL_STATES = ('FINAL', 'OFF')
+
+# (max_age, stale_while_revalidate) in seconds
+SCHEDULE_POLICY = (60 * 10, 60 * 60 * 24)
+FRANCHISE_POLICY = (60 * 60 * 24, 60 * 60 * 24 * 30)
+NO_STORE = (0, 0)
+
+SEASON_PATTERN = re.compile(r'/club-schedule-season/[^/]+/(\d{8})')
+
+@dataclass
+class CachedResponse:
+    """
+    A response read back from the ResponseCache.
+    """
+    body: bytes
+    digest: bytes
+    fetched_at: float
+    expires_at: float
+    stale_until: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+def body_digest(body: bytes) -> bytes:
+    """
+    Get a hash of a raw response body, to spot identical payloads without decoding them.
+    """
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+def _is_past_season(url: str) -> bool:
+    """
+    Check if a team schedule URL is for a season before the current one.
+    """
+    match = SEASON_PATTERN.search(url)
+    if match is None:
+        return False
+    return match.group(1) < season_for(datetime.now())
+
+def cache_policy(url: str, data: Any) -> Tuple[float, float]:
+    """
+    Get the (max_age, stale_while_revalidate) for a response.
+
+    Final game landings, dated schedules where every game is final and
+    past seasons' team schedules never change, so they are kept for good.
+    "now" schedules roll over, and the current season's team schedule can
+    still gain playoff games, so they never are. Live landings aren't
+    stored; the in-memory GameCache already covers them.
+    """
+    if '/landing' in url:
+        return (IMMUTABLE, IMMUTABLE) if data.get('gameState') in FINAL_STATES else NO_STORE
+
+    if '/club-schedule-season/' in url:
+        if not _is_past_season(url):
+            return SCHEDULE_POLICY
+        games = data.get('games', [])
+    elif '/schedule/' in url:
+        week = data.get('gameWeek', [])
+        games = week[0].get('games', []) if week else []
+    elif 'franchise' in url:
+        return FRANCHISE_POLICY
+    else:
+        return NO_STORE
+
+    if games and not url.rstrip('/').endswith('/now') and all(game.get('gameState') in FINAL_STATES for game in games):
+        return IMMUTABLE, IMMUTABLE
+    return SCHEDULE_POLICY
+
+class ResponseCache:
+    def __init__(self, path: str = RESPONSE_CACHE_FILE):
+        """
+        Initialize the ResponseCache, an SQLite store of NHL API responses keyed by URL.
+
+        Bodies are stored zlib-compressed with their fetch time, expiry and
+        ETag/Last-Modified headers, and survive restarts.
+        """
+        self.path = path
+        self.conn: Optional[aiosqlite.Connection] = None
+        # concurrent first calls share one connection and one schema setup
+        self._connect_lock = asyncio.Lock()
+
+    async def _connect(self) -> aiosqlite.Connection:
+        """
+        Open the cache database, creating the table if needed.
+        """
+        if self.conn is not None:
+            return self.conn
+        async with self._connect_lock:
+            if self.conn is not None:
+                return self.conn
+            conn = await aiosqlite.connect(self.path)
+            await conn.execute("PRAGMA journal_mode = WAL;")
+            await conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                fetched_at REAL NOT NULL,
+                expires_at REAL,
+                stale_until REAL,
+                etag TEXT,
+                last_modified TEXT
+            );""")
+            await conn.commit()
+            self.conn = conn
+        return self.conn
+
+    async def get(self, url: str) -> Optional[CachedResponse]:
+        """
+        Get the stored response for a URL.
+        """
+        conn = await self._connect()
+        async with conn.execute(
+            "SELECT body, fetched_at, expires_at, stale_until, etag, last_modified FROM responses WHERE url = ?;", (url,)
+        ) as cursor:
+            row = await cursor.fetchone()
+
+        if row is None:
+            return None
+
+        body, fetched_at, expires_at, stale_until, etag, last_modified = row
+        body = zlib.decompress(body)
+        return CachedResponse(
+            body=body,
+            digest=body_digest(body),
+            fetched_at=fetched_at,
+            # NULL means never expires
+            expires_at=IMMUTABLE if expires_at is None else expires_at,
+            stale_until=IMMUTABLE if stale_until is None else stale_until,
+            etag=etag,
+            last_modified=last_modified
+        )
+
+    @staticmethod
+    def _lifetime(url: str, data: Any, now: float) -> Optional[Tuple[float, float]]:
+        """
+        Get the (expires_at, stale_until) for a response, or None if it shouldn't be stored.
+        """
+        max_age, stale_for = cache_policy(url, data)
+        if max_age <= 0 and stale_for <= 0:
+            return None
+        return now + max_age, now + max_age + stale_for
+
+    async def put(self, url: str, body: bytes, data: Any, etag: Optional[str] = None,
+                  last_modified: Optional[str] = None) -> Optional[Tuple[float, float]]:
+        """
+        Store a response according to its cache policy.
+
+        Returns its (expires_at, stale_until), or None if it wasn't stored.
+        """
+        now = time.time()
+        lifetime = self._lifetime(url, data, now)
+        if lifetime is None:
+            return None
+
+        conn = await self._connect()
+        await conn.execute(
+            """INSERT OR REPLACE INTO responses (url, body, fetched_at, expires_at, stale_until, etag, last_modified)
+            VALUES (?, ?, ?, ?, ?, ?, ?);""",
+            (url, zlib.compress(body), now, *self._columns(lifetime), etag, last_modified)
+        )
+        await conn.commit()
+        return lifetime
+
+    async def touch(self, url: str, data: Any, etag: Optional[str] = None,
+                    last_modified: Optional[str] = None) -> Optional[Tuple[float, float]]:
+        """
+        Renew a stored response that upstream confirmed is unchanged.
+
+        Returns its new (expires_at, stale_until), or None if it isn't stored.
+        """
+        now = time.time()
+        lifetime = self._lifetime(url, data, now)
+        if lifetime is None:
+            return None
+
+        conn = await self._connect()
+        cursor = await conn.execute(
+            """UPDATE responses SET fetched_at = ?, expires_at = ?, stale_until = ?,
+            etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?;""",
+            (now, *self._columns(lifetime), etag, last_modified, url)
+        )
+        await conn.commit()
+        return lifetime if cursor.rowcount else None
+
+    @staticmethod
+    def _columns(lifetime: Tuple[float, float]) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Get the expires_at and stale_until column values, using NULL for never.
+        """
+        return tuple(None if moment == IMMUTABLE else moment for moment in lifetime)
+
+    async def close(self) -> None:
+        """
+        Close the cache database.
+        """
+        if self.conn is not None:
+            await self.conn.close()
+            self.conn = None
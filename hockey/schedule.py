@@ -1,19 +1,281 @@
 import aiohttp
-from datetime import datetime
+from datetime import datetime, timedelta
 import pytz
 from typing import List, Dict, Any, Optional
-from .game import Game
+from .client import HockeyClient, get_client
+from .diff import Diff, structural_diff
+from .game import Game, GAME_STATES, GAME_SCHEDULE_STATES, GAME_TYPES
+from .snapshot import parse_start_time, season_for
 
-API_FULL_SCHEDULE_URL = 'https://api-web.nhle.com/v1/schedule/{}'
-API_TEAM_SCHEDULE_URL = 'https://api-web.nhle.com/v1/club-schedule-season/{}/{}'
+API_FULL_SCHEDULE_PATH = '/schedule/{}'
+API_TEAM_SCHEDULE_PATH = '/club-schedule-season/{}/{}'
+
+UPCOMING_STATES = ['FUT', 'PRE']
+FINAL_STATES = ['FINAL', 'OFF', 'OVER']
+
+class ScheduledGame:
+    __slots__ = ('game', 'game_id', 'game_date', 'round', 'client', 'start_time')
+
+    def __init__(self, game: Dict[str, Any], client: Optional[HockeyClient] = None, game_date: Optional[str] = None):
+        """
+        Initialize the ScheduledGame object from a schedule entry.
+
+        Answers schedule-level questions without fetching the landing page;
+        use hydrate() when live detail (records, clock, series wins) is needed.
+        """
+        self.game = game
+        self.game_id: int = game['id']
+        self.game_date: Optional[str] = game.get('gameDate', game_date)
+        self.round: int = game.get('seriesStatus', {}).get('round', 0)
+        self.client = client or get_client()
+        self.start_time: Optional[datetime] = parse_start_time(game.get('startTimeUTC'))
+
+    async def hydrate(self) -> Game:
+        """
+        Fetch the full Game for this schedule entry.
+        """
+        game = await Game.init(self.game_id, self.client)
+        if self.is_playoffs:
+            game.set_round(self.round)
+        return game
+
+    @property
+    def season(self) -> str:
+        """
+        Get the season of the game.
+        """
+        return self.game.get('season', "Unknown")
+
+    @property
+    def game_type(self) -> str:
+        """
+        Get the type of the game.
+        """
+        return GAME_TYPES.get(self.game.get('gameType'), 'Unknown')
+
+    @property
+    def game_state(self) -> str:
+        """
+        Get the current state of the game.
+        """
+        return GAME_STATES.get(self.game.get('gameState'), 'Unknown')
+
+    @property
+    def schedule_state(self) -> str:
+        """
+        Get the schedule state of the game.
+        """
+        return GAME_SCHEDULE_STATES.get(self.game.get('gameScheduleState'), 'Unknown')
+
+    @property
+    def is_upcoming(self) -> bool:
+        """
+        Check if the game has not started and is still scheduled.
+        """
+        return self.game.get('gameState') in UPCOMING_STATES and self.game.get('gameScheduleState') == 'OK'
+
+    @property
+    def is_final(self) -> bool:
+        """
+        Check if the game is final.
+        """
+        return self.game_state == "Final"
+
+    @property
+    def is_live(self) -> bool:
+        """
+        Check if the game is live.
+        """
+        return self.game_state == "Live"
+
+    @property
+    def is_ppd(self) -> bool:
+        """
+        Check if the game is postponed.
+        """
+        return self.schedule_state == "Postponed"
+
+    @property
+    def is_cancelled(self) -> bool:
+        """
+        Check if the game is cancelled.
+        """
+        return self.schedule_state == "Cancelled"
+
+    @property
+    def is_scheduled(self) -> bool:
+        """
+        Check if the game is scheduled.
+        """
+        return self.schedule_state == "Scheduled"
+
+    @property
+    def is_tbd(self) -> bool:
+        """
+        Check if the game time is to be determined.
+        """
+        return self.schedule_state == "To Be Determined"
+
+    @property
+    def is_playoffs(self) -> bool:
+        """
+        Check if the game is a playoff game.
+        """
+        return self.game_type == "Playoffs"
+
+    @property
+    def is_regular_season(self) -> bool:
+        """
+        Check if the game is a regular season game.
+        """
+        return self.game_type == "Regular Season"
+
+    @property
+    def raw_game_time(self) -> Optional[datetime]:
+        """
+        Get the raw game start time, or None if the schedule doesn't have one.
+        """
+        return self.start_time
+
+    @property
+    def raw_pregame_time(self) -> Optional[datetime]:
+        """
+        Get the raw pregame time (30 minutes before game start), or None if the start isn't known.
+        """
+        if self.raw_game_time is None:
+            return None
+        return self.raw_game_time - timedelta(minutes=30)
+
+    def game_time(self, format: str, timezone: str = "US/Eastern") -> Optional[str]:
+        """
+        Get the game start time in the specified format, or None if it isn't known.
+        """
+        if self.raw_game_time is None:
+            return None
+        return self.raw_game_time.astimezone(pytz.timezone(timezone)).strftime(format)
+
+    @property
+    def venue(self) -> str:
+        """
+        Get the venue of the game.
+        """
+        return self.game.get('venue', {}).get('default', 'Unknown')
+
+    @property
+    def away_team_id(self) -> int:
+        """
+        Get the away team's ID.
+        """
+        return self.game.get('awayTeam', {}).get('id', 0)
+
+    @property
+    def home_team_id(self) -> int:
+        """
+        Get the home team's ID.
+        """
+        return self.game.get('homeTeam', {}).get('id', 0)
+
+    @property
+    def away_team_abbr(self) -> str:
+        """
+        Get the away team's abbreviation.
+        """
+        return self.game.get('awayTeam', {}).get('abbrev', 'UNK')
+
+    @property
+    def home_team_abbr(self) -> str:
+        """
+        Get the home team's abbreviation.
+        """
+        return self.game.get('homeTeam', {}).get('abbrev', 'UNK')
+
+    @property
+    def away_team_full_name(self) -> str:
+        """
+        Get the away team's full name.
+        """
+        team = self.game.get('awayTeam', {})
+        return team.get('placeName', {}).get("default", "Unknown") + " " + team.get('commonName', {}).get("default", "Unknown")
+
+    @property
+    def home_team_full_name(self) -> str:
+        """
+        Get the home team's full name.
+        """
+        team = self.game.get('homeTeam', {})
+        return team.get('placeName', {}).get("default", "Unknown") + " " + team.get('commonName', {}).get("default", "Unknown")
+
+    @property
+    def away_score(self) -> int:
+        """
+        Get the away team's score.
+        """
+        return self.game.get('awayTeam', {}).get('score', 0)
+
+    @property
+    def home_score(self) -> int:
+        """
+        Get the home team's score.
+        """
+        return self.game.get('homeTeam', {}).get('score', 0)
+
+    @property
+    def playing_against(self) -> str:
+        """
+        Get the team that the Devils are playing against.
+        """
+        if self.away_team_id == 1:
+            return self.home_team_full_name
+        else:
+            return self.away_team_full_name
+
+    @property
+    def playing_against_abbr(self) -> str:
+        """
+        Get the abbreviation of the team that the Devils are playing against.
+        """
+        if self.away_team_id == 1:
+            return self.home_team_abbr
+        else:
+            return self.away_team_abbr
+
+    def __eq__(self, value: object) -> bool:
+        """
+        Check if two games are equal.
+        """
+        if not isinstance(value, (ScheduledGame, Game)):
+            return False
+
+        return self.game_id == value.game_id
+
+    def __str__(self) -> str:
+        """
+        Get the string representation of the game.
+        """
+        return f"{self.away_team_full_name} @ {self.home_team_full_name} - {self.game_time('%Y-%m-%d %I:%M %p') or 'TBD'}"
 
 class Schedule:
-    def __init__(self, date: str = "now"):
+    def __init__(self, date: str = "now", client: Optional[HockeyClient] = None):
         """
         Initialize the Schedule object with a date.
         """
         self.schedule: List[Dict[str, Any]] = []
         self.date = date
+        self.client = client or get_client()
+
+        # the last decoded response, and what changed in the last fetch
+        self._data: Any = None
+        self.diff: Diff = {}
+        # set when the NHL API was failing and the last good schedule was used
+        self.stale = False
+
+        self.games: List[ScheduledGame] = []
+        self._by_id: Dict[int, ScheduledGame] = {}
+        self._by_date: Dict[str, List[ScheduledGame]] = {}
+        self._by_team: Dict[int, List[ScheduledGame]] = {}
+        self._next_by_team: Dict[int, ScheduledGame] = {}
+        self._not_final: List[ScheduledGame] = []
+        self._upcoming: List[ScheduledGame] = []
 
         if date == "now":
             current_date = datetime.now().astimezone(pytz.UTC)
@@ -28,123 +290,183 @@ class Schedule:
         """
         Calculate the season based on the given date.
         """
-        if date.month > 7:
-            return f"{date.year}{date.year + 1}"
-        else:
-            return f"{date.year - 1}{date.year}"
+        return season_for(date)
 
-    async def fetch_full_schedule(self) -> None:
+    def _build_indexes(self, game_date: Optional[str] = None) -> None:
+        """
+        Build the lookup indexes for the fetched schedule.
+        """
+        self.games = [ScheduledGame(game, self.client, game_date) for game in self.schedule]
+        self._by_id = {}
+        self._by_date = {}
+        self._by_team = {}
+        self._next_by_team = {}
+
+        for game in self.games:
+            self._by_id[game.game_id] = game
+            self._by_date.setdefault(game.game_date, []).append(game)
+            for team_id in (game.away_team_id, game.home_team_id):
+                self._by_team.setdefault(team_id, []).append(game)
+                if game.is_upcoming and team_id not in self._next_by_team:
+                    self._next_by_team[team_id] = game
+
+        self._not_final = [game for game in self.games if game.game.get('gameState') not in FINAL_STATES]
+        self._upcoming = sorted((game for game in self.games if game.is_upcoming), key=lambda game: game.game['startTimeUTC'])
+
+    def _accept(self, data: Any) -> bool:
+        """
+        Check if a response differs from the last one, recording what changed.
+
+        The client hands back the same object while a URL's body is
+        unchanged, so identity is enough to skip rebuilding the indexes.
+        """
+        if data is self._data:
+            self.diff = {}
+            return False
+        self.diff = structural_diff(self.schedule, self._games_in(data)) if self._data is not None else {}
+        self._data = data
+        return True
+
+    @staticmethod
+    def _games_in(data: Any) -> List[Dict[str, Any]]:
+        """
+        Get the games from a full or team schedule response.
+        """
+        if 'gameWeek' in data:
+            return data['gameWeek'][0]['games']
+        return data['games']
+
+    async def fetch_full_schedule(self) -> bool:
         """
         Fetch the full schedule for the given date.
+
+        Returns whether the schedule changed since the last fetch.
         """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(API_FULL_SCHEDULE_URL.format(self.date)) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    self.schedule = data['gameWeek'][0]['games']
+            url = self.client.api_url(API_FULL_SCHEDULE_PATH.format(self.date))
+            data = await self.client.get_json(url)
+            self.stale = self.client.is_stale(url)
+            if not self._accept(data):
+                return False
+            self.schedule = self._games_in(data)
+            self._build_indexes(data['gameWeek'][0].get('date'))
+            return True
         except aiohttp.ClientError as e:
             print(f"Failed to fetch full schedule: {e}")
+            return False
 
-    async def fetch_team_schedule(self, team_tri_code: str) -> None:
+    async def fetch_team_schedule(self, team_tri_code: str) -> bool:
         """
         Fetch the schedule for a specific team for the current season.
+
+        Returns whether the schedule changed since the last fetch.
         """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(API_TEAM_SCHEDULE_URL.format(team_tri_code, self.season)) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    self.schedule = data['games']
+            url = self.client.api_url(API_TEAM_SCHEDULE_PATH.format(team_tri_code, self.season))
+            data = await self.client.get_json(url)
+            self.stale = self.client.is_stale(url)
+            if not self._accept(data):
+                return False
+            self.schedule = self._games_in(data)
+            self._build_indexes()
+            return True
         except aiohttp.ClientError as e:
             print(f"Failed to fetch team schedule: {e}")
+            return False
 
-    async def get_schedule(self, number_of_games: int = None) -> List[Game]:
+    def find_schedule(self, number_of_games: int = None) -> List[ScheduledGame]:
         """
-        Get the current schedule.
+        Get the scheduled games, or the next number_of_games that aren't final.
         """
-        games = []
         if number_of_games:
-            for game in self.schedule:
-                if game['gameState'] not in ['FINAL', 'OFF', 'OVER']:
-                    games.append(await Game.init(game['id']))
-                if len(games) == number_of_games:
-                    break
+            return self._not_final[:number_of_games]
+        return list(self.games)
+
+    def find_game(self, *, team_id: int = None) -> Optional[ScheduledGame]:
+        """
+        Get the first scheduled game for a team, or on the schedule's date.
+        """
+        if team_id:
+            games = self._by_team.get(team_id)
         else:
-            for game in self.schedule:
-                games.append(await Game.init(game['id']))
-        
+            games = self._by_date.get(self.date)
+        return games[0] if games else None
+
+    def find_games_by_date(self, date: str) -> List[ScheduledGame]:
+        """
+        Get the scheduled games on a date (YYYY-MM-DD).
+        """
+        return list(self._by_date.get(date, []))
+
+    def find_current_game(self) -> Optional[ScheduledGame]:
+        """
+        Get the first game that isn't final and is still on the schedule, live or not.
+        """
+        return next((game for game in self._not_final if game.game.get('gameScheduleState') == 'OK'), None)
+
+    def find_game_by_id(self, game_id: int) -> Optional[ScheduledGame]:
+        """
+        Get a scheduled game by its ID.
+        """
+        return self._by_id.get(game_id)
+
+    def find_next_game(self) -> Optional[ScheduledGame]:
+        """
+        Get the next scheduled game that hasn't started.
+        """
+        return self._upcoming[0] if self._upcoming else None
+
+    def find_next_time_playing_opponent(self, team_id: int) -> Optional[ScheduledGame]:
+        """
+        Get the next scheduled game against an opponent.
+        """
+        return self._next_by_team.get(team_id)
+
+    async def get_schedule(self, number_of_games: int = None) -> List[Game]:
+        """
+        Get the current schedule.
+        """
+        games, failures = await Game.init_many([game.game_id for game in self.find_schedule(number_of_games)], self.client)
+        for game_id, e in failures.items():
+            print(f"Failed to fetch game data for {game_id}: {e}")
+
+        for game in games:
+            scheduled = self._by_id[game.game_id]
+            if scheduled.is_playoffs:
+                game.set_round(scheduled.round)
         return games
 
     async def get_game(self, *, team_id: int = None) -> Optional[Game]:
         """
         Get a game for a specific team by its ID.
         """
-        for game in self.schedule:
-            if team_id:
-                if game['awayTeam']['id'] == team_id or game['homeTeam']['id'] == team_id:
-                    if game['gameType'] != 3:
-                        return await Game.init(game['id'])
-                    else:
-                        _game = await Game.init(game['id'])
-                        _game.set_round(game['seriesStatus']['round'])
-                        return _game
-            else:
-                if game['gameDate'] == self.date:
-                    if game['gameType'] != 3:
-                        return await Game.init(game['id'])
-                    else:
-                        _game = await Game.init(game['id'])
-                        _game.set_round(game['seriesStatus']['round'])
-                        return _game
-        return None
+        game = self.find_game(team_id=team_id)
+        return await game.hydrate() if game else None
 
     async def get_game_by_id(self, game_id: int) -> Optional[Game]:
         """
         Get a game by its ID.
         """
-        for game in self.schedule:
-            if game['id'] == game_id:
-                if game['gameType'] != 3:
-                    return await Game.init(game['id'])
-                else:
-                    _game = await Game.init(game['id'])
-                    _game.set_round(game['seriesStatus']['round'])
-                    return _game
-        return None
+        game = self.find_game_by_id(game_id)
+        return await game.hydrate() if game else None
     
     async def get_next_game(self) -> Optional[Game]:
         """
         Get the next game.
         """
-        for game in self.schedule:
-            if game['gameState'] in ['FUT', 'PRE'] and game['gameScheduleState'] == 'OK':
-                if game['gameType'] != 3:
-                    return await Game.init(game['id'])
-                else:
-                    _game = await Game.init(game['id'])
-                    _game.set_round(game['seriesStatus']['round'])
-                    return _game
-        return None
+        game = self.find_next_game()
+        return await game.hydrate() if game else None
     
     async def get_next_time_playing_opponent(self, team_id: int) -> Optional[Game]:
         """
         Get the next time playing opponent.
         """
-        for game in self.schedule:
-            if game['awayTeam']['id'] == team_id or game['homeTeam']['id'] == team_id:
-                if game['gameState'] in ['FUT', 'PRE'] and game['gameScheduleState'] == 'OK':
-                    if game['gameType'] != 3:
-                        return await Game.init(game['id'])
-                    else:
-                        _game = await Game.init(game['id'])
-                        _game.set_round(game['seriesStatus']['round'])
-                        return _game
-        return None
+        game = self.find_next_time_playing_opponent(team_id)
+        return await game.hydrate() if game else None
     
     def set_date(self, date: str) -> None:
         """
         Set the date for the schedule.
         """
         self.date = date
-        self.season = self._calculate_season(datetime.strptime(date, "%Y-%m-%d"))
\ No newline at end of file
+        self.season = self._calculate_season(datetime.strptime(date, "%Y-%m-%d"))
@@ -0,0 +1,175 @@
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional, Tuple
+
+import pytz
+
+class GameState(str, Enum):
+    """
+    The API's gameState codes.
+    """
+    FUT = "FUT"
+    PRE = "PRE"
+    LIVE = "LIVE"
+    CRIT = "CRIT"
+    OVER = "OVER"
+    FINAL = "FINAL"
+    OFF = "OFF"
+
+    @property
+    def is_live(self) -> bool:
+        """
+        Check if the state is in play.
+        """
+        return self in (GameState.LIVE, GameState.CRIT)
+
+    @property
+    def is_final(self) -> bool:
+        """
+        Check if the state is over, official or not.
+        """
+        return self in (GameState.FINAL, GameState.OFF, GameState.OVER)
+
+    @property
+    def is_upcoming(self) -> bool:
+        """
+        Check if the state is before puck drop.
+        """
+        return self in (GameState.FUT, GameState.PRE)
+
+class ScheduleState(str, Enum):
+    """
+    The API's gameScheduleState codes.
+    """
+    OK = "OK"
+    TBD = "TBD"
+    PPD = "PPD"
+    SUSP = "SUSP"
+    CNCL = "CNCL"
+
+Record = Tuple[int, int, int]
+NO_RECORD: Record = (0, 0, 0)
+
+def _enum(kind: type, value: Any) -> Any:
+    """
+    Get the enum member for an API code, or None if it's missing or unknown.
+    """
+    try:
+        return kind(value)
+    except ValueError:
+        return None
+
+def parse_start_time(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse a startTimeUTC value into an aware UTC datetime.
+    """
+    if not value:
+        return None
+    return pytz.utc.localize(datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ"))
+
+def season_for(date: datetime) -> str:
+    """
+    Get the season a date falls in, ex: 20242025. Seasons roll over in August.
+    """
+    if date.month > 7:
+        return f"{date.year}{date.year + 1}"
+    return f"{date.year - 1}{date.year}"
+
+def _parse_record(value: Any) -> Record:
+    """
+    Parse a "W-L-OTL" record, padding missing parts with zeros.
+    """
+    if not isinstance(value, str):
+        return NO_RECORD
+    parts = [int(part) if part.isdigit() else 0 for part in value.split("-")[:3]]
+    return tuple(parts + [0] * (3 - len(parts)))
+
+@dataclass(frozen=True, slots=True)
+class TeamSnapshot:
+    """
+    One side of a game, parsed from a landing payload.
+    """
+    id: int
+    abbr: str
+    name: str
+    place: str
+    full_name: str
+    score: int
+    record: Record
+    record_text: str
+
+    @classmethod
+    def from_landing(cls, team: Dict[str, Any]) -> 'TeamSnapshot':
+        """
+        Build a TeamSnapshot from a landing payload's awayTeam or homeTeam.
+        """
+        record_text = team.get('record') if isinstance(team.get('record'), str) else "0-0-0"
+        name = team.get('commonName', {}).get('default', 'Unknown')
+        place = team.get('placeName', {}).get('default', 'Unknown')
+        return cls(
+            id=team.get('id', 0),
+            abbr=team.get('abbrev', 'UNK'),
+            name=name,
+            place=place,
+            full_name=f"{place} {name}",
+            score=team.get('score', 0),
+            record=_parse_record(record_text),
+            record_text=record_text
+        )
+
+@dataclass(frozen=True, slots=True)
+class GameSnapshot:
+    """
+    An immutable, pre-parsed view of a landing payload.
+
+    Built once per refresh so the polling loop and embed builders read typed
+    fields instead of walking the raw dict and re-parsing times and records.
+    raw is only kept when asked for.
+    """
+    game_id: int
+    season: str
+    game_type: int
+    game_state: Optional[GameState]
+    schedule_state: Optional[ScheduleState]
+    start_time: Optional[datetime]
+    venue: str
+    away: TeamSnapshot
+    home: TeamSnapshot
+    period: int
+    period_type: str
+    clock: str
+    seconds_remaining: int
+    in_intermission: bool
+    # playoff series wins as (away, home)
+    series_wins: Tuple[int, int]
+    raw: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_landing(cls, payload: Dict[str, Any], keep_raw: bool = False) -> 'GameSnapshot':
+        """
+        Parse a landing payload.
+        """
+        period = payload.get('periodDescriptor', {})
+        clock = payload.get('clock', {})
+        series = payload.get('summary', {}).get('seasonSeriesWins', {})
+        return cls(
+            game_id=payload.get('id', 0),
+            season=payload.get('season', "Unknown"),
+            game_type=payload.get('gameType', 0),
+            game_state=_enum(GameState, payload.get('gameState')),
+            schedule_state=_enum(ScheduleState, payload.get('gameScheduleState')),
+            start_time=parse_start_time(payload.get('startTimeUTC')),
+            venue=payload.get('venue', {}).get('default', 'Unknown'),
+            away=TeamSnapshot.from_landing(payload.get('awayTeam', {})),
+            home=TeamSnapshot.from_landing(payload.get('homeTeam', {})),
+            period=period.get('number', 0),
+            period_type=period.get('periodType', 'REG'),
+            clock=clock.get('timeRemaining', '00:00'),
+            seconds_remaining=clock.get('secondsRemaining', 0),
+            in_intermission=clock.get('inIntermission', False),
+            series_wins=(int(series.get('awayTeamWins', 0)), int(series.get('homeTeamWins', 0))),
+            raw=payload if keep_raw else None
+        )
+
+EMPTY_SNAPSHOT = GameSnapshot.from_landing({})
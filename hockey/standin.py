@@ -0,0 +1,498 @@
+"""
+An offline stand-in for the NHL APIs, served from recorded JSON fixtures.
+
+Fixtures live under hockey/data/fixtures and mirror the api-web paths
+(schedule/2024-12-27.json, club-schedule-season/njd/20242025.json,
+gamecenter/2024020518/landing.json). The franchise list comes from
+franchise.json there, or the bundled franchises.json snapshot.
+
+In replay mode, the final landings of one fixture date are played back as a
+live game night (FUT, PRE, three periods with intermissions, OT, OVER,
+FINAL, OFF) at speed times real time, moved so the first puck drop lands just
+after the server starts. Every date then serves that slate.
+
+    python -m hockey.standin serve --replay 2024-12-27 --speed 60
+    python -m hockey.standin record --date 2024-12-27 --team njd --season 20242025
+
+Point the bot at it with NHL_API_BASE and NHL_RECORDS_BASE, or build a client
+with StandIn.client().
+"""
+import argparse
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import time
+import zoneinfo
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from hockey.client import HockeyClient
+from hockey.team import SNAPSHOT_FILE
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'data', 'fixtures')
+
+DEFAULT_SPEED = 60
+
+# game-time lengths of each phase, in seconds, before speed is applied
+PREGAME_LENGTH = 60 * 30
+PERIOD_CLOCK = 60 * 20
+# a 20 minute period takes about 35 minutes of wall time with stoppages
+PERIOD_LENGTH = 60 * 35
+INTERMISSION_LENGTH = 60 * 18
+OT_BREAK_LENGTH = 60 * 2
+REGULAR_OT_CLOCK = 60 * 5
+OVER_LENGTH = 60 * 5
+FINAL_LENGTH = 60 * 15
+CRITICAL_SECONDS = 60 * 5
+# how long before the first pregame window the replay starts
+REPLAY_LEAD = 60
+
+eastern = zoneinfo.ZoneInfo("US/Eastern")
+
+def clock_text(seconds: float) -> str:
+    """
+    Format seconds as a mm:ss game clock.
+    """
+    seconds = max(int(seconds), 0)
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+def clock_seconds(text: str) -> int:
+    """
+    Parse a mm:ss game clock into seconds.
+    """
+    minutes, seconds = text.split(":")
+    return int(minutes) * 60 + int(seconds)
+
+@dataclass
+class Phase:
+    """
+    One stretch of a replayed game.
+    """
+    state: str
+    period: int
+    period_type: str
+    length: float
+    clock: float = 0
+    intermission: bool = False
+
+class ReplayGame:
+    def __init__(self, landing: Dict[str, Any], start_offset: float):
+        """
+        Initialize a ReplayGame from a final landing payload.
+
+        start_offset is the game-time second of the replay at which the puck
+        drops. Goals are revealed as the clock passes them, and the game ends
+        at the time of an overtime winner.
+        """
+        self.landing = landing
+        self.game_id: int = landing['id']
+        self.start_offset = start_offset
+        self.playoffs = landing.get('gameType') == 3
+
+        self.goals: List[Tuple[int, str, int, Dict[str, Any], Dict[str, Any]]] = []
+        for period in landing.get('summary', {}).get('scoring', []):
+            descriptor = period['periodDescriptor']
+            for goal in period.get('goals', []):
+                self.goals.append((descriptor['number'], descriptor['periodType'], clock_seconds(goal['timeInPeriod']), goal, descriptor))
+
+        self.phases = self._build_phases()
+
+    def _build_phases(self) -> List[Phase]:
+        """
+        Lay out the game's phases from puck drop to OFF.
+        """
+        phases = []
+        for period in (1, 2, 3):
+            phases.append(Phase('LIVE', period, 'REG', PERIOD_LENGTH, PERIOD_CLOCK))
+            if period < 3:
+                phases.append(Phase('LIVE', period, 'REG', INTERMISSION_LENGTH, PERIOD_CLOCK, intermission=True))
+
+        last = self.landing.get('periodDescriptor', {})
+        for period in range(4, last.get('number', 3) + 1):
+            if self.period_type(period) == 'SO':
+                phases.append(Phase('LIVE', period, 'SO', OT_BREAK_LENGTH * 2))
+                continue
+
+            ot_clock = PERIOD_CLOCK if self.playoffs else REGULAR_OT_CLOCK
+            break_length = INTERMISSION_LENGTH if self.playoffs else OT_BREAK_LENGTH
+            phases.append(Phase('LIVE', period - 1, phases[-1].period_type, break_length, PERIOD_CLOCK, intermission=True))
+
+            # sudden death ends at the winning goal
+            winner = [elapsed for number, _, elapsed, _, _ in self.goals if number == period]
+            played = min(winner) if winner else ot_clock
+            phases.append(Phase('LIVE', period, 'OT', PERIOD_LENGTH * played / PERIOD_CLOCK, ot_clock))
+
+        phases.append(Phase('OVER', phases[-1].period, phases[-1].period_type, OVER_LENGTH))
+        phases.append(Phase('FINAL', phases[-1].period, phases[-1].period_type, FINAL_LENGTH))
+        return phases
+
+    def period_type(self, number: int) -> str:
+        """
+        Get the periodType of a period number.
+        """
+        if number <= 3:
+            return 'REG'
+        return 'SO' if number == 5 and not self.playoffs else 'OT'
+
+    def state_at(self, game_time: float) -> Tuple[str, int, str, float, bool, Optional[Tuple[int, float]]]:
+        """
+        Get (state, period, period_type, seconds_remaining, in_intermission, progress) at a replay time.
+
+        progress is (period, clock elapsed) for revealing goals, or None before puck drop.
+        """
+        since_drop = game_time - self.start_offset
+        if since_drop < -PREGAME_LENGTH:
+            return 'FUT', 0, 'REG', PERIOD_CLOCK, False, None
+        if since_drop < 0:
+            return 'PRE', 0, 'REG', PERIOD_CLOCK, False, None
+
+        for phase in self.phases:
+            if since_drop < phase.length:
+                if phase.state != 'LIVE':
+                    return phase.state, phase.period, phase.period_type, 0, False, (phase.period, float('inf'))
+                if phase.intermission:
+                    return 'LIVE', phase.period, phase.period_type, phase.length - since_drop, True, (phase.period, float('inf'))
+                elapsed = phase.clock * since_drop / phase.length
+                remaining = phase.clock - elapsed
+                state = 'CRIT' if phase.period >= 3 and remaining <= CRITICAL_SECONDS else 'LIVE'
+                return state, phase.period, phase.period_type, remaining, False, (phase.period, elapsed)
+            since_drop -= phase.length
+
+        last = self.phases[-1]
+        return 'OFF', last.period, last.period_type, 0, False, (last.period, float('inf'))
+
+    def payload(self, game_time: float, start_time: datetime) -> Dict[str, Any]:
+        """
+        Get the landing payload at a replay time.
+        """
+        state, period, period_type, remaining, intermission, progress = self.state_at(game_time)
+
+        payload = copy.deepcopy(self.landing)
+        payload['gameState'] = state
+        payload['startTimeUTC'] = start_time.strftime("%Y-%m-%dT%H:%M:%SZ")
+        payload['gameDate'] = start_time.astimezone(eastern).strftime("%Y-%m-%d")
+        payload['clock'] = {
+            "timeRemaining": clock_text(remaining),
+            "secondsRemaining": int(remaining),
+            "running": state in ('LIVE', 'CRIT') and not intermission,
+            "inIntermission": intermission
+        }
+
+        away_score, home_score = 0, 0
+        scoring: Dict[int, Dict[str, Any]] = {}
+        if progress is not None:
+            payload['periodDescriptor'] = {"number": period, "periodType": period_type, "maxRegulationPeriods": 3}
+            for number, _, elapsed, goal, descriptor in self.goals:
+                if (number, elapsed) <= progress:
+                    if goal['isHome']:
+                        home_score += 1
+                    else:
+                        away_score += 1
+                    scoring.setdefault(number, {"periodDescriptor": descriptor, "goals": []})['goals'].append(goal)
+            for number in range(1, period + 1):
+                if self.period_type(number) != 'SO':
+                    scoring.setdefault(number, {"periodDescriptor": {"number": number, "periodType": self.period_type(number), "maxRegulationPeriods": 3}, "goals": []})
+            payload.setdefault('summary', {})['scoring'] = [scoring[number] for number in sorted(scoring)]
+            payload['awayTeam']['score'] = away_score
+            payload['homeTeam']['score'] = home_score
+        else:
+            payload.pop('periodDescriptor', None)
+            payload.pop('summary', None)
+            payload['awayTeam'].pop('score', None)
+            payload['homeTeam'].pop('score', None)
+        return payload
+
+class StandIn:
+    def __init__(self, fixtures_dir: str = FIXTURES_DIR, host: str = '127.0.0.1', port: int = 0,
+                 replay: Optional[str] = None, speed: float = DEFAULT_SPEED):
+        """
+        Initialize the StandIn server.
+
+        With replay set to a fixture date, that slate is replayed live at speed;
+        otherwise fixtures are served exactly as recorded. port 0 picks a free port.
+        """
+        self.fixtures_dir = fixtures_dir
+        self.host = host
+        self.port = port
+        self.speed = speed
+
+        self.requests: Counter = Counter()
+        self.not_modified = 0
+
+        self.replay_date = replay
+        self.replay_games: Dict[int, ReplayGame] = {}
+        self.started_at = time.time()
+        if replay is not None:
+            self._load_replay(replay)
+
+        self._runner: Optional[web.AppRunner] = None
+
+    def _read(self, *path: str) -> Optional[Any]:
+        """
+        Read a fixture, or None if it wasn't recorded.
+        """
+        file = os.path.join(self.fixtures_dir, *path)
+        if not os.path.exists(file):
+            return None
+        with open(file, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _load_replay(self, date: str) -> None:
+        """
+        Set up the replay of a fixture date's slate.
+        """
+        slate = self._read('schedule', f"{date}.json")
+        if slate is None:
+            raise FileNotFoundError(f"No schedule fixture for {date}")
+
+        landings = []
+        for game in slate['gameWeek'][0]['games']:
+            landing = self._read('gamecenter', str(game['id']), 'landing.json')
+            if landing is not None:
+                landings.append(landing)
+        if not landings:
+            raise FileNotFoundError(f"No landing fixtures for the {date} slate")
+
+        def recorded_start(landing: Dict[str, Any]) -> float:
+            return datetime.strptime(landing['startTimeUTC'], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc).timestamp()
+
+        # keep the games' relative start times, with the first pregame window just after startup
+        self.recorded_first_start = min(recorded_start(landing) for landing in landings)
+        for landing in landings:
+            offset = REPLAY_LEAD + PREGAME_LENGTH + recorded_start(landing) - self.recorded_first_start
+            self.replay_games[landing['id']] = ReplayGame(landing, offset)
+        self.slate = slate
+
+    @property
+    def game_time(self) -> float:
+        """
+        Get the seconds of game time since the replay started.
+        """
+        return (time.time() - self.started_at) * self.speed
+
+    def start_time(self, game: ReplayGame) -> datetime:
+        """
+        Get the wall-clock puck drop of a replayed game.
+        """
+        return datetime.fromtimestamp(self.started_at + game.start_offset / self.speed, timezone.utc)
+
+    @property
+    def time_shift(self) -> float:
+        """
+        Get the seconds between the recorded and replayed first puck drop.
+        """
+        first_offset = min(game.start_offset for game in self.replay_games.values())
+        return self.started_at + first_offset / self.speed - self.recorded_first_start
+
+    def _replay_entry(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Rewrite a schedule entry for the replay.
+
+        Replayed games match their landing; other games keep their recorded
+        state and move by the same shift as the first puck drop, so past games
+        stay past and future ones stay future.
+        """
+        game = self.replay_games.get(entry['id'])
+        if game is None:
+            entry = copy.deepcopy(entry)
+            start = datetime.strptime(entry['startTimeUTC'], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+            start = datetime.fromtimestamp(start.timestamp() + self.time_shift, timezone.utc)
+            entry['startTimeUTC'] = start.strftime("%Y-%m-%dT%H:%M:%SZ")
+            if 'gameDate' in entry:
+                entry['gameDate'] = start.astimezone(eastern).strftime("%Y-%m-%d")
+            return entry
+
+        landing = game.payload(self.game_time, self.start_time(game))
+        entry = copy.deepcopy(entry)
+        for key in ('gameState', 'startTimeUTC', 'periodDescriptor'):
+            if key in landing:
+                entry[key] = landing[key]
+            else:
+                entry.pop(key, None)
+        if 'gameDate' in entry:
+            entry['gameDate'] = landing['gameDate']
+        for side in ('awayTeam', 'homeTeam'):
+            if 'score' in landing[side]:
+                entry[side]['score'] = landing[side]['score']
+            else:
+                entry[side].pop('score', None)
+        return entry
+
+    def _respond(self, request: web.Request, route: str, data: Optional[Any]) -> web.Response:
+        """
+        Serve a payload with an ETag, answering a matching If-None-Match with a 304.
+        """
+        self.requests[route] += 1
+        if data is None:
+            return web.json_response({"message": "No fixture recorded"}, status=404)
+
+        body = json.dumps(data).encode()
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if request.headers.get('If-None-Match') == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={'ETag': etag})
+        return web.Response(body=body, content_type='application/json', headers={'ETag': etag})
+
+    async def _schedule(self, request: web.Request) -> web.Response:
+        date = request.match_info['date']
+        if not self.replay_games:
+            return self._respond(request, 'schedule', self._read('schedule', f"{date}.json"))
+
+        data = copy.deepcopy(self.slate)
+        day = data['gameWeek'][0]
+        day['date'] = date
+        day['games'] = [self._replay_entry(entry) for entry in day['games']]
+        return self._respond(request, 'schedule', data)
+
+    async def _team_schedule(self, request: web.Request) -> web.Response:
+        team, season = request.match_info['team'], request.match_info['season']
+        data = self._read('club-schedule-season', team, f"{season}.json")
+        if data is None and self.replay_games:
+            # replays answer for any season with the recorded one
+            folder = os.path.join(self.fixtures_dir, 'club-schedule-season', team)
+            recorded = sorted(os.listdir(folder)) if os.path.isdir(folder) else []
+            data = self._read('club-schedule-season', team, recorded[-1]) if recorded else None
+        if data is not None and self.replay_games:
+            data['games'] = [self._replay_entry(entry) for entry in data['games']]
+            data['games'].sort(key=lambda entry: entry['startTimeUTC'])
+        return self._respond(request, 'club-schedule-season', data)
+
+    async def _landing(self, request: web.Request) -> web.Response:
+        game_id = int(request.match_info['game_id'])
+        game = self.replay_games.get(game_id)
+        if game is not None:
+            return self._respond(request, 'landing', game.payload(self.game_time, self.start_time(game)))
+        return self._respond(request, 'landing', self._read('gamecenter', str(game_id), 'landing.json'))
+
+    async def _franchise(self, request: web.Request) -> web.Response:
+        data = self._read('franchise.json')
+        if data is None:
+            with open(SNAPSHOT_FILE, encoding='utf-8') as f:
+                data = json.load(f)
+        return self._respond(request, 'franchise', data)
+
+    def app(self) -> web.Application:
+        """
+        Build the aiohttp application.
+        """
+        app = web.Application()
+        app.router.add_get('/v1/schedule/{date}', self._schedule)
+        app.router.add_get('/v1/club-schedule-season/{team}/{season}', self._team_schedule)
+        app.router.add_get('/v1/gamecenter/{game_id}/landing', self._landing)
+        app.router.add_get('/site/api/franchise', self._franchise)
+        return app
+
+    async def start(self) -> None:
+        """
+        Start serving, restarting the replay clock.
+        """
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        self.started_at = time.time()
+
+    async def stop(self) -> None:
+        """
+        Stop serving.
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> 'StandIn':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    @property
+    def api_base(self) -> str:
+        """
+        Get the base URL to use in place of api-web.nhle.com/v1.
+        """
+        return f"http://{self.host}:{self.port}/v1"
+
+    @property
+    def records_base(self) -> str:
+        """
+        Get the base URL to use in place of records.nhl.com/site/api.
+        """
+        return f"http://{self.host}:{self.port}/site/api"
+
+    def client(self, **kwargs: Any) -> HockeyClient:
+        """
+        Get a HockeyClient pointed at this server.
+        """
+        return HockeyClient(api_base=self.api_base, records_base=self.records_base, **kwargs)
+
+async def record(fixtures_dir: str, date: str, team: str, season: str) -> None:
+    """
+    Record a date's slate, its landings, a team schedule and the franchise list from the live APIs.
+    """
+    client = HockeyClient()
+
+    async def save(data: Any, *path: str) -> None:
+        file = os.path.join(fixtures_dir, *path)
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        with open(file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, ensure_ascii=False)
+        print(f"Recorded {os.path.relpath(file, fixtures_dir)}")
+
+    try:
+        slate = await client.get_json(client.api_url(f"/schedule/{date}"))
+        await save(slate, 'schedule', f"{date}.json")
+        await save(await client.get_json(client.api_url(f"/club-schedule-season/{team}/{season}")), 'club-schedule-season', team, f"{season}.json")
+        for game in slate['gameWeek'][0]['games']:
+            await save(await client.get_json(client.api_url(f"/gamecenter/{game['id']}/landing")), 'gamecenter', str(game['id']), 'landing.json')
+    finally:
+        await client.close()
+
+async def serve(args: argparse.Namespace) -> None:
+    """
+    Run the server until interrupted.
+    """
+    standin = StandIn(args.fixtures, args.host, args.port, args.replay, args.speed)
+    await standin.start()
+    print(f"NHL_API_BASE={standin.api_base}")
+    print(f"NHL_RECORDS_BASE={standin.records_base}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await standin.stop()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline stand-in for the NHL APIs.")
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help="serve recorded fixtures")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8080)
+    serve_parser.add_argument('--replay', metavar='DATE', help="replay this fixture date as a live game night")
+    serve_parser.add_argument('--speed', type=float, default=DEFAULT_SPEED)
+
+    record_parser = commands.add_parser('record', help="record fixtures from the live APIs")
+    record_parser.add_argument('--date', required=True)
+    record_parser.add_argument('--team', default='njd')
+    record_parser.add_argument('--season', required=True)
+
+    args = parser.parse_args()
+    try:
+        if args.command == 'serve':
+            asyncio.run(serve(args))
+        else:
+            asyncio.run(record(args.fixtures, args.date, args.team, args.season))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
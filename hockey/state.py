@@ -0,0 +1,454 @@
+import asyncio
+import time
+import zoneinfo
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from hockey import cadence
+from hockey.client import HockeyClient, get_client
+from hockey.diff import structural_diff
+from hockey.game import Game
+from hockey.schedule import Schedule, ScheduledGame
+from hockey.team import get_directory
+from util.logger import setup_logger
+
+GAME_SCHEDULED = "game_scheduled"
+PREGAME_WINDOW = "pregame_window"
+PUCK_DROP = "puck_drop"
+PERIOD_CHANGE = "period_change"
+SCORE_CHANGE = "score_change"
+FINAL = "final"
+POSTPONED = "postponed"
+SCHEDULE_CHANGED = "schedule_changed"
+GAME_UPDATED = "game_updated"
+
+EVENT_TYPES = (
+    GAME_SCHEDULED,
+    PREGAME_WINDOW,
+    PUCK_DROP,
+    PERIOD_CHANGE,
+    SCORE_CHANGE,
+    FINAL,
+    POSTPONED,
+    SCHEDULE_CHANGED,
+    GAME_UPDATED
+)
+
+TEAM_TRI_CODE = "njd"
+WARM_UP_TIMEOUT = 30
+
+# seconds between polls when the next cadence can't be worked out
+FALLBACK_INTERVAL = cadence.PREGAME_INTERVAL
+
+eastern = zoneinfo.ZoneInfo("US/Eastern")
+
+@dataclass
+class GameEvent:
+    """
+    An event published by the GameStateService.
+
+    game is a hydrated Game for events seen on a landing refresh and a
+    ScheduledGame for events seen on the schedule. previous holds the last
+    snapshot of the game before the change, if there was one. For
+    schedule_changed and game_updated, data["diff"] holds the fields that
+    changed since the last refresh.
+    """
+    kind: str
+    game_id: Optional[int]
+    game: Optional[Union[Game, ScheduledGame]]
+    previous: Optional[Dict[str, Any]] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+
+Subscriber = Callable[[GameEvent], Awaitable[None]]
+
+class GameStateService:
+    def __init__(self, client: Optional[HockeyClient] = None, team_tri_code: str = TEAM_TRI_CODE,
+                 time_scale: float = 1):
+        """
+        Initialize the GameStateService.
+
+        The service is the only thing that polls the NHL API for game state.
+        It follows the team's season schedule and the day's league slate,
+        diffs each refresh against the last one and publishes GameEvents to
+        subscribers. time_scale divides every poll interval, for replaying a
+        game night from hockey.standin faster than real time.
+        """
+        self.client = client or get_client()
+        self.team_tri_code = team_tri_code
+        self.time_scale = time_scale
+        self.log = setup_logger(__name__, 'log/game_state.log')
+
+        self.schedule = Schedule(client=self.client)
+        self.slate = Schedule(client=self.client)
+        self.current_game: Optional[ScheduledGame] = None
+        self.games: Dict[int, Game] = {}
+
+        self._subscribers: Dict[str, List[Subscriber]] = {kind: [] for kind in EVENT_TYPES}
+        self._snapshots: Dict[int, Dict[str, Any]] = {}
+        self._payloads: Dict[int, Dict[str, Any]] = {}
+        self._schedule_states: Dict[int, Tuple[str, str]] = {}
+        # () never matches a real key, so the first schedule poll always publishes
+        self._current_key: Any = ()
+        self._emitted: Set[Tuple[str, int]] = set()
+        self._active: Set[int] = set()
+        self._schedule_polled_at: Optional[float] = None
+
+        self._task: Optional[asyncio.Task] = None
+        self._deliveries: Set[asyncio.Task] = set()
+
+    def subscribe(self, kind: str, callback: Subscriber) -> None:
+        """
+        Call callback with every event of the given kind.
+        """
+        if kind not in self._subscribers:
+            raise ValueError(f"Unknown event type: {kind}")
+        self._subscribers[kind].append(callback)
+
+    def unsubscribe(self, kind: str, callback: Subscriber) -> None:
+        """
+        Stop calling callback for the given kind.
+        """
+        if callback in self._subscribers.get(kind, []):
+            self._subscribers[kind].remove(callback)
+
+    def publish(self, event: GameEvent) -> None:
+        """
+        Deliver an event to its subscribers.
+
+        Each subscriber runs in its own task so a slow handler (like the
+        close delay in GameChannel) never holds up polling.
+        """
+        self.log.info(f"Publishing {event.kind} for game {event.game_id}")
+        for callback in list(self._subscribers[event.kind]):
+            task = asyncio.create_task(self._deliver(callback, event))
+            self._deliveries.add(task)
+            task.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, callback: Subscriber, event: GameEvent) -> None:
+        """
+        Run one subscriber, logging instead of raising.
+        """
+        try:
+            await callback(event)
+        except Exception:
+            self.log.exception(f"Error in {event.kind} subscriber {callback}")
+
+    def start(self) -> None:
+        """
+        Start the polling loop.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            self.log.info("GameStateService started.")
+
+    async def stop(self) -> None:
+        """
+        Stop the polling loop and any running deliveries.
+        """
+        tasks = list(self._deliveries)
+        if self._task is not None:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self.log.info("GameStateService stopped.")
+
+    async def _run(self) -> None:
+        """
+        Poll, then sleep until the next poll is due.
+        """
+        while True:
+            try:
+                await self.poll()
+            except Exception:
+                self.log.exception("Error polling game state")
+            try:
+                interval, reason = self.next_cadence()
+            except Exception:
+                # never let a bad game kill the only poll task
+                self.log.exception("Error picking the next poll time")
+                interval, reason = FALLBACK_INTERVAL, "fallback after an error"
+            interval /= self.time_scale
+            self.log.info(f"Next poll in {interval:.0f}s: {reason}")
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    def _snapshot(game: Game) -> Dict[str, Any]:
+        """
+        Get the fields of a landing payload that events are derived from.
+        """
+        snapshot = game.snapshot
+        return {
+            "game_state": snapshot.game_state,
+            "schedule_state": snapshot.schedule_state,
+            "period": snapshot.period,
+            "away_score": snapshot.away.score,
+            "home_score": snapshot.home.score
+        }
+
+    def _emit_once(self, kind: str, game_id: int, game: Union[Game, ScheduledGame], previous: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Publish an event unless it was already published for this game.
+        """
+        if (kind, game_id) in self._emitted:
+            return
+        self._emitted.add((kind, game_id))
+        self.publish(GameEvent(kind, game_id, game, previous))
+
+    def todays_date(self) -> str:
+        """
+        Get today's date in Eastern time, which is how the NHL dates games.
+        """
+        return datetime.now(eastern).strftime("%Y-%m-%d")
+
+    def todays_game(self) -> Optional[ScheduledGame]:
+        """
+        Get the team's game today, if there is one.
+        """
+        games = self.schedule.find_games_by_date(self.todays_date())
+        return games[0] if games else None
+
+    async def warm_up(self, timeout: float = WARM_UP_TIMEOUT) -> float:
+        """
+        Seed the shared caches before anything starts polling.
+
+        Fetches the team schedule, today's slate and the franchise directory
+        in parallel, then the current game's landing as soon as the schedule
+        names it. Nothing is published; the first poll diffs the warmed
+        schedule. Returns the seconds it took.
+        """
+        start = time.monotonic()
+
+        async def schedule_and_current_game() -> None:
+            today = self.todays_date()
+            self.schedule.set_date(today)
+            self.slate.set_date(today)
+            await asyncio.gather(
+                self.schedule.fetch_team_schedule(self.team_tri_code),
+                self.slate.fetch_full_schedule()
+            )
+            current = self.schedule.find_current_game()
+            if current is not None:
+                await Game.init(current.game_id, self.client)
+
+        try:
+            results = await asyncio.wait_for(asyncio.gather(
+                schedule_and_current_game(),
+                get_directory(self.client).refresh(),
+                return_exceptions=True
+            ), timeout)
+            for result in results:
+                if isinstance(result, Exception):
+                    self.log.error(f"Warm-up step failed: {result}")
+        except asyncio.TimeoutError:
+            self.log.error(f"Warm-up timed out after {timeout}s")
+
+        elapsed = time.monotonic() - start
+        self.log.info(f"Warm-up took {elapsed:.2f}s")
+        return elapsed
+
+    async def ensure_schedule(self) -> None:
+        """
+        Fetch the schedule if it hasn't been fetched yet.
+        """
+        if self._schedule_polled_at is None:
+            await self.refresh_schedule()
+
+    async def refresh_schedule(self) -> None:
+        """
+        Fetch the team schedule and today's slate, and publish schedule events.
+
+        Nothing is diffed or published when neither response changed, unless
+        this is the first refresh (warm_up fetches without diffing).
+        """
+        first = self._schedule_polled_at is None
+        today = self.todays_date()
+        self.schedule.set_date(today)
+        self.slate.set_date(today)
+        changed = await asyncio.gather(
+            self.schedule.fetch_team_schedule(self.team_tri_code),
+            self.slate.fetch_full_schedule()
+        )
+        self._schedule_polled_at = time.monotonic()
+        if first or any(changed):
+            self.log.info(f"Schedule changed: {len(self.schedule.diff)} team schedule and {len(self.slate.diff)} slate fields")
+            self._diff_schedule()
+
+    def _diff_schedule(self) -> None:
+        """
+        Publish game_scheduled, postponed and schedule_changed from the team schedule.
+        """
+        seeded = bool(self._schedule_states)
+        team_game_ids = {game.game_id for game in self.schedule.games}
+        for game in self.schedule.games + self.slate.games:
+            state = (game.game.get('gameScheduleState'), game.game.get('startTimeUTC'))
+            previous = self._schedule_states.get(game.game_id)
+            self._schedule_states[game.game_id] = state
+
+            if previous is None:
+                if seeded and game.game_id in team_game_ids:
+                    self.publish(GameEvent(GAME_SCHEDULED, game.game_id, game))
+            elif previous[0] == 'OK' and state[0] != 'OK':
+                self._emit_once(POSTPONED, game.game_id, game)
+
+        current = self.schedule.find_current_game()
+        current_key = (current.game_id, current.game.get('startTimeUTC'), current.game.get('gameScheduleState')) if current else None
+        self.current_game = current
+        if current_key != self._current_key:
+            self._current_key = current_key
+            self.publish(GameEvent(SCHEDULE_CHANGED, current.game_id if current else None, current, data={"diff": self.schedule.diff}))
+
+        self._prune()
+
+    def _prune(self) -> None:
+        """
+        Forget games that are over and no longer on the schedule or today's slate.
+        """
+        scheduled = {game.game_id for game in self.schedule.games + self.slate.games}
+        for game_id in [game_id for game_id in self._schedule_states if game_id not in scheduled]:
+            del self._schedule_states[game_id]
+
+        keep = {game.game_id for game in self.slate.games} | self._active
+        if self.current_game is not None:
+            keep.add(self.current_game.game_id)
+        done = {game_id for _, game_id in self._emitted if game_id not in keep and self._is_settled(game_id)}
+        if done:
+            self._emitted = {key for key in self._emitted if key[1] not in done}
+            for game_id in done:
+                self.games.pop(game_id, None)
+            self.log.info(f"Forgot {len(done)} finished games")
+
+    def _candidates(self) -> List[ScheduledGame]:
+        """
+        Get the scheduled games that may need watching today.
+        """
+        candidates = [game for game in self.slate.games if not game.is_final]
+        if self.current_game and self.current_game not in candidates:
+            candidates.append(self.current_game)
+        return candidates
+
+    def _watched_ids(self) -> List[int]:
+        """
+        Get the IDs of games whose landing page needs refreshing.
+        """
+        now = datetime.now(zoneinfo.ZoneInfo("UTC"))
+        watched = set(self._active)
+        for game in self._candidates():
+            pregame = game.raw_pregame_time
+            if game.is_live or pregame is not None and now >= pregame:
+                watched.add(game.game_id)
+        return sorted(game_id for game_id in watched if not self._is_settled(game_id))
+
+    def _is_settled(self, game_id: int) -> bool:
+        """
+        Check if a game went final or was postponed, so needs no more polling.
+        """
+        return (FINAL, game_id) in self._emitted or (POSTPONED, game_id) in self._emitted
+
+    def _schedule_due(self) -> bool:
+        """
+        Check if the schedule should be fetched again.
+        """
+        if self._schedule_polled_at is None:
+            return True
+        interval, _ = cadence.schedule_cadence(self.current_game, datetime.now(zoneinfo.ZoneInfo("UTC")))
+        return time.monotonic() - self._schedule_polled_at >= interval / self.time_scale
+
+    async def poll(self) -> None:
+        """
+        Refresh whatever is due and publish the resulting events.
+        """
+        if self._schedule_due():
+            await self.refresh_schedule()
+
+        watched = self._watched_ids()
+        if not watched:
+            return
+
+        # the raw payload is kept for the structural diff and the goal feed
+        games, failures = await Game.init_many(watched, self.client, keep_payload=True)
+        for game_id, e in failures.items():
+            self.log.error(f"Failed to refresh game {game_id}: {e}")
+
+        for game in games:
+            scheduled = self.schedule.find_game_by_id(game.game_id) or self.slate.find_game_by_id(game.game_id)
+            if scheduled and scheduled.is_playoffs:
+                game.set_round(scheduled.round)
+            self.games[game.game_id] = game
+            self._diff_game(game)
+
+    def _diff_game(self, game: Game) -> None:
+        """
+        Publish the events implied by a game's latest landing refresh.
+        """
+        now = datetime.now(zoneinfo.ZoneInfo("UTC"))
+        previous = self._snapshots.get(game.game_id)
+        snapshot = self._snapshot(game)
+        self._snapshots[game.game_id] = snapshot
+
+        if not game.game_object:
+            return
+
+        # cache hits and unchanged bodies hand back the same payload object,
+        # so identity means nothing changed
+        last_payload = self._payloads.get(game.game_id)
+        if last_payload is not game.game_object:
+            self._payloads[game.game_id] = game.game_object
+            diff = structural_diff(last_payload, game.game_object) if last_payload is not None else {}
+            self.publish(GameEvent(GAME_UPDATED, game.game_id, game, previous, data={"diff": diff}))
+
+        if game.is_ppd or game.is_cancelled:
+            self._active.discard(game.game_id)
+            self._emit_once(POSTPONED, game.game_id, game, previous)
+            return
+
+        # a payload without a start time (e.g. a partial one) only moves on from its game state
+        started = game.raw_game_time is not None and now >= game.raw_game_time
+        if game.raw_pregame_time is not None and now >= game.raw_pregame_time and not game.is_final:
+            self._emit_once(PREGAME_WINDOW, game.game_id, game, previous)
+
+        if started or game.is_live or game.is_final:
+            if (PUCK_DROP, game.game_id) not in self._emitted and not game.is_final:
+                self._active.add(game.game_id)
+            self._emit_once(PUCK_DROP, game.game_id, game, previous)
+
+        if previous:
+            if game.is_live and snapshot["period"] != previous["period"]:
+                self.publish(GameEvent(PERIOD_CHANGE, game.game_id, game, previous))
+            # a late goal can land in the same refresh that turns the game final
+            if (snapshot["away_score"], snapshot["home_score"]) != (previous["away_score"], previous["home_score"]):
+                self.publish(GameEvent(SCORE_CHANGE, game.game_id, game, previous))
+
+        if game.is_final:
+            self._active.discard(game.game_id)
+            self._snapshots.pop(game.game_id, None)
+            self._payloads.pop(game.game_id, None)
+            self._emit_once(FINAL, game.game_id, game, previous)
+
+    def next_cadence(self) -> cadence.Cadence:
+        """
+        Get the number of seconds until the next poll, and the reason for it.
+        """
+        now = datetime.now(zoneinfo.ZoneInfo("UTC"))
+        candidates = []
+
+        interval, reason = cadence.schedule_cadence(self.current_game, now)
+        if self._schedule_polled_at is not None:
+            interval -= (time.monotonic() - self._schedule_polled_at) * self.time_scale
+        candidates.append((interval, f"schedule refresh ({reason})"))
+
+        watched = self._watched_ids()
+        for game_id in watched:
+            game = self.games.get(game_id)
+            if game is not None:
+                candidates.append(cadence.game_cadence(game, now))
+            else:
+                candidates.append((cadence.PREGAME_INTERVAL, f"game {game_id} not loaded yet"))
+
+        for game in self._candidates():
+            if game.game_id not in watched:
+                candidates.append(cadence.upcoming_cadence(game, now))
+
+        return cadence.next_cadence(candidates)
@@ -1,37 +1,166 @@
-from typing import Optional
+from typing import Optional, Dict, Any
+import asyncio
+import json
+import os
+import time
+import weakref
 import discord
-import aiohttp
 
-API_URL = 'https://records.nhl.com/site/api/franchise?include=teams.id&include=teams.active&include=teams.triCode&include=teams.placeName&include=teams.commonName&include=teams.fullName&include=teams.logos&include=teams.conference.name&include=teams.division.name'
+from hockey.client import HockeyClient, get_client
+
+API_PATH = '/franchise?include=teams.id&include=teams.active&include=teams.triCode&include=teams.placeName&include=teams.commonName&include=teams.fullName&include=teams.logos&include=teams.conference.name&include=teams.division.name'
+SNAPSHOT_FILE = os.path.join(os.path.dirname(__file__), 'data', 'franchises.json')
+
+DIRECTORY_TTL = 60 * 60 * 24
+SNAPSHOT_RETRY = 60 * 10
+
+class TeamDirectory:
+    def __init__(self, client: Optional[HockeyClient] = None, ttl: int = DIRECTORY_TTL):
+        """
+        Initialize the TeamDirectory, an in-memory index of the franchise payload.
+        """
+        self.client = client or get_client()
+        self.ttl = ttl
+        self.teams_by_id: Dict[int, Dict[str, Any]] = {}
+        self.teams_by_tri_code: Dict[str, Dict[str, Any]] = {}
+        self.source: Optional[str] = None
+        self.expires_at = 0.0
+
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _is_active(team: Dict[str, Any]) -> bool:
+        """
+        Check if a franchise team entry is an active team.
+        """
+        return team.get('active') in (True, 'Y', 'y', 1)
+
+    def _index(self, data: Dict[str, Any]) -> None:
+        """
+        Build the id and triCode indexes from a franchise payload.
+        """
+        teams_by_id = {}
+        teams_by_tri_code = {}
+        for franchise in data['data']:
+            for team in franchise['teams']:
+                teams_by_id[team['id']] = team
+
+                # triCodes get reused (ATL, UTA), so the active team wins
+                tri_code = (team.get('triCode') or '').upper()
+                if tri_code and (tri_code not in teams_by_tri_code or self._is_active(team)):
+                    teams_by_tri_code[tri_code] = team
+
+        self.teams_by_id = teams_by_id
+        self.teams_by_tri_code = teams_by_tri_code
+
+    def _load_snapshot(self) -> None:
+        """
+        Load the bundled franchise snapshot.
+        """
+        with open(SNAPSHOT_FILE, encoding='utf-8') as f:
+            self._index(json.load(f))
+        self.source = 'snapshot'
+
+    @property
+    def is_stale(self) -> bool:
+        """
+        Check if the directory needs to be refreshed.
+        """
+        return not self.teams_by_id or time.monotonic() >= self.expires_at
+
+    async def refresh(self, force: bool = False) -> None:
+        """
+        Refresh the directory from the API, falling back to the bundled snapshot.
+
+        A failed refresh, whether it raised or the client served a stale
+        response, is retried after SNAPSHOT_RETRY instead of the full TTL.
+        """
+        async with self._lock:
+            if not force and not self.is_stale:
+                return
+
+            try:
+                url = self.client.records_url(API_PATH)
+                data = await self.client.get_json(url)
+                self._index(data)
+                if self.client.is_stale(url):
+                    # the API failed and the client served its last good response
+                    self.source = 'stale'
+                    self.expires_at = time.monotonic() + SNAPSHOT_RETRY
+                else:
+                    self.source = 'api'
+                    self.expires_at = time.monotonic() + self.ttl
+            except Exception as e:
+                print(f"Failed to fetch franchise data: {e}")
+                if not self.teams_by_id:
+                    self._load_snapshot()
+                # keep serving what we have, but try the API again sooner
+                self.expires_at = time.monotonic() + SNAPSHOT_RETRY
+
+    async def get(self, team_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the raw team data for a team ID.
+        """
+        if self.is_stale:
+            await self.refresh()
+        return self.teams_by_id.get(team_id)
+
+    async def get_by_tri_code(self, tri_code: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the raw team data for a triCode.
+        """
+        if self.is_stale:
+            await self.refresh()
+        return self.teams_by_tri_code.get(tri_code.upper())
+
+    async def get_team(self, team_id: int) -> 'Team':
+        """
+        Get a Team object for a team ID.
+        """
+        return Team(team_id, self.client, await self.get(team_id))
+
+    async def get_team_by_tri_code(self, tri_code: str) -> Optional['Team']:
+        """
+        Get a Team object for a triCode.
+        """
+        team = await self.get_by_tri_code(tri_code)
+        if team is None:
+            return None
+        return Team(team['id'], self.client, team)
+
+_directories: 'weakref.WeakKeyDictionary[HockeyClient, TeamDirectory]' = weakref.WeakKeyDictionary()
+
+def get_directory(client: Optional[HockeyClient] = None) -> TeamDirectory:
+    """
+    Get the shared TeamDirectory for a client.
+    """
+    client = client or get_client()
+    directory = _directories.get(client)
+    if directory is None:
+        directory = _directories[client] = TeamDirectory(client)
+    return directory
 
 class Team:
-    def __init__(self, team_id: int):
+    def __init__(self, team_id: int, client: Optional[HockeyClient] = None, team: Optional[Dict[str, Any]] = None):
         """
         Initialize the Team object with team data.
         """
         self.team_id = team_id
-        self.team = {}
+        self.team = team or {}
+        self.client = client or get_client()
 
     @classmethod
-    async def init(cls, team_id: int):
-        self = cls(team_id)
+    async def init(cls, team_id: int, client: Optional[HockeyClient] = None):
+        self = cls(team_id, client)
         await self._fetch_team()
         return self
     
     async def _fetch_team(self) -> None:
         """
-        Fetch team data from the API and store it in the team object.
+        Look up team data in the shared TeamDirectory and store it in the team object.
         """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(API_URL.format(self.team_id)) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-
-            for franchise in data['data']:
-                for team in franchise['teams']:
-                    if team['id'] == self.team_id:
-                        self.team = team
+            self.team = await get_directory(self.client).get(self.team_id) or {}
         except Exception as e:
             print(f"Failed to fetch team data: {e}")
 
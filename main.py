@@ -3,6 +3,11 @@ import discord
 from util import settings
 from util.logger import setup_logger
 from discord.ext import commands
+from database.connection import close_all as close_databases
+from database.pick_store import get_pick_store
+from hockey.client import API_BASE_URL, RECORDS_BASE_URL, HockeyClient, set_client
+from hockey.response_cache import ResponseCache
+from hockey.state import GameStateService
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,10 +17,44 @@ except:
 	print("No token found. Please create a .env file with the token.")
 	exit()
 
+class DevilsBot(commands.Bot):
+	def __init__(self, *args, **kwargs):
+		super().__init__(*args, **kwargs)
+
+		# one pooled HTTP client for the NHL API, shared by every cog;
+		# responses persist on disk so restarts don't refetch everything;
+		# NHL_API_BASE/NHL_RECORDS_BASE can point it at hockey.standin
+		self.hockey_client = HockeyClient(
+			cache=ResponseCache(),
+			api_base=os.getenv("NHL_API_BASE", API_BASE_URL),
+			records_base=os.getenv("NHL_RECORDS_BASE", RECORDS_BASE_URL)
+		)
+		set_client(self.hockey_client)
+
+		# the only poller of NHL game state; cogs subscribe to its events
+		self.game_state = GameStateService(self.hockey_client)
+		self.warm_up_time = 0.0
+
+	async def start(self, *args, **kwargs):
+		# seed the NHL caches before connecting, so cogs start warm
+		self.warm_up_time = await self.game_state.warm_up()
+		await super().start(*args, **kwargs)
+
+	async def close(self):
+		await self.game_state.stop()
+		await self.hockey_client.close()
+		# write any settings changes still waiting out their debounce
+		await settings.get_store().flush()
+		# write any buffered picks before the connections close
+		await get_pick_store().close()
+		# checkpoints the WAL so the database files are self-contained
+		await close_databases()
+		await super().close()
+
 intents = discord.Intents().default()
 intents.members = True
 intents.message_content = True
-bot = commands.Bot(intents=intents)
+bot = DevilsBot(intents=intents)
 bot.remove_command('help')
 bot.owner_id = os.getenv("OWNER_ID")
 cfg = settings.Settings()
@@ -40,7 +79,8 @@ async def on_ready():
 		if os.path.exists(lock_file):
 			os.remove(lock_file)
 			
-		log.info(f'client connected as {bot.user}')
+		log.info(f'client connected as {bot.user} (NHL warm-up took {bot.warm_up_time:.2f}s)')
+		bot.game_state.start()
 
 		ran = True
 
@@ -0,0 +1,115 @@
+"""
+Races concurrent Settings updates against a temporary config.ini.
+
+Run from the repository root, where util.settings opens log/settings.log:
+
+    python -m pytest tests
+"""
+import ast
+import asyncio
+import configparser
+import threading
+import time
+
+import pytest
+
+import util.settings as settings
+
+SECTION = 'RaceTest'
+
+class Channel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+
+class Context:
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.replies = []
+
+    async def respond(self, message):
+        # a Discord round-trip; let other updates run meanwhile
+        await asyncio.sleep(self.delay)
+        self.replies.append(message)
+
+class WriteCounter:
+    """Wraps _write_atomic, recording the most writes ever in flight at once."""
+
+    def __init__(self, write):
+        self.write = write
+        self.active = 0
+        self.most = 0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, path, text):
+        with self._lock:
+            self.active += 1
+            self.count += 1
+            self.most = max(self.most, self.active)
+        try:
+            # a slow disk, so flush() lands while a write is in progress
+            time.sleep(0.05)
+            self.write(path, text)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    path = tmp_path / 'config.ini'
+    counter = WriteCounter(settings._write_atomic)
+    monkeypatch.setattr(settings, '_write_atomic', counter)
+    monkeypatch.setattr(settings, '_store', settings.SettingsStore(str(path)))
+    return path, counter
+
+def _on_disk(path):
+    config = configparser.ConfigParser()
+    config.read(path)
+    return set(ast.literal_eval(config[SECTION]['channels']))
+
+@pytest.mark.parametrize('tasks', [50, 200])
+def test_concurrent_updates_are_all_kept(config, tasks):
+    path, counter = config
+
+    async def race():
+        store = settings.get_store()
+        setting = settings.Settings()
+        # Discord ids are never 0, and Settings treats a falsy first id as unset
+        ids = set(range(1, tasks + 1))
+        updates = [asyncio.create_task(setting.update_channel_setting(Context(), SECTION, 'add', Channel(i))) for i in ids]
+        # flush as a shutdown would, while the delayed write is on its thread
+        await asyncio.sleep(settings.WRITE_DELAY + 0.01)
+        await store.flush()
+        await asyncio.gather(*updates)
+        await store.flush()
+        return ids, set(await setting.get_channels(SECTION) or ())
+
+    ids, in_memory = asyncio.run(race())
+
+    assert in_memory == ids
+    assert _on_disk(path) == ids
+    assert counter.most == 1
+
+def test_slow_reply_does_not_block_other_updates(config):
+    path, _ = config
+
+    async def race():
+        setting = settings.Settings()
+        slow = Context(delay=1)
+        slow_update = asyncio.create_task(setting.update_channel_setting(slow, SECTION, 'add', Channel(1)))
+        await asyncio.sleep(0.01)
+
+        start = time.monotonic()
+        fast = Context()
+        await setting.update_channel_setting(fast, SECTION, 'add', Channel(2))
+        elapsed = time.monotonic() - start
+
+        await slow_update
+        await settings.get_store().flush()
+        return elapsed, slow.replies, fast.replies
+
+    elapsed, slow_replies, fast_replies = asyncio.run(race())
+
+    assert elapsed < 0.5
+    assert slow_replies == fast_replies == ['Added channel.']
+    assert _on_disk(path) == {1, 2}
@@ -24,19 +24,24 @@ async def create_game(game: Game, cmd: str = ''):
 
 	venue = game.venue
 
-	game_time = game.game_time("%-I:%M %p")
-	game_date = game.game_time("%B %-d, %Y")
-	game_time_obj = datetime.strptime(game_time, "%I:%M %p")
-	game_date_obj = datetime.strptime(game_date, "%B %d, %Y")
-
-	game_time_epoch = int(game_time_obj.timestamp())
-	game_date_epoch = int(game_date_obj.timestamp())
-
-	if game.is_tbd:
+	# a game that failed to load has no start time
+	if game.raw_game_time is None:
 		time = 'TBD'
+		game_date = 'Date TBD'
 	else:
-		time = f"<t:{game_time_epoch}:t>" #time = datetime.strftime(est,  "%-I:%M %p")
-	game_date = f"<t:{game_date_epoch}:D>"
+		game_time = game.game_time("%-I:%M %p")
+		game_date = game.game_time("%B %-d, %Y")
+		game_time_obj = datetime.strptime(game_time, "%I:%M %p")
+		game_date_obj = datetime.strptime(game_date, "%B %d, %Y")
+
+		game_time_epoch = int(game_time_obj.timestamp())
+		game_date_epoch = int(game_date_obj.timestamp())
+
+		if game.is_tbd:
+			time = 'TBD'
+		else:
+			time = f"<t:{game_time_epoch}:t>" #time = datetime.strftime(est,  "%-I:%M %p")
+		game_date = f"<t:{game_date_epoch}:D>"
 
 	if away_team_obj.id == 1:
 		team_file = home_team_obj.get_team_logo()
@@ -78,19 +83,24 @@ async def create_pickems_game(game: Game):
 
 	venue = game.venue
 
-	game_time = game.game_time("%-I:%M %p")
-	game_date = game.game_time("%B %-d, %Y")
-	game_time_obj = datetime.strptime(game_time, "%I:%M %p")
-	game_date_obj = datetime.strptime(game_date, "%B %d, %Y")
-
-	game_time_epoch = int(game_time_obj.timestamp())
-	game_date_epoch = int(game_date_obj.timestamp())
-
-	if game.is_tbd:
+	# a game that failed to load has no start time
+	if game.raw_game_time is None:
 		time = 'TBD'
+		game_date = 'Date TBD'
 	else:
-		time = f"<t:{game_time_epoch}:t>" #time = datetime.strftime(est,  "%-I:%M %p")
-	game_date = f"<t:{game_date_epoch}:D>"
+		game_time = game.game_time("%-I:%M %p")
+		game_date = game.game_time("%B %-d, %Y")
+		game_time_obj = datetime.strptime(game_time, "%I:%M %p")
+		game_date_obj = datetime.strptime(game_date, "%B %d, %Y")
+
+		game_time_epoch = int(game_time_obj.timestamp())
+		game_date_epoch = int(game_date_obj.timestamp())
+
+		if game.is_tbd:
+			time = 'TBD'
+		else:
+			time = f"<t:{game_time_epoch}:t>" #time = datetime.strftime(est,  "%-I:%M %p")
+		game_date = f"<t:{game_date_epoch}:D>"
 
 	embed = discord.Embed(title=game_date, color=0xff0000)
 	embed.add_field(name=away_team, value=away_record, inline=True)
@@ -2,14 +2,21 @@
 REMINDER_MESSAGE = "As a reminder, please utilize `/report` and `/openhelp` to report any messages to the Admin team. More information can be found here: https://discord.com/channels/348223375598157825/897645705517232178/898351381482733588"
 REMINDER_INTERVAL = 60 * 60  # 1 hour in seconds
 
+import asyncio
+import time
+import weakref
+
 import discord
-from discord.utils import get
-from util.settings import Settings
+from util.settings import Settings, get_store
 import logging
 
 # Enable detailed logging for game channel operations
 DEBUG_MODE = True
 
+# channels edited or messaged at once; each channel is its own rate-limit bucket
+# and py-cord waits out any 429, so this only bounds the burst on the global limit
+MAX_CONCURRENT_EDITS = 5
+
 from hockey.game import Game
 
 # Configure logging
@@ -23,129 +30,277 @@ if DEBUG_MODE:
         handler.setFormatter(formatter)
         logger.addHandler(handler)
 
-async def open_channel(bot, message=None):
-    settings = Settings()
-    channel_ids = await settings.get_channels("GameChannels")
-    role_ids = await settings.get_roles("GameChannels")
+class GameChannelResolver:
+    def __init__(self, bot):
+        """
+        Initialize the GameChannelResolver, which holds the game channels and roles.
 
-    logger.info(f"Opening {len(channel_ids)} game channels for {len(role_ids)} roles")
-    
-    for channel_id in channel_ids:
-        try:
-            channel = bot.get_channel(int(channel_id))
-            if not channel:
+        The channel and role objects are resolved once from the GameChannels
+        settings, and again only when those settings change. Guild events keep
+        them current, along with whether each channel is open, meaning one of the
+        roles can send messages there.
+        """
+        self.bot = bot
+        self.store = get_store()
+        self.channels = {}
+        self.roles = {}
+        # channel id -> whether a game role can send messages there
+        self.open = {}
+        self._version = None
+
+        bot.add_listener(self.on_ready, 'on_ready')
+        bot.add_listener(self.on_guild_channel_create, 'on_guild_channel_create')
+        bot.add_listener(self.on_guild_channel_update, 'on_guild_channel_update')
+        bot.add_listener(self.on_guild_channel_delete, 'on_guild_channel_delete')
+        bot.add_listener(self.on_guild_role_create, 'on_guild_role_create')
+        bot.add_listener(self.on_guild_role_update, 'on_guild_role_update')
+        bot.add_listener(self.on_guild_role_delete, 'on_guild_role_delete')
+
+    async def refresh(self, force=False):
+        """
+        Resolve the channels and roles if the settings changed since the last time.
+
+        If any configured id doesn't resolve, e.g. before the guild cache is
+        ready, the next refresh tries again.
+        """
+        version, _ = self.store.snapshot()
+        if version == self._version and not force:
+            return
+
+        settings = Settings()
+        channel_ids = await settings.get_channels("GameChannels") or []
+        role_ids = await settings.get_roles("GameChannels") or []
+        guild = self.bot.guilds[0] if self.bot.guilds else None
+
+        resolved = True
+        self.channels = {}
+        for channel_id in channel_ids:
+            channel = self.bot.get_channel(int(channel_id))
+            if channel:
+                self.channels[channel.id] = channel
+            else:
+                resolved = False
                 logger.warning(f"Channel ID {channel_id} not found")
-                continue
-                
-            for role_id in role_ids:
-                try:
-                    role = get(bot.guilds[0].roles, id=int(role_id))
-                    if not role:
-                        logger.warning(f"Role ID {role_id} not found")
-                        continue
-                        
-                    if role in channel.overwrites:
-                        if channel.overwrites[role].send_messages:
-                            logger.debug(f"Channel {channel.name} already open for role {role.name}")
-                            continue
-                    
-                    logger.debug(f"Setting permissions for {role.name} in {channel.name}")
-                    await channel.set_permissions(role, send_messages=True, view_channel=True)
-                except Exception as e:
-                    logger.error(f"Error setting permissions for role {role_id}: {str(e)}")
-            
-            # Send message after setting permissions
+
+        self.roles = {}
+        for role_id in role_ids:
+            role = guild.get_role(int(role_id)) if guild else None
+            if role:
+                self.roles[role.id] = role
+            else:
+                resolved = False
+                logger.warning(f"Role ID {role_id} not found")
+
+        self.open = {channel_id: self._is_open(channel) for channel_id, channel in self.channels.items()}
+        self._version = version if resolved else None
+        logger.info(f"Resolved {len(self.channels)} game channels and {len(self.roles)} roles")
+
+    def _is_open(self, channel):
+        """
+        Check a channel's overwrites for a role that can send messages.
+        """
+        return any(channel.overwrites_for(role).send_messages for role in self.roles.values())
+
+    def is_closed(self):
+        """
+        Check if every game channel is closed, from the model.
+        """
+        if not self.channels or not self.roles:
+            return True
+        return not any(self.open.values())
+
+    async def on_ready(self):
+        # anything resolved before the guild cache filled may be missing
+        await self.refresh(force=True)
+
+    async def on_guild_channel_create(self, channel):
+        if self._version is None:
+            await self.refresh()
+
+    async def on_guild_channel_update(self, before, after):
+        if after.id in self.channels:
+            self.channels[after.id] = after
+            self.open[after.id] = self._is_open(after)
+
+    async def on_guild_channel_delete(self, channel):
+        if channel.id in self.channels:
+            logger.warning(f"Game channel {channel.name} was deleted")
+            del self.channels[channel.id]
+            self.open.pop(channel.id, None)
+
+    async def on_guild_role_create(self, role):
+        if self._version is None:
+            await self.refresh()
+
+    async def on_guild_role_update(self, before, after):
+        if after.id in self.roles:
+            self.roles[after.id] = after
+
+    async def on_guild_role_delete(self, role):
+        if role.id in self.roles:
+            logger.warning(f"Game channel role {role.name} was deleted")
+            del self.roles[role.id]
+            self.open = {channel_id: self._is_open(channel) for channel_id, channel in self.channels.items()}
+
+_resolvers = weakref.WeakKeyDictionary()
+
+def get_resolver(bot):
+    """
+    Get the GameChannelResolver for a bot.
+    """
+    resolver = _resolvers.get(bot)
+    if resolver is None:
+        resolver = _resolvers[bot] = GameChannelResolver(bot)
+    return resolver
+
+def _target_overwrites(channel, roles, send_messages):
+    """
+    Get the channel's overwrites with every game role set to send_messages, or None if none need to change.
+    """
+    overwrites = channel.overwrites
+    changed = False
+    for role in roles:
+        current = channel.overwrites_for(role)
+        if bool(current.send_messages) == send_messages:
+            logger.debug(f"{channel.name} already has send_messages={send_messages} for role {role.name}")
+            continue
+        overwrite = discord.PermissionOverwrite.from_pair(*current.pair())
+        overwrite.update(send_messages=send_messages, view_channel=True)
+        overwrites[role] = overwrite
+        changed = True
+    return overwrites if changed else None
+
+async def _apply_overwrites(channel, roles, send_messages):
+    """
+    Set the game roles' send_messages in a channel with one edit, and get whether anything changed.
+    """
+    overwrites = _target_overwrites(channel, roles, send_messages)
+    if overwrites is None:
+        return False
+
+    # channel.overwrites leaves out members that aren't cached, and an edit
+    # replaces every overwrite, so only edit once the guild's members are all
+    # cached; until then set one role per request
+    if not channel.guild.chunked:
+        logger.warning(f"{channel.guild.name} members aren't all cached; setting roles one at a time in {channel.name}")
+        for role in roles:
+            if bool(channel.overwrites_for(role).send_messages) != send_messages:
+                await channel.set_permissions(role, send_messages=send_messages, view_channel=True)
+        return True
+
+    await channel.edit(overwrites=overwrites)
+    return True
+
+async def _set_game_channels(bot, send_messages, message):
+    """
+    Open or close every game channel concurrently, then announce it; get how long it took.
+    """
+    start = time.perf_counter()
+    resolver = get_resolver(bot)
+    await resolver.refresh()
+
+    action = "open" if send_messages else "close"
+    channels = list(resolver.channels.values())
+    roles = list(resolver.roles.values())
+    logger.info(f"Attempting to {action} {len(channels)} game channels for {len(roles)} roles")
+
+    limit = asyncio.Semaphore(MAX_CONCURRENT_EDITS)
+
+    async def apply(channel):
+        async with limit:
             try:
-                if message:
-                    await channel.send(message)
-                else:
-                    await channel.send("Game chat is now open!")
-                logger.info(f"Sent open message to {channel.name}")
+                changed = await _apply_overwrites(channel, roles, send_messages)
             except Exception as e:
-                logger.error(f"Error sending open message to {channel.name}: {str(e)}")
-                
-        except Exception as e:
-            logger.error(f"Error opening channel {channel_id}: {str(e)}")
+                logger.error(f"Error setting permissions in {channel.name}: {str(e)}")
+                return None
+            # the cached overwrites only change when the gateway event arrives
+            resolver.open[channel.id] = send_messages
+            return changed
+
+    changed = await asyncio.gather(*(apply(channel) for channel in channels))
+    edited = time.perf_counter() - start
+
+    if send_messages:
+        # Send message after setting permissions
+        announce = channels
+        text = message or "Game chat is now open!"
+    else:
+        # Send closing message only to channels that closed, unless there's a message
+        announce = [channel for channel, did in zip(channels, changed) if did or message]
+        text = message or "Game chat is now closed!"
+
+    async def send(channel):
+        async with limit:
+            try:
+                await channel.send(text)
+                logger.debug(f"Sent {action} message to {channel.name}")
+            except Exception as e:
+                logger.error(f"Error sending {action} message to {channel.name}: {str(e)}")
+
+    await asyncio.gather(*(send(channel) for channel in announce))
+
+    elapsed = time.perf_counter() - start
+    done = "Opened" if send_messages else "Closed"
+    logger.info(f"{done} {sum(1 for did in changed if did)} of {len(channels)} game channels "
+                f"in {elapsed:.2f}s (permissions {edited:.2f}s, {len(announce)} messages)")
+    return elapsed
+
+async def open_channel(bot, message=None):
+    return await _set_game_channels(bot, True, message)
 
 async def close_channel(bot, message=None):
-    settings = Settings()
-    channel_ids = await settings.get_channels("GameChannels")
-    role_ids = await settings.get_roles("GameChannels")
-    
-    logger.info(f"Attempting to close {len(channel_ids)} game channels for {len(role_ids)} roles")
+    return await _set_game_channels(bot, False, message)
 
-    for channel_id in channel_ids:
-        try:
-            channel = bot.get_channel(int(channel_id))
-            if not channel:
-                logger.warning(f"Channel ID {channel_id} not found")
-                continue
-                
-            permissions_changed = False
-            
-            for role_id in role_ids:
-                try:
-                    role = get(bot.guilds[0].roles, id=int(role_id))
-                    if not role:
-                        logger.warning(f"Role ID {role_id} not found")
-                        continue
-                        
-                    if role in channel.overwrites:
-                        perms = channel.overwrites[role]
-                        if perms.send_messages:
-                            logger.debug(f"Closing permissions for {role.name} in {channel.name}")
-                            await channel.set_permissions(role, send_messages=False, view_channel=True)
-                            permissions_changed = True
-                except Exception as e:
-                    logger.error(f"Error closing permissions for role {role_id}: {str(e)}")
-            
-            # Send closing message only after processing all roles for this channel
-            if permissions_changed or message:
-                logger.info(f"Sending closing message to channel {channel.name}")
-                try:
-                    if message:
-                        await channel.send(message)
-                    else:
-                        await channel.send("Game chat is now closed!")
-                except Exception as e:
-                    logger.error(f"Error sending closing message to {channel.name}: {str(e)}")
-                    
-        except Exception as e:
-            logger.error(f"Error closing channel {channel_id}: {str(e)}")
-                    
+# both return False only if every game channel failed, so callers can try again later
 async def send_message(bot, message):
-    settings = Settings()
-    channel_ids = await settings.get_channels("GameChannels")
-    
-    logger.info(f"Sending message to {len(channel_ids)} game channels")
-    
-    for channel_id in channel_ids:
+    resolver = get_resolver(bot)
+    await resolver.refresh()
+
+    logger.info(f"Sending message to {len(resolver.channels)} game channels")
+
+    sent = 0
+    for channel in list(resolver.channels.values()):
         try:
-            channel = bot.get_channel(int(channel_id))
-            if not channel:
-                logger.warning(f"Channel ID {channel_id} not found")
-                continue
-                
             await channel.send(message)
+            sent += 1
             logger.debug(f"Message sent to channel {channel.name}")
         except Exception as e:
-            logger.error(f"Error sending message to channel {channel_id}: {str(e)}")
+            logger.error(f"Error sending message to channel {channel.id}: {str(e)}")
+    return sent > 0 or not resolver.channels
+
+async def send_embed(bot, build):
+    # build returns a fresh (file, embed) for each channel; a discord.File can only be sent once
+    resolver = get_resolver(bot)
+    await resolver.refresh()
+
+    logger.info(f"Sending embed to {len(resolver.channels)} game channels")
+
+    sent = 0
+    for channel in list(resolver.channels.values()):
+        try:
+            file, embed = await build()
+            await channel.send(file=file, embed=embed)
+            sent += 1
+            logger.debug(f"Embed sent to channel {channel.name}")
+        except Exception as e:
+            logger.error(f"Error sending embed to channel {channel.id}: {str(e)}")
+    return sent > 0 or not resolver.channels
 
 async def update_description_and_status(bot, game: Game) -> None:
     try:
         channel_category_name = "OFFSEASON"
         channel_description = ""
         bot_status = "Golf!"
-        settings = Settings()
-        channel_ids = await settings.get_channels("GameChannels")
+        resolver = get_resolver(bot)
+        await resolver.refresh()
 
         if game:
             away_team_name = game.away_team_full_name
             away_team_abbr = game.away_team_abbr
             home_team_name = game.home_team_full_name
             home_team_abbr = game.home_team_abbr
-            game_time_category = game.game_time("%-I:%M %p ET")
-            game_date = game.game_time("%-m/%-d")
+            game_time_category = game.game_time("%-I:%M %p ET") or "TBD"
+            game_date = game.game_time("%-m/%-d") or "TBD"
 
             channel_category_name = f"{away_team_abbr} @ {home_team_abbr} {game_date} {game_time_category}"
             channel_description = f"{away_team_name} @ {home_team_name} {game_date}"
@@ -153,15 +308,8 @@ async def update_description_and_status(bot, game: Game) -> None:
         
         await bot.change_presence(activity=discord.Game(bot_status))
 
-        channels = []
-        for channel_id in channel_ids:
-            try:
-                channel = bot.get_channel(int(channel_id))
-                if channel:
-                    channels.append(channel)
-            except Exception as e:
-                logger.error(f"Error getting channel {channel_id}: {str(e)}")
-        
+        channels = list(resolver.channels.values())
+
         categories = [channel.category for channel in channels if channel.category]
 
         for channel in channels:
@@ -179,47 +327,9 @@ async def update_description_and_status(bot, game: Game) -> None:
         logger.error(f"Error in update_description_and_status: {str(e)}")
 
 async def is_closed(bot):
-    settings = Settings()
-    channel_ids = await settings.get_channels("GameChannels")
-    role_ids = await settings.get_roles("GameChannels")
-    
-    logger.info(f"Checking if game channels are closed: {len(channel_ids)} channels, {len(role_ids)} roles")
-    
-    # If no channels or roles, consider it closed
-    if not channel_ids or not role_ids:
-        logger.warning("No channels or roles found, considering channels closed")
-        return True
-        
-    for channel_id in channel_ids:
-        try:
-            channel = bot.get_channel(int(channel_id))
-            if not channel:
-                logger.warning(f"Channel ID {channel_id} not found")
-                continue
-                
-            logger.debug(f"Checking channel: {channel.name} (ID: {channel_id})")
-            
-            for role_id in role_ids:
-                try:
-                    role = get(bot.guilds[0].roles, id=int(role_id))
-                    if not role:
-                        logger.warning(f"Role ID {role_id} not found")
-                        continue
-                    
-                    logger.debug(f"Checking role: {role.name} (ID: {role_id}) in channel {channel.name}")
-                    
-                    if role in channel.overwrites:
-                        perms = channel.overwrites[role]
-                        logger.debug(f"Permissions for {role.name} in {channel.name}: send_messages={perms.send_messages}")
-                        if perms.send_messages:
-                            logger.info(f"Channel is open! Role {role.name} has send_messages=True in channel {channel.name}")
-                            return False
-                    else:
-                        logger.warning(f"Role {role.name} not in channel {channel.name} overwrites")
-                except Exception as e:
-                    logger.error(f"Error checking role {role_id}: {str(e)}")
-        except Exception as e:
-            logger.error(f"Error checking channel {channel_id}: {str(e)}")
-    
-    logger.info("All channels appear to be closed")
-    return True
+    resolver = get_resolver(bot)
+    await resolver.refresh()
+
+    closed = resolver.is_closed()
+    logger.debug(f"Game channels closed: {closed} ({len(resolver.channels)} channels, {len(resolver.roles)} roles)")
+    return closed
@@ -6,7 +6,7 @@ from pytz import timezone
 from tzlocal import get_localzone
 
 from hockey.game import Game
-from database.pickems_database import PickemsDatabase
+from database.pick_store import PickResult, get_pick_store
 from util.dicts import emoji_dict, team_dict
 
 class GameView(View):
@@ -14,7 +14,7 @@ class GameView(View):
         super().__init__()
         self.game = game
 
-        self.db = PickemsDatabase()
+        self.picks = get_pick_store()
 
         away_emoji = None
         home_emoji = None
@@ -60,19 +60,21 @@ class GameView(View):
         team_id = interaction.custom_id.split('-')[1]
         season = interaction.custom_id.split('-')[2]
         team_name = team_dict[str(team_id)]
+        # a game that failed to load has no start time; fall back to its schedule date, then today
+        game_date = self.game.game_time('%Y-%m-%d') or getattr(self.game, 'game_date', None) or est.strftime('%Y-%m-%d')
 
-        pick = await self.db.get_pick(user_id, game_id)
+        try:
+            # answered from memory; the pick is written to the database shortly after
+            result = await self.picks.submit(user_id, game_id, team_id, season, game_date, est, self.game.raw_game_time)
+        except Exception:
+            await interaction.response.send_message(f"Something went wrong! Try again in a few minutes.", ephemeral=True, delete_after=30)
+            return
 
-        if pick:
-            if pick != team_id:
-                if await self.db.update_pick(user_id, game_id, team_id, est):
-                    await interaction.response.send_message(f"Pick updated to {team_name}!", ephemeral=True, delete_after=30)
-                else:
-                    await interaction.response.send_message(f"Something went wrong! Try again in a few minutes.", ephemeral=True, delete_after=30)
-            else:
-                await interaction.response.send_message(f"You already picked {team_name}!", ephemeral=True, delete_after=30)
+        if result == PickResult.LOCKED:
+            await interaction.response.send_message(f"Picks for this game are locked!", ephemeral=True, delete_after=30)
+        elif result == PickResult.UNCHANGED:
+            await interaction.response.send_message(f"You already picked {team_name}!", ephemeral=True, delete_after=30)
+        elif result == PickResult.UPDATED:
+            await interaction.response.send_message(f"Pick updated to {team_name}!", ephemeral=True, delete_after=30)
         else:
-            if await self.db.create_pick(user_id, game_id, team_id, season, est):
-                await interaction.response.send_message(f"You picked {team_name}!", ephemeral=True, delete_after=30)
-            else:
-                await interaction.response.send_message(f"Something went wrong! Try again in a few minutes.", ephemeral=True, delete_after=30)
\ No newline at end of file
+            await interaction.response.send_message(f"You picked {team_name}!", ephemeral=True, delete_after=30)
@@ -1,5 +1,6 @@
 import discord
 import pytz
+from bisect import bisect_left
 from datetime import datetime
 from tzlocal import get_localzone
 
@@ -10,61 +11,109 @@ from database import pickems_database
 
 db = pickems_database.PickemsDatabase()
 
-# set up a paginator for the leaderboard embeds
-# each page will be a leaderboard embed with 10 leaderboards each
-# Args: leaderboards - dict of leaderboards containing user_id, wins, losses; user_id is key
-async def setup_paginator(season: str = None):
+# leaderboard embeds show this many users per page
+PAGE_SIZE = 10
+
+# get the current season, ex: 20242025
+def current_season():
+    now = datetime.now(pytz.timezone('US/Eastern'))
+    if now.month < 7 and now.month >= 1:
+        return str(now.year - 1) + str(now.year)
+    return str(now.year) + str(now.year + 1)
+
+# get when records were last updated, formatted for the embed footer
+async def get_updated_at():
     # fetch most recent records updated_at from db
     records_updated = await db.get_records_updated_at()
     try:
         records_updated = datetime.strptime(str(records_updated), '%Y-%m-%d %H:%M:%S')
     except:
         records_updated = datetime.strptime(str(records_updated), '%Y-%m-%d %H:%M:%S.%f')
-    
-    if not season:
-        now = datetime.now(pytz.timezone('US/Eastern'))
-        if now.month < 7 and now.month >= 1:
-            season = str(now.year - 1) + '-' + str(now.year)
-        else:
-            season = str(now.year) + '-' + str(now.year + 1)
-
-    # get the leaderboard from db
-    leaderboard_ = await db.get_leaderboard(season)
-
-    if not leaderboard_:
-        return None
-        
+
     # convert records_updated to ET
     localtz = get_localzone()
     esttz = pytz.timezone('US/Eastern')
-
     curdt = localtz.localize(records_updated)
     est = curdt.astimezone(esttz)
-    
-    # format est to month day, year at h:mm; ex: January 1, 2021 at 4:30am
-    est_str = est.strftime('%B %d, %Y at %I:%M%p ET')
-
-    # list of leaderboards
-    leaderboards_list = {}
 
-    # create leaderboard embeds
-    embeds = []
+    # format est to month day, year at h:mm; ex: January 1, 2021 at 4:30am
+    return est.strftime('%B %d, %Y at %I:%M%p ET')
+
+class SeasonLeaderboard:
+    def __init__(self, season, standings, pages):
+        """
+        Initialize the SeasonLeaderboard, one season's standings and rendered pages.
+
+        standings maps user_id to (wins, losses, win_pct, rank) in rank order.
+        Rank lookups bisect a sorted list of sort keys, so they match the
+        RANK() the database computed without scanning the standings.
+        """
+        self.season = season
+        self.standings = standings
+        self.pages = pages
+        self._keys = sorted(self._key(record) for record in standings.values())
+
+    @staticmethod
+    def _key(record):
+        """
+        Get a record's sort key: best win% first, then most wins.
+        """
+        return (-record[2], -record[0])
+
+    @classmethod
+    async def load(cls, season):
+        """
+        Load a season's standings and render its pages.
+        """
+        standings = await db.get_leaderboard(season)
+        if not standings:
+            return cls(season, {}, [])
+
+        updated_at = await get_updated_at()
+        users = list(standings.items())
+        embeds = []
+        for i in range(0, len(users), PAGE_SIZE):
+            embeds.append(await create_embed.create_leaderboard(dict(users[i:i + PAGE_SIZE]), updated_at))
+
+        return cls(season, standings, embeds)
+
+    def position(self, user_id):
+        """
+        Get a user's (user_id, wins, losses, win_pct, rank), or None if they have no record.
+        """
+        record = self.standings.get(user_id)
+        if record is None:
+            return None
+        rank = bisect_left(self._keys, self._key(record)) + 1
+        return (user_id, record[0], record[1], record[2], rank)
+
+# season -> SeasonLeaderboard; kept until the next settlement refreshes it
+_boards = {}
+
+# get a season's leaderboard, loading it on first use
+async def get_leaderboard(season: str = None):
+    season = season or current_season()
+    board = _boards.get(season)
+    if board is None:
+        board = _boards[season] = await SeasonLeaderboard.load(season)
+    return board
+
+# reload a season's leaderboard; call after settling games
+async def refresh(season: str = None):
+    season = season or current_season()
+    _boards[season] = await SeasonLeaderboard.load(season)
+    return _boards[season]
 
-    for i, leaderboard in enumerate(leaderboard_):
-        # add leaderboard to leaderboards_list
-        leaderboards_list[leaderboard] = leaderboard_[leaderboard]
+# set up a paginator for the leaderboard embeds
+# each page is a leaderboard embed with PAGE_SIZE users
+async def setup_paginator(season: str = None):
+    board = await get_leaderboard(season)
 
-        # if 10 leaderboards have been added to leaderboards_list, create leaderboard embed
-        if (i + 1) % 10 == 0:
-            embed = await create_embed.create_leaderboard(leaderboards_list, est_str)
-            embeds.append(embed)
-            leaderboards_list.clear()
-    if leaderboards_list:
-        embed = await create_embed.create_leaderboard(leaderboards_list, est_str)
-        embeds.append(embed)
+    if not board.pages:
+        return None
 
-    # create paginator
-    paginator = pages.Paginator(pages=embeds)
+    # create paginator; the embeds are shared, only the paginator is per-response
+    paginator = pages.Paginator(pages=list(board.pages))
 
     # set up buttons
     paginator.add_button(
@@ -95,56 +144,18 @@ async def setup_paginator(season: str = None):
 
     return paginator
 
-# get a user's rank in the leaderboard; use get_user_leaderboard_position in Database.py
+# get a user's rank in the leaderboard
 # Args: user_id - user's id
-# Returns: rank - user's rank and record in leaderboard
+# Returns: (user_id, wins, losses, win_pct, rank), or None
 async def get_user_position(user_id, season: str = None):
-    if not season:
-        now = datetime.now(pytz.timezone('US/Eastern'))
-        if now.month < 7 and now.month >= 1:
-            season = str(now.year - 1) + '-' + str(now.year)
-        else:
-            season = str(now.year) + '-' + str(now.year + 1)
+    board = await get_leaderboard(season)
 
-    return await db.get_user_leaderboard_position(user_id, season)
+    return board.position(user_id)
 
 # post leaderboard embed to channel
 async def post_leaderboard(channel: discord.TextChannel, season: str = None):
-    # fetch most recent records updated_at from db
-    records_updated = await db.get_records_updated_at()
-    try:
-        records_updated = datetime.strptime(str(records_updated), '%Y-%m-%d %H:%M:%S')
-    except:
-        records_updated = datetime.strptime(str(records_updated), '%Y-%m-%d %H:%M:%S.%f')
-    # convert records_updated to ET
-    localtz = get_localzone()
-    esttz = pytz.timezone('US/Eastern')
-    curdt = localtz.localize(records_updated)
-    est = curdt.astimezone(esttz)
-    
-    # format est to month day, year at h:mm; ex: January 1, 2021 at 4:30am
-    est_str = est.strftime('%B %d, %Y at %I:%M%p ET')
-
-    if not season:
-        now = datetime.now(pytz.timezone('US/Eastern'))
-        if now.month < 7 and now.month >= 1:
-            season = str(now.year - 1) + str(now.year)
-        else:
-            season = str(now.year) + str(now.year + 1)
-
-    # get leaderboards from db
-    leaderboards = await db.get_leaderboard(season)
-
-    if leaderboards:
-        # get first 10 leaderboards
-        leaderboards_list = {}
-        for i, leaderboard in enumerate(leaderboards):
-            leaderboards_list[leaderboard] = leaderboards[leaderboard]
-            if i == 9:
-                break
-        
-        # create leaderboard embed
-        embed = await create_embed.create_leaderboard(leaderboards_list, est_str)
-
-        # post embed to channel
-        await channel.send(embed=embed)
\ No newline at end of file
+    board = await get_leaderboard(season)
+
+    if board.pages:
+        # post the first page to channel
+        await channel.send(embed=board.pages[0])
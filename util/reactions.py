@@ -0,0 +1,102 @@
+"""
+Shared dispatch for reactions on the ReactAlert messages.
+
+One raw reaction listener serves every cog. Watched messages are kept as
+frozensets rebuilt only when the settings version changes, so a reaction
+on any other message is dropped after a set lookup, without I/O or logging.
+"""
+import weakref
+
+import discord
+
+from util.logger import setup_logger
+from util.settings import get_store
+
+SECTION = 'ReactAlert'
+
+log = setup_logger(__name__, 'log/reactions.log')
+
+class ReactionDispatcher(object):
+	"""Routes reactions on watched messages to the handlers cogs register."""
+
+	def __init__(self, bot):
+		self.bot = bot
+		self.store = get_store()
+		# (handler, role allowlist or None, match by message id only)
+		self._handlers = []
+		self._version = None
+		# entries are "channel-message"; older ones are a bare message id
+		self._keys = frozenset()
+		self._message_ids = frozenset()
+		self._listening = False
+
+	def _rebuild(self, version, values):
+		"""Recompute the watched keys from a settings snapshot."""
+		keys = set()
+		message_ids = set()
+		for entry in values.get(SECTION, {}).get('messages') or ():
+			if isinstance(entry, int):
+				message_ids.add(entry)
+				continue
+			try:
+				channel_id, message_id = str(entry).split('-')
+				keys.add((int(channel_id), int(message_id)))
+			except ValueError:
+				log.warning(f"Ignoring bad {SECTION} entry {entry!r}")
+		self._keys = frozenset(keys)
+		self._message_ids = frozenset(message_ids)
+		self._version = version
+
+	def register(self, handler, roles=None, by_message_id=False):
+		"""
+		Call handler(payload) for reactions on watched messages.
+
+		Args:
+			roles: only call it for members with one of these role ids
+			by_message_id: match the bare message id entries instead of "channel-message" ones
+		"""
+		allowlist = frozenset(roles) if roles else None
+		self._handlers.append((handler, allowlist, by_message_id))
+		if not self._listening:
+			self.bot.add_listener(self.on_raw_reaction_add, 'on_raw_reaction_add')
+			self._listening = True
+
+	def unregister(self, handler):
+		"""Stop calling handler."""
+		self._handlers = [entry for entry in self._handlers if entry[0] != handler]
+
+	async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+		# snapshot() also picks up outside edits to config.ini, at most once per CHECK_INTERVAL
+		version, values = self.store.snapshot()
+		if self._version != version:
+			self._rebuild(version, values)
+
+		by_key = (payload.channel_id, payload.message_id) in self._keys
+		by_message_id = payload.message_id in self._message_ids
+		if not by_key and not by_message_id:
+			return
+
+		member_roles = None
+		for handler, allowlist, match_message_id in self._handlers:
+			if not (by_message_id if match_message_id else by_key):
+				continue
+			if allowlist is not None:
+				if payload.member is None:
+					continue
+				if member_roles is None:
+					member_roles = {role.id for role in payload.member.roles}
+				if allowlist.isdisjoint(member_roles):
+					continue
+			try:
+				await handler(payload)
+			except Exception:
+				log.exception(f"Error in reaction handler {getattr(handler, '__qualname__', handler)}")
+
+_dispatchers = weakref.WeakKeyDictionary()
+
+def get_dispatcher(bot):
+	"""Get the ReactionDispatcher for a bot."""
+	dispatcher = _dispatchers.get(bot)
+	if dispatcher is None:
+		dispatcher = _dispatchers[bot] = ReactionDispatcher(bot)
+	return dispatcher
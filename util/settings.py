@@ -1,235 +1,418 @@
+import asyncio
 import configparser
+import io
 import os
 import ast
+import tempfile
+import time
 import logging
 from logging.handlers import RotatingFileHandler
 
 CONFIG_FILE = 'config.ini'
 
-class Settings(object):
-	"""docstring for Settings."""
-
-	def __init__(self):
-		super(Settings, self).__init__()
-
+# how often, at most, the store checks config.ini for outside edits, in seconds
+CHECK_INTERVAL = 1.0
+
+# how long a change waits before it is written, so a burst of changes is one write
+WRITE_DELAY = 0.5
+
+log = logging.getLogger(__name__)
+handler = RotatingFileHandler('log/settings.log', maxBytes=5*1024*1024, backupCount=5)
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+handler.setFormatter(formatter)
+log.addHandler(handler)
+log.setLevel(logging.INFO)
+
+def _write_atomic(path, text):
+	"""Replace path with text so readers and crashes see the old file or the new one, never a mix."""
+	directory = os.path.dirname(os.path.abspath(path))
+	fd, tmp = tempfile.mkstemp(prefix='.config-', suffix='.tmp', dir=directory)
+	try:
+		with os.fdopen(fd, 'w') as f:
+			f.write(text)
+			f.flush()
+			os.fsync(f.fileno())
+		if os.path.exists(path):
+			os.chmod(tmp, os.stat(path).st_mode)
+		os.replace(tmp, path)
+	except BaseException:
+		try:
+			os.unlink(tmp)
+		except OSError:
+			pass
+		raise
+
+	# make the rename itself survive a power loss
+	dir_fd = os.open(directory, os.O_RDONLY)
+	try:
+		os.fsync(dir_fd)
+	finally:
+		os.close(dir_fd)
+
+class SettingsStore(object):
+	"""
+	The parsed contents of config.ini, shared by every Settings.
+
+	The file is parsed once into Python values and reads are served from
+	memory. It is re-read only when its mtime, inode or size changes, which
+	is checked at most every CHECK_INTERVAL seconds.
+
+	A change is visible to every reader as soon as set() returns. It reaches
+	the disk WRITE_DELAY later, together with any other changes made in the
+	meantime, by writing a temp file on a worker thread, fsyncing it and
+	renaming it over config.ini. A crash before that write loses the change;
+	a crash during it leaves the previous file intact. flush() writes
+	immediately and is called on shutdown.
+
+	values is replaced, never modified, on every change or reload, and
+	version counts those. A reader holding values (or snapshot()) sees one
+	consistent state.
+	"""
+
+	def __init__(self, path=CONFIG_FILE):
+		self.path = path
 		self.config = configparser.ConfigParser()
-		
-		# Setup logger
-		self.log = logging.getLogger(__name__)
-		handler = RotatingFileHandler('log/settings.log', maxBytes=5*1024*1024, backupCount=5)
-		formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-		handler.setFormatter(formatter)
-		self.log.addHandler(handler)
-		self.log.setLevel(logging.INFO)
-
-		if not os.path.exists(CONFIG_FILE):
-			with open(CONFIG_FILE, 'w'):
+		# section -> key -> parsed value, with lists stored as tuples
+		self.values = {}
+		self.version = 0
+		# serializes read-modify-write updates from commands
+		self.lock = asyncio.Lock()
+
+		self._stat = None
+		self._checked_at = 0.0
+		self._saved_version = 0
+		self._write_task = None
+		# set while the write task is still in its sleep, so cancelling it can't interrupt a write
+		self._waiting = False
+		self._write_lock = asyncio.Lock()
+
+		if not os.path.exists(self.path):
+			with open(self.path, 'w'):
 				pass
-		self.config.read(CONFIG_FILE)
+		self._load()
 
-	async def set_roles(self, section, roles):
+	def _file_stat(self):
+		"""Get what identifies the file's current contents."""
+		try:
+			st = os.stat(self.path)
+		except FileNotFoundError:
+			return None
+		return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+	def _load(self):
+		"""Parse the file into values."""
+		self._stat = self._file_stat()
+		config = configparser.ConfigParser()
+		config.read(self.path)
+
+		values = {}
+		for section in config.sections():
+			values[section] = {}
+			for key, raw in config[section].items():
+				try:
+					values[section][key] = self._freeze(ast.literal_eval(raw))
+				except Exception as e:
+					log.error(f"Bad value for {section}.{key}: {e}")
+					values[section][key] = None
+
+		self.config = config
+		self.values = values
+		self.version += 1
+		self._saved_version = self.version
+		log.info(f"Loaded {self.path} (version {self.version})")
+
+	@staticmethod
+	def _freeze(value):
+		"""Store lists as tuples so a published values can't be changed in place."""
+		return tuple(value) if isinstance(value, list) else value
+
+	@property
+	def dirty(self):
+		"""Check if there are changes not yet written."""
+		return self._saved_version != self.version
+
+	def _check(self):
+		"""Reload if the file changed since it was last read or written."""
+		now = time.monotonic()
+		if now - self._checked_at < CHECK_INTERVAL:
+			return
+		self._checked_at = now
+		if self._file_stat() == self._stat:
+			return
+		if self.dirty:
+			# the pending write is newer than the edit; it will replace it
+			log.warning(f"{self.path} changed on disk with unsaved changes pending; keeping the changes")
+			return
+		self._load()
+
+	def snapshot(self):
+		"""Get (version, values) as of now."""
+		self._check()
+		return self.version, self.values
+
+	def get(self, section, key):
+		"""Get a copy of a value, or None if it isn't set."""
+		self._check()
+		value = self.values.get(section, {}).get(key)
+		# callers modify what they get back, so hand out lists
+		return list(value) if isinstance(value, tuple) else value
+
+	def set(self, section, key, value):
+		"""Set a value now and schedule the write."""
+		self._check()
 		if section not in self.config.sections():
 			self.config.add_section(section)
+		self.config[section][key] = str(value)
+
+		values = dict(self.values)
+		values[section] = {**values.get(section, {}), key: self._freeze(value)}
+		self.values = values
+		self.version += 1
+		self._schedule_write()
+
+	def _schedule_write(self):
+		"""Start the delayed write unless one is already waiting."""
+		if self._write_task is not None and not self._write_task.done():
+			return
+		try:
+			self._write_task = asyncio.get_running_loop().create_task(self._write_later())
+			self._waiting = True
+		except RuntimeError:
+			# no event loop, so nothing to block; write now
+			self._write_sync()
+
+	async def _write_later(self):
+		"""Wait out a burst of changes, then write them."""
+		try:
+			await asyncio.sleep(WRITE_DELAY)
+		finally:
+			self._waiting = False
+		await self._write()
+
+	def _render(self):
+		"""Get the file's text and the version it holds."""
+		buffer = io.StringIO()
+		self.config.write(buffer)
+		return buffer.getvalue(), self.version
+
+	def _write_sync(self):
+		"""Write the file on this thread."""
+		text, version = self._render()
+		_write_atomic(self.path, text)
+		self._saved(version)
+
+	def _saved(self, version):
+		"""Record that version is on disk."""
+		self._saved_version = max(self._saved_version, version)
+		self._stat = self._file_stat()
+		log.info(f"Saved {self.path} (version {version})")
+
+	async def _write(self):
+		"""Write the current state on a worker thread, one write at a time."""
+		async with self._write_lock:
+			if not self.dirty:
+				return
+			# render on the loop so the text matches exactly one version
+			text, version = self._render()
+			try:
+				await asyncio.to_thread(_write_atomic, self.path, text)
+			except Exception:
+				log.exception(f"Failed to save {self.path}")
+				return
+			self._saved(version)
+
+		# changes made during the write need another one
+		if self.dirty:
+			self._write_task = None
+			self._schedule_write()
+
+	async def flush(self):
+		"""Write pending changes now."""
+		# a write already on its worker thread can't be stopped, so let it
+		# finish rather than start a second one alongside it; only a task
+		# still waiting out WRITE_DELAY is cancelled
+		while self._write_task is not None and not self._write_task.done():
+			task = self._write_task
+			if self._waiting:
+				task.cancel()
+			await asyncio.gather(task, return_exceptions=True)
+		self._write_task = None
+		await self._write()
+
+_store = None
+
+def get_store():
+	"""Get the SettingsStore shared by every Settings."""
+	global _store
+	if _store is None:
+		_store = SettingsStore()
+	return _store
+
+def _first_set(values):
+	"""Get values if it has a truthy first item, else None."""
+	if values and len(values) > 0 and values[0]:
+		return values
+	return None
 
-		self.config[section]['roles'] = str(roles)
-
-		with open(CONFIG_FILE, 'w') as f:
-			self.config.write(f)
+class Settings(object):
+	"""Bot settings from config.ini, read through the shared SettingsStore."""
 
-	async def get_roles(self, section):
-		self.config.read(CONFIG_FILE)
-		if section not in self.config.sections():
-			return None
+	def __init__(self):
+		super(Settings, self).__init__()
 
-		try:
-			roles = ast.literal_eval(self.config[section]['roles'])
-			if len(roles) > 0 and roles[0]:
-				#print(roles)
-				return roles
-			return None
-		except Exception as e:
-			print(e)
-			return None
+		self.store = get_store()
+		self.log = log
 
-	async def set_channels(self, section, channels):
-		if section not in self.config.sections():
-			self.config.add_section(section)
+	async def set_roles(self, section, roles):
+		self.store.set(section, 'roles', roles)
 
-		self.config[section]['channels'] = str(channels)
+	async def get_roles(self, section):
+		return _first_set(self.store.get(section, 'roles'))
 
-		with open(CONFIG_FILE, 'w') as f:
-			self.config.write(f)
+	async def set_channels(self, section, channels):
+		self.store.set(section, 'channels', channels)
 
 	async def get_channels(self, section):
-		self.config.read(CONFIG_FILE)
-		if section not in self.config.sections():
-			return None
-
-		try:
-			channels = ast.literal_eval(self.config[section]['channels'])
-			if len(channels) > 0 and channels[0]:
-				#print(channels)
-				return channels
-			return None
-		except Exception as e:
-			print(e)
-			return None
+		return _first_set(self.store.get(section, 'channels'))
 
 	async def set_auto_role_users(self, section, users):
-		if section not in self.config.sections():
-			self.config.add_section(section)
-
-		self.config[section]['autoroles'] = str(users)
-
-		with open(CONFIG_FILE, 'w') as f:
-			self.config.write(f)
+		self.store.set(section, 'autoroles', users)
 
 	async def get_auto_role_users(self, section):
-		self.config.read(CONFIG_FILE)
-		if section not in self.config.sections():
-			return None
-
-		try:
-			roles = ast.literal_eval(self.config[section]['autoroles'])
-			if len(roles) > 0 and roles[0]:
-				#print(roles)
-				return roles
-			return None
-		except Exception as e:
-			print(e)
-			return None
+		return _first_set(self.store.get(section, 'autoroles'))
 
 	async def set_messages(self, section, messages):
-		if section not in self.config.sections():
-			self.config.add_section(section)
-
-		self.config[section]['messages'] = str(messages)
-
-		with open(CONFIG_FILE, 'w') as f:
-			self.config.write(f)
+		self.store.set(section, 'messages', messages)
 
 	async def get_messages(self, section):
-		self.config.read(CONFIG_FILE)
-		if section not in self.config.sections():
-			return None
-
-		try:
-			messages = ast.literal_eval(self.config[section]['messages'])
-			if messages and len(messages) > 0 and messages[0]:
-				return messages
-			return None
-		except Exception as e:
-			print(e, "Error with getting messages")
-			return None
+		return _first_set(self.store.get(section, 'messages'))
 
 	async def update_channel_setting(self, ctx, channel_id, action, channel):
-		channels_existing = await self.get_channels(channel_id)
-		if action == 'add':
-			try:
-				if channels_existing is None:
-					await self.set_channels(channel_id, [channel.id])
-					await ctx.respond('Added channel.')
-				else:
-					if channel.id not in channels_existing:
-						channels_existing.append(channel.id)
-						await self.set_channels(channel_id, [c for c in channels_existing])
-						await ctx.respond('Added channel.')
+		# the read-modify-write must not interleave with another update, but
+		# the reply goes out after the lock is released
+		reply = None
+		async with self.store.lock:
+			channels_existing = await self.get_channels(channel_id)
+			if action == 'add':
+				try:
+					if channels_existing is None:
+						await self.set_channels(channel_id, [channel.id])
+						reply = 'Added channel.'
 					else:
-						await ctx.respond('Channel already exists in settings!')
-			except Exception as e:
-				self.log.exception("Error with updating channels")
-				await ctx.respond('Error. Have my owner check logs.')
-		elif action == 'remove':
-			try:
-				if channels_existing is None:
-					await ctx.respond("Oops, no channels are set. Try `add`ing some.")
-				else:
-					tmp = list(channels_existing)
-					if channel.id in tmp:
-						tmp.remove(channel.id)
-
-					if len(tmp) > 0:
-						channels = tmp
-						await self.set_channels(channel_id, [c for c in channels])
+						if channel.id not in channels_existing:
+							channels_existing.append(channel.id)
+							await self.set_channels(channel_id, [c for c in channels_existing])
+							reply = 'Added channel.'
+						else:
+							reply = 'Channel already exists in settings!'
+				except Exception as e:
+					self.log.exception("Error with updating channels")
+					reply = 'Error. Have my owner check logs.'
+			elif action == 'remove':
+				try:
+					if channels_existing is None:
+						reply = "Oops, no channels are set. Try `add`ing some."
 					else:
-						channels = None
-						await self.set_channels(channel_id, channels)
-					await ctx.respond('Removed channel.')
-			except Exception as e:
-				self.log.exception("Error with deleting channels")
-				await ctx.respond('Error. Have my owner check logs.')
+						tmp = list(channels_existing)
+						if channel.id in tmp:
+							tmp.remove(channel.id)
+
+						if len(tmp) > 0:
+							channels = tmp
+							await self.set_channels(channel_id, [c for c in channels])
+						else:
+							channels = None
+							await self.set_channels(channel_id, channels)
+						reply = 'Removed channel.'
+				except Exception as e:
+					self.log.exception("Error with deleting channels")
+					reply = 'Error. Have my owner check logs.'
+		if reply:
+			await ctx.respond(reply)
 
 	async def update_message_setting(self, ctx, message_id, action, message):
-		messages_existing = await self.get_messages(message_id)
-
-		if action == 'add':
-			try:
-				if messages_existing is None:
-					await self.set_messages(message_id, [message])
-					await ctx.respond('Added message.')
-				else:
-					if message not in messages_existing:
-						messages_existing.append(message)
-						await self.set_messages(message_id, [m for m in messages_existing])
-						await ctx.respond('Added message.')
+		# the read-modify-write must not interleave with another update, but
+		# the reply goes out after the lock is released
+		reply = None
+		async with self.store.lock:
+			messages_existing = await self.get_messages(message_id)
+
+			if action == 'add':
+				try:
+					if messages_existing is None:
+						await self.set_messages(message_id, [message])
+						reply = 'Added message.'
 					else:
-						await ctx.respond('Message already exists in settings!')
-			except Exception as e:
-				self.log.exception("Error with updating messages")
-				await ctx.respond('Error. Have my owner check logs.')
-		elif action == 'remove':
-			try:
-				if messages_existing is None:
-					await ctx.respond("Oops, no messages are set. Try `add`ing some.")
-				else:
-					tmp = list(messages_existing)
-					if int(message) in tmp:
-						tmp.remove(message)
-
-					if len(tmp) > 0:
-						messages = tmp
-						await self.set_messages(message_id, [m for m in messages])
+						if message not in messages_existing:
+							messages_existing.append(message)
+							await self.set_messages(message_id, [m for m in messages_existing])
+							reply = 'Added message.'
+						else:
+							reply = 'Message already exists in settings!'
+				except Exception as e:
+					self.log.exception("Error with updating messages")
+					reply = 'Error. Have my owner check logs.'
+			elif action == 'remove':
+				try:
+					if messages_existing is None:
+						reply = "Oops, no messages are set. Try `add`ing some."
 					else:
-						messages = None
-						await self.set_messages(message_id, messages)
-					await ctx.respond('Removed message.')
-			except Exception as e:
-				self.log.exception("Error with deleting messages")
-				await ctx.respond('Error. Have my owner check logs.')
+						tmp = list(messages_existing)
+						if int(message) in tmp:
+							tmp.remove(message)
+
+						if len(tmp) > 0:
+							messages = tmp
+							await self.set_messages(message_id, [m for m in messages])
+						else:
+							messages = None
+							await self.set_messages(message_id, messages)
+						reply = 'Removed message.'
+				except Exception as e:
+					self.log.exception("Error with deleting messages")
+					reply = 'Error. Have my owner check logs.'
+		if reply:
+			await ctx.respond(reply)
 
 	async def update_role_setting(self, ctx, role_id, action, role):
-		roles_existing = await self.get_roles(role_id)
-		if action == 'add':
-			try:
-				if roles_existing is None:
-					await self.set_roles(role_id, [role.id])
-					await ctx.respond('Added role.')
-				else:
-					if role.id not in roles_existing:
-						roles = roles_existing.append(role.id)
-						await self.set_roles(role_id, [r for r in roles])
-						await ctx.respond('Added role.')
+		# the read-modify-write must not interleave with another update, but
+		# the reply goes out after the lock is released
+		reply = None
+		async with self.store.lock:
+			roles_existing = await self.get_roles(role_id)
+			if action == 'add':
+				try:
+					if roles_existing is None:
+						await self.set_roles(role_id, [role.id])
+						reply = 'Added role.'
 					else:
-						await ctx.respond('Role already exists in settings!')
-			except Exception as e:
-				self.log.exception("Error with updating roles")
-				await ctx.respond('Error. Have my owner check logs.')
-		elif action == 'remove':
-			try:
-				if roles_existing is None:
-					await ctx.respond("Oops, no roles are set. Try `add`ing some.")
-				else:
-					tmp = list(roles_existing)
-					if role.id in tmp:
-						tmp.remove(role.id)
-
-					if len(tmp) > 0:
-						roles = tmp
-						await self.set_roles(role_id, [r for r in roles])
+						if role.id not in roles_existing:
+							roles_existing.append(role.id)
+							await self.set_roles(role_id, [r for r in roles_existing])
+							reply = 'Added role.'
+						else:
+							reply = 'Role already exists in settings!'
+				except Exception as e:
+					self.log.exception("Error with updating roles")
+					reply = 'Error. Have my owner check logs.'
+			elif action == 'remove':
+				try:
+					if roles_existing is None:
+						reply = "Oops, no roles are set. Try `add`ing some."
 					else:
-						roles = None
-						await self.set_roles(role_id, roles)
-					await ctx.respond('Removed role.')
-			except Exception as e:
-				self.log.exception("Error with deleting roles")
-				await ctx.respond('Error. Have my owner check logs.')
\ No newline at end of file
+						tmp = list(roles_existing)
+						if role.id in tmp:
+							tmp.remove(role.id)
+
+						if len(tmp) > 0:
+							roles = tmp
+							await self.set_roles(role_id, [r for r in roles])
+						else:
+							roles = None
+							await self.set_roles(role_id, roles)
+						reply = 'Removed role.'
+				except Exception as e:
+					self.log.exception("Error with deleting roles")
+					reply = 'Error. Have my owner check logs.'
+		if reply:
+			await ctx.respond(reply)